@@ -0,0 +1,63 @@
+import argparse
+import os
+import random
+import tempfile
+import time
+from duplicate_finder.core import DuplicateFinder
+from duplicate_finder.similarity import compute_jaccard
+from run_benchmarks import random_tokens
+
+MODES = [("all", 0), ("winnow", 4), ("winnow", 8), ("winnow", 16), ("mod", 4), ("mod", 8)]
+
+def synthesize_long(args, out_dir):
+    """Groups of long documents; each copy gets `edits` random token substitutions."""
+    for g in range(args.groups):
+        base = random_tokens(args.tokens)
+        for c in range(args.group_size):
+            tokens = base[:]
+            for _ in range(args.edits):
+                tokens[random.randrange(len(tokens))] = random.choice(tokens)
+            with open(os.path.join(out_dir, f"g{g}_{c}{args.ext}"), "w", encoding="utf-8") as f:
+                f.write(" ".join(tokens))
+
+def run_mode(root, args, mode, window):
+    finder = DuplicateFinder(k=args.k, threshold=args.threshold, compact=True, fingerprint=mode, fingerprint_window=window or 8)
+    start = time.perf_counter()
+    sigs = finder.scan(root, [args.ext])
+    signed = time.perf_counter() - start
+    start = time.perf_counter()
+    pairs = finder.find_duplicates(sigs)
+    matched = time.perf_counter() - start
+    return sigs, pairs, signed, matched
+
+def run(args):
+    random.seed(args.seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        synthesize_long(args, tmp)
+        base_sigs, base_pairs, _, _ = run_mode(tmp, args, "all", 0)
+        truth = {(a.path, b.path) for _, a, b in base_pairs}
+        base_size = sum(len(s.shingles) for s in base_sigs)
+        print(f"{'MODE':<10} {'W/P':>4} {'SIZE':>7} {'SIGN_S':>7} {'MATCH_S':>8} {'RECALL':>7} {'PRECISION':>9} {'MEAN_ABS_ERR':>12}")
+        for mode, window in MODES:
+            sigs, pairs, signed, matched = run_mode(tmp, args, mode, window)
+            found = {(a.path, b.path) for _, a, b in pairs}
+            hit = len(found & truth)
+            recall = hit / len(truth) if truth else 1.0
+            precision = hit / len(found) if found else 1.0
+            fps = {s.path: s.shingles for s in sigs}
+            errors = [abs(compute_jaccard(fps[a], fps[b]) - sim) for sim, a, b in ((s, x.path, y.path) for s, x, y in base_pairs)]
+            err = sum(errors) / len(errors) if errors else 0.0
+            size = sum(len(s.shingles) for s in sigs) / base_size if base_size else 0.0
+            print(f"{mode:<10} {window:>4} {size:>7.3f} {signed:>7.3f} {matched:>8.3f} {recall:>7.3f} {precision:>9.3f} {err:>12.4f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Accuracy of fingerprint selection modes against full shingle sets")
+    parser.add_argument("--groups", type=int, default=40, help="Number of document groups")
+    parser.add_argument("--group-size", type=int, default=4, help="Files per group")
+    parser.add_argument("--tokens", type=int, default=3000, help="Tokens per document")
+    parser.add_argument("--edits", type=int, default=30, help="Random token substitutions per copy")
+    parser.add_argument("--ext", type=str, default=".txt", help="File extension for synthetic files")
+    parser.add_argument("--k", type=int, default=5, help="Shingle size")
+    parser.add_argument("--threshold", type=float, default=0.7, help="Similarity threshold")
+    parser.add_argument("--seed", type=int, default=0, help="Corpus random seed")
+    run(parser.parse_args())
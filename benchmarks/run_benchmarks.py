@@ -48,12 +48,13 @@ def synthesize(files: int, dup_groups: int, group_size: int, out_dir: str, ext:
             f.write(content)
 
 def run_benchmark(args):
+    random.seed(args.seed)
     with tempfile.TemporaryDirectory() as tmp:
         synthesize(args.files, args.dup_groups, args.group_size, tmp, args.ext)
         finder = DuplicateFinder(k=args.k, threshold=args.threshold)
         start = time.time()
         sigs = finder.scan(tmp, [args.ext], workers=args.workers)
-        pairs = finder.find_duplicates(sigs)
+        pairs = finder.find_duplicates(sigs, prefilter=args.prefilter, workers=args.workers)
         elapsed = time.time() - start
         rate = len(sigs) / elapsed if elapsed else 0
         print(f"Files: {len(sigs)}")
@@ -73,6 +74,8 @@ if __name__ == "__main__":
     parser.add_argument("--k", type=int, default=5, help="Shingle size")
     parser.add_argument("--threshold", type=float, default=0.85, help="Similarity threshold")
     parser.add_argument("--workers", type=int, default=0, help="Process workers (0=serial)")
+    parser.add_argument("--prefilter", action="store_true", help="Use the MinHash+LSH prefilter for matching")
+    parser.add_argument("--seed", type=int, default=0, help="Corpus random seed")
     parser.add_argument("--verbose", action="store_true", help="Show sample duplicate pairs")
     args = parser.parse_args()
     run_benchmark(args)
@@ -0,0 +1,267 @@
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from typing import Callable, Dict, List, Optional
+from duplicate_finder import _optional
+from duplicate_finder.core import DuplicateFinder
+from duplicate_finder.stats import peak_rss
+
+SCHEMA_VERSION = 1
+# Slower-than-baseline by less than this many seconds is noise, whatever the ratio.
+MIN_TIME_DELTA = 0.05
+_IDENTS = ["value", "item", "result", "config", "data", "index", "count", "node", "buffer", "path", "name", "key", "total", "offset", "state"]
+_LICENSE = ("Licensed under the Apache License Version 2.0 you may not use this file except in compliance with the License "
+            "You may obtain a copy of the License at http www apache org licenses LICENSE 2.0 Unless required by applicable "
+            "law or agreed to in writing software distributed under the License is distributed on an AS IS BASIS WITHOUT "
+            "WARRANTIES OR CONDITIONS OF ANY KIND either express or implied").split()
+
+
+def _write(out_dir: str, name: str, text: str) -> None:
+    with open(os.path.join(out_dir, name), "w", encoding="utf-8") as f:
+        f.write(text)
+
+
+def _mutate(rng: random.Random, tokens: List[str], edits: int) -> List[str]:
+    """Copy of `tokens` with `edits` random substitutions, insertions or deletions."""
+    out = tokens[:]
+    for _ in range(edits):
+        op, at = rng.random(), rng.randrange(len(out))
+        if op < 0.6:
+            out[at] = rng.choice(out)
+        elif op < 0.8:
+            out.insert(at, rng.choice(out))
+        elif len(out) > 1:
+            del out[at]
+    return out
+
+
+def _vocab(rng: random.Random, size: int) -> List[str]:
+    return ["".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(rng.randint(3, 9))) for _ in range(size)]
+
+
+def _code_tokens(rng: random.Random, names: List[str]) -> List[str]:
+    tokens: List[str] = []
+    for _ in range(rng.randint(3, 8)):
+        fn, args = rng.choice(names), rng.sample(names, 2)
+        tokens += ["def", fn, args[0], args[1]]
+        for _ in range(rng.randint(3, 10)):
+            tokens += [rng.choice(names), "=", rng.choice(_IDENTS), rng.choice(["+", "-", "*", "get", "append"]), rng.choice(args)]
+        tokens += ["return", rng.choice(names)]
+    return tokens
+
+
+def gen_code(rng: random.Random, out_dir: str, files: int) -> None:
+    """Python-like modules over a shared identifier pool; every tenth file is an edited copy."""
+    names = _vocab(rng, 400) + _IDENTS
+    made: List[List[str]] = []
+    for i in range(files):
+        tokens = _mutate(rng, rng.choice(made), 3) if made and i % 10 == 9 else _code_tokens(rng, names)
+        made.append(tokens)
+        _write(out_dir, f"mod_{i}.py", "\n".join(" ".join(tokens[j:j + 6]) for j in range(0, len(tokens), 6)))
+
+
+def gen_prose(rng: random.Random, out_dir: str, files: int) -> None:
+    """Zipf-distributed words in 150-400 word documents; every tenth file is an edited copy."""
+    vocab = _vocab(rng, 3000)
+    weights = [1.0 / (r + 1) for r in range(len(vocab))]
+    made: List[List[str]] = []
+    for i in range(files):
+        tokens = _mutate(rng, rng.choice(made), 5) if made and i % 10 == 9 else rng.choices(vocab, weights, k=rng.randint(150, 400))
+        made.append(tokens)
+        _write(out_dir, f"doc_{i}.md", " ".join(tokens))
+
+
+def gen_chain(rng: random.Random, out_dir: str, files: int) -> None:
+    """Chains of 10 files, each a small edit of the previous one (drifting near-duplicates)."""
+    vocab = _vocab(rng, 2000)
+    tokens: List[str] = []
+    for i in range(files):
+        tokens = _mutate(rng, tokens, 4) if i % 10 else rng.choices(vocab, k=300)
+        _write(out_dir, f"chain_{i // 10}_{i % 10}.txt", " ".join(tokens))
+
+
+def gen_boilerplate(rng: random.Random, out_dir: str, files: int) -> None:
+    """One license header and import block on every file ahead of a short body; every
+    tenth body is an edited copy of the one before."""
+    names = _vocab(rng, 400) + _IDENTS
+    header = _LICENSE + [t for name in rng.sample(names, 12) for t in ("import", name)]
+    body: List[str] = []
+    for i in range(files):
+        body = _mutate(rng, body, 2) if body and i % 10 == 9 else _code_tokens(rng, names)[:80]
+        _write(out_dir, f"lib_{i}.py", " ".join(header + body))
+
+
+def gen_huge(rng: random.Random, out_dir: str, files: int) -> None:
+    """A few very large files (one per 1000 requested, at least two), pairwise near-copies."""
+    vocab = _vocab(rng, 5000)
+    base = rng.choices(vocab, k=2_000_000)  # ~14 MB of text
+    for i in range(max(2, files // 1000)):
+        _write(out_dir, f"huge_{i}.txt", " ".join(_mutate(rng, base, 200) if i else base))
+
+
+CORPORA: Dict[str, Callable[[random.Random, str, int], None]] = {
+    "code": gen_code,
+    "prose": gen_prose,
+    "chain": gen_chain,
+    "boilerplate": gen_boilerplate,
+    "huge": gen_huge,
+}
+EXTENSIONS = [".py", ".md", ".txt"]
+
+
+def case_id(result: Dict) -> str:
+    return f"{result['corpus']}/{result['files']}/w{result['workers']}"
+
+
+def run_case(root: str, corpus: str, files: int, workers: int, opts: Dict) -> Dict:
+    """One timed scan + prefiltered match; run in a fresh process so peak RSS is its own."""
+    finder = DuplicateFinder(k=opts["k"], threshold=opts["threshold"], compact=True)
+    start = time.perf_counter()
+    sigs = finder.scan(root, EXTENSIONS, workers=workers)
+    signed = time.perf_counter() - start
+    pairs = finder.find_duplicates(sigs, prefilter=True, workers=workers, lsh_recall=opts["lsh_recall"])
+    total = time.perf_counter() - start
+    report = finder.stats_report()
+    recall = None
+    if len(sigs) <= opts["recall_max_files"]:
+        exact = DuplicateFinder(k=opts["k"], threshold=opts["threshold"], compact=True).find_duplicates(sigs, workers=workers)
+        truth = {(a.path, b.path) for _, a, b in exact}
+        found = {(a.path, b.path) for _, a, b in pairs}
+        recall = len(truth & found) / len(truth) if truth else 1.0
+    mb = report["counters"].get("bytes_read", 0) / (1 << 20)
+    return {
+        "corpus": corpus,
+        "files": files,
+        "workers": workers,
+        "signed_files": len(sigs),
+        "seconds": round(total, 4),
+        "sign_seconds": round(signed, 4),
+        "match_seconds": round(total - signed, 4),
+        "files_per_s": round(len(sigs) / total, 1) if total else 0.0,
+        "mb_per_s": round(mb / signed, 2) if signed else 0.0,
+        "stages": report["timings_s"],
+        "candidate_pairs": report["counters"].get("candidate_pairs", 0),
+        "pairs": len(pairs),
+        "recall": None if recall is None else round(recall, 4),
+        "peak_rss_mb": round(peak_rss() / (1 << 20), 1) if peak_rss() else None,
+    }
+
+
+def _best(runs: List[Dict]) -> Dict:
+    """Fastest repeat, with the highest peak RSS seen over all repeats."""
+    best = min(runs, key=lambda r: r["seconds"])
+    rss = [r["peak_rss_mb"] for r in runs if r["peak_rss_mb"] is not None]
+    return {**best, "peak_rss_mb": max(rss) if rss else None}
+
+
+def environment() -> Dict:
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "numpy": _optional.numpy_or_none() is not None,
+    }
+
+
+def run_suite(corpora: List[str], scales: List[int], workers: List[int], opts: Dict, repeat: int = 1, seed: int = 0, log=print) -> Dict:
+    results = []
+    ctx = get_context("spawn")
+    for corpus in corpora:
+        for files in scales:
+            with tempfile.TemporaryDirectory() as tmp:
+                gen_start = time.perf_counter()
+                CORPORA[corpus](random.Random(f"{seed}/{corpus}/{files}"), tmp, files)
+                log(f"# {corpus}/{files}: corpus generated in {time.perf_counter() - gen_start:.1f}s")
+                for w in workers:
+                    runs = []
+                    for _ in range(repeat):
+                        with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as ex:
+                            runs.append(ex.submit(run_case, tmp, corpus, files, w, opts).result())
+                    results.append(_best(runs))
+                    log(format_row(results[-1]))
+    return {"schema_version": SCHEMA_VERSION, "seed": seed, "options": opts, "environment": environment(), "results": results}
+
+
+def compare(current: Dict, baseline: Dict, tolerance: float, recall_tolerance: float) -> List[str]:
+    """Regressions of `current` against `baseline` for cases present in both: time or peak
+    RSS more than `tolerance` (a fraction) above the baseline, or recall more than
+    `recall_tolerance` below it."""
+    base = {case_id(r): r for r in baseline.get("results", [])}
+    problems = []
+    for r in current["results"]:
+        b = base.get(case_id(r))
+        if b is None:
+            continue
+        if r["seconds"] > b["seconds"] * (1 + tolerance) and r["seconds"] - b["seconds"] > MIN_TIME_DELTA:
+            problems.append(f"{case_id(r)}: {r['seconds']:.3f}s vs baseline {b['seconds']:.3f}s (+{r['seconds'] / b['seconds'] - 1:.0%})")
+        if r.get("peak_rss_mb") and b.get("peak_rss_mb") and r["peak_rss_mb"] > b["peak_rss_mb"] * (1 + tolerance):
+            problems.append(f"{case_id(r)}: peak RSS {r['peak_rss_mb']} MB vs baseline {b['peak_rss_mb']} MB")
+        if r.get("recall") is not None and b.get("recall") is not None and r["recall"] < b["recall"] - recall_tolerance:
+            problems.append(f"{case_id(r)}: LSH recall {r['recall']:.3f} vs baseline {b['recall']:.3f}")
+    return problems
+
+
+HEADER = f"{'CASE':<24} {'SECONDS':>8} {'SIGN_S':>7} {'MATCH_S':>8} {'FILES/S':>9} {'MB/S':>7} {'RSS_MB':>7} {'CAND':>9} {'PAIRS':>7} {'RECALL':>6}"
+
+
+def format_row(r: Dict) -> str:
+    recall = "-" if r["recall"] is None else f"{r['recall']:.3f}"
+    rss = "-" if r["peak_rss_mb"] is None else f"{r['peak_rss_mb']:.1f}"
+    return (f"{case_id(r):<24} {r['seconds']:>8.3f} {r['sign_seconds']:>7.3f} {r['match_seconds']:>8.3f} {r['files_per_s']:>9.1f} "
+            f"{r['mb_per_s']:>7.2f} {rss:>7} {r['candidate_pairs']:>9} {r['pairs']:>7} {recall:>6}")
+
+
+def _int_list(text: str) -> List[int]:
+    return [int(x) for x in text.split(",") if x.strip()]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Seeded benchmark suite with per-stage timings and baseline regression checks")
+    parser.add_argument("--corpora", type=str, default="code,prose,chain,boilerplate", help=f"Comma-separated corpus generators ({', '.join(CORPORA)})")
+    parser.add_argument("--scales", type=_int_list, default=[1000], help="Comma-separated file counts, e.g. 1000,10000,100000")
+    parser.add_argument("--workers", type=_int_list, default=[1, 2, 4, 8], help="Comma-separated worker counts (1 = serial)")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per case; the fastest is kept")
+    parser.add_argument("--seed", type=int, default=0, help="Corpus random seed")
+    parser.add_argument("--k", type=int, default=5, help="Shingle size")
+    parser.add_argument("--threshold", type=float, default=0.8, help="Similarity threshold")
+    parser.add_argument("--lsh-recall", type=float, default=None, help="Auto-tune LSH for this recall (default: 64 perms / 16 bands)")
+    parser.add_argument("--recall-max-files", type=int, default=5000, help="Measure LSH recall against exact Jaccard up to this many files")
+    parser.add_argument("--out", type=str, default=None, help="Write results JSON here")
+    parser.add_argument("--baseline", type=str, default=None, help="Results JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown / RSS growth versus the baseline (fraction)")
+    parser.add_argument("--recall-tolerance", type=float, default=0.02, help="Allowed absolute recall drop versus the baseline")
+    parser.add_argument("--max-seconds", type=float, default=None, help="Fail if any case takes longer (e.g. 30 for the 5k-files target)")
+    args = parser.parse_args(argv)
+    corpora = [c.strip() for c in args.corpora.split(",") if c.strip()]
+    unknown = [c for c in corpora if c not in CORPORA]
+    if unknown:
+        parser.error(f"unknown corpora: {', '.join(unknown)}")
+    opts = {"k": args.k, "threshold": args.threshold, "lsh_recall": args.lsh_recall, "recall_max_files": args.recall_max_files}
+    print(HEADER)
+    current = run_suite(corpora, args.scales, args.workers, opts, args.repeat, args.seed)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(current, f, indent=2)
+    problems = []
+    if args.max_seconds is not None:
+        problems += [f"{case_id(r)}: {r['seconds']:.3f}s exceeds --max-seconds {args.max_seconds}" for r in current["results"] if r["seconds"] > args.max_seconds]
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("environment", {}).get("cpus") != current["environment"]["cpus"]:
+            print("warning: baseline was recorded on a machine with a different CPU count", file=sys.stderr)
+        problems += compare(current, baseline, args.tolerance, args.recall_tolerance)
+    for p in problems:
+        print(f"REGRESSION {p}", file=sys.stderr)
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,14 +1,42 @@
 """Duplicate Finding Tool package."""
-from .core import DuplicateFinder, compute_jaccard, FileSignature
-from .minhash import minhash_signature, lsh_candidates
-from .cluster import build_clusters
-
-__all__ = [
-    "DuplicateFinder",
-    "compute_jaccard",
-    "FileSignature",
-    "minhash_signature",
-    "lsh_candidates",
-    "build_clusters",
-]
+import importlib
+from typing import TYPE_CHECKING
+
+# Public names resolve on first attribute access (PEP 562), so `import duplicate_finder.cli`
+# or `--help` does not pay for the matching engine.
+_EXPORTS = {
+    "DuplicateFinder": "core",
+    "compute_jaccard": "similarity",
+    "sorted_jaccard": "similarity",
+    "FileSignature": "core",
+    "minhash_signature": "minhash",
+    "minhash_matrix": "minhash",
+    "lsh_candidates": "minhash",
+    "build_clusters": "cluster",
+    "build_clusters_streaming": "cluster",
+    "UnionFind": "cluster",
+    "SignatureIndex": "index",
+}
+
+if TYPE_CHECKING:
+    from .core import DuplicateFinder, FileSignature
+    from .similarity import compute_jaccard, sorted_jaccard
+    from .minhash import minhash_signature, minhash_matrix, lsh_candidates
+    from .cluster import build_clusters, build_clusters_streaming, UnionFind
+    from .index import SignatureIndex
+
+__all__ = list(_EXPORTS)
 __version__ = "0.2.0"  # bumped for new features
+
+
+def __getattr__(name: str):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
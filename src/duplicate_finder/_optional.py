@@ -0,0 +1,23 @@
+import importlib
+from typing import Any, Dict, Optional
+
+_MISSING = object()
+_modules: Dict[str, Any] = {}
+
+
+def optional_import(name: str) -> Optional[Any]:
+    """Import `name` on first use; return None when it is not installed.
+    Results are cached so repeated lookups are a dict hit.
+    """
+    mod = _modules.get(name, _MISSING)
+    if mod is _MISSING:
+        try:
+            mod = importlib.import_module(name)
+        except ImportError:
+            mod = None
+        _modules[name] = mod
+    return mod
+
+
+def numpy_or_none():
+    return optional_import("numpy")
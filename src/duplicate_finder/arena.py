@@ -0,0 +1,96 @@
+from array import array
+from typing import List, NamedTuple, Optional, Sequence, Tuple
+from ._optional import numpy_or_none, optional_import
+from .cache import pack_uint64
+
+
+def _shared_memory():
+    # None on platforms without POSIX/Win32 shared memory; imported on first parallel run
+    return optional_import("multiprocessing.shared_memory")
+
+
+class ArenaBatch(NamedTuple):
+    """What a pool worker sends back for one batch: only offsets cross the pipe.
+    `name` is a shared-memory segment holding every array of the batch back to back
+    (None when shared memory was unavailable and `inline` carries the bytes instead).
+    """
+    name: Optional[str]
+    inline: bytes
+    entries: List[Tuple[int, int]]  # (offset, count) in uint64 units, count -1 = no value
+
+
+def start_tracker() -> None:
+    """Start the resource tracker before the pool forks, so workers share the parent's
+    tracker and segments they create are not reported as leaked when they exit."""
+    if _shared_memory() is not None:
+        optional_import("multiprocessing.resource_tracker").ensure_running()
+
+
+def write_arena(arrays: Sequence) -> ArenaBatch:
+    """Pack uint64 arrays (None for missing values) into one segment; called in the worker."""
+    shared_memory = _shared_memory()
+    entries: List[Tuple[int, int]] = []
+    total = 0
+    for arr in arrays:
+        if arr is None:
+            entries.append((0, -1))
+        else:
+            entries.append((total, len(arr)))
+            total += len(arr)
+    if shared_memory is not None and total:
+        try:
+            shm = shared_memory.SharedMemory(create=True, size=total * 8)
+        except OSError:
+            shm = None
+        if shm is not None:
+            buf = shm.buf
+            for arr, (offset, count) in zip(arrays, entries):
+                if count > 0:
+                    buf[offset * 8:(offset + count) * 8] = pack_uint64(arr)
+            del buf
+            shm.close()  # the parent attaches, copies out and unlinks
+            return ArenaBatch(shm.name, b"", entries)
+    return ArenaBatch(None, b"".join(pack_uint64(a) for a in arrays if a is not None and len(a)), entries)
+
+
+def read_arena(batch: ArenaBatch) -> List:
+    """Copy each array out of the batch's segment (then unlink it); called in the parent.
+    Returns NumPy uint64 arrays, or array('Q') without NumPy, and None for missing values."""
+    shm = None
+    if batch.name is not None:
+        shm = _shared_memory().SharedMemory(name=batch.name)
+        buf = shm.buf
+    else:
+        buf = memoryview(batch.inline)
+    np = numpy_or_none()
+    out: List = []
+    try:
+        for offset, count in batch.entries:
+            if count < 0:
+                out.append(None)
+            elif count == 0:
+                out.append(np.empty(0, dtype=np.uint64) if np is not None else array("Q"))
+            elif np is not None:
+                out.append(np.frombuffer(buf, dtype=np.uint64, count=count, offset=offset * 8).copy())
+            else:
+                values = array("Q")
+                values.frombytes(buf[offset * 8:(offset + count) * 8])
+                out.append(values)
+    finally:
+        del buf
+        if shm is not None:
+            shm.close()
+            shm.unlink()
+    return out
+
+
+def discard_arena(batch: ArenaBatch) -> None:
+    """Unlink a batch's segment without reading it (results dropped after a pool failure)."""
+    if batch.name is None:
+        return
+    try:
+        shm = _shared_memory().SharedMemory(name=batch.name)
+    except OSError:
+        return
+    shm.close()
+    shm.unlink()
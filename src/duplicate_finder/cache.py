@@ -0,0 +1,185 @@
+import hashlib
+import os
+from array import array
+from typing import Dict, Iterable, List, Optional, Tuple
+from ._optional import numpy_or_none
+from .minhash import minhash_matrix
+
+_SCHEMA_VERSION = "1"
+_DIGEST_CHUNK = 1 << 20
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS signatures (
+    path TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL,
+    file_size INTEGER NOT NULL,
+    digest BLOB,
+    tokens INTEGER NOT NULL,
+    shingles BLOB NOT NULL,
+    shingle_count INTEGER NOT NULL,
+    minhash_tag TEXT,
+    minhash BLOB
+);
+"""
+
+
+def file_digest(path: str) -> bytes:
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_DIGEST_CHUNK), b""):
+            h.update(chunk)
+    return h.digest()
+
+
+def pack_uint64(values) -> bytes:
+    if getattr(values, "typecode", None) == "Q":
+        return values.tobytes()
+    np = numpy_or_none()
+    if np is not None and isinstance(values, np.ndarray):
+        return values.astype(np.uint64, copy=False).tobytes()
+    return array("Q", values).tobytes()
+
+
+def _shingles_tag(shingles) -> str:
+    """Short digest of a shingle set, so MinHash rows are only reused for the exact shingles
+    they were computed from (not, say, a --max-df filtered subset of the stored ones)."""
+    if isinstance(shingles, (set, frozenset)):
+        shingles = sorted(shingles)
+    return hashlib.blake2b(pack_uint64(shingles), digest_size=8).hexdigest()
+
+
+def unpack_uint64(blob: bytes):
+    np = numpy_or_none()
+    if np is not None:
+        return np.frombuffer(blob, dtype=np.uint64)
+    out = array("Q")
+    out.frombytes(blob)
+    return out
+
+
+class SignatureCache:
+    """SQLite store of per-file shingle arrays, token counts and MinHash rows.
+    Entries are keyed by (path, mtime_ns, size); with `verify_content` a stat mismatch
+    falls back to a content digest so a fresh checkout with new mtimes still hits.
+    """
+    def __init__(self, path: str, verify_content: bool = False):
+        self.path = path
+        self.verify_content = verify_content
+        self.stats: Dict[str, int] = {"hits": 0, "misses": 0, "evicted": 0}
+        self._pending: Dict[str, Tuple[int, int, Optional[bytes]]] = {}
+        parent = os.path.dirname(os.path.abspath(path))
+        os.makedirs(parent, exist_ok=True)
+        import sqlite3  # deferred: commands without --cache never load it
+        self._conn = sqlite3.connect(path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def configure(self, config: str) -> None:
+        """Drop all entries when the signature settings (k, hash backend, ...) changed."""
+        config = f"{_SCHEMA_VERSION}:{config}"
+        row = self._conn.execute("SELECT value FROM meta WHERE key = 'config'").fetchone()
+        if row is not None and row[0] == config:
+            return
+        with self._conn:
+            self._conn.execute("DELETE FROM signatures")
+            self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('config', ?)", (config,))
+
+    def lookup(self, path: str) -> Optional[Tuple[int, bytes]]:
+        """Return (tokens, packed shingles) for a fresh entry, else None and remember the
+        stat key so `store` can record the recomputed signature."""
+        try:
+            st = os.stat(path)
+        except OSError:
+            self.stats["misses"] += 1
+            return None
+        row = self._conn.execute(
+            "SELECT mtime_ns, file_size, digest, tokens, shingles FROM signatures WHERE path = ?", (path,)
+        ).fetchone()
+        digest = None
+        if row is not None:
+            mtime_ns, size, stored_digest, tokens, blob = row
+            if mtime_ns == st.st_mtime_ns and size == st.st_size:
+                self.stats["hits"] += 1
+                return tokens, blob
+            if self.verify_content and stored_digest is not None and size == st.st_size:
+                digest = file_digest(path)
+                if digest == stored_digest:
+                    with self._conn:
+                        self._conn.execute("UPDATE signatures SET mtime_ns = ? WHERE path = ?", (st.st_mtime_ns, path))
+                    self.stats["hits"] += 1
+                    return tokens, blob
+        if self.verify_content and digest is None:
+            try:
+                digest = file_digest(path)
+            except OSError:
+                digest = None
+        self._pending[path] = (st.st_mtime_ns, st.st_size, digest)
+        self.stats["misses"] += 1
+        return None
+
+    def store(self, signatures: Iterable) -> None:
+        rows = []
+        for sig in signatures:
+            key = self._pending.pop(sig.path, None)
+            if key is None:
+                continue
+            shingles = sig.shingles
+            if isinstance(shingles, (set, frozenset)):
+                shingles = sorted(shingles)
+            rows.append((sig.path, key[0], key[1], key[2], sig.size, pack_uint64(shingles), len(sig.shingles)))
+        if rows:
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO signatures (path, mtime_ns, file_size, digest, tokens, shingles, shingle_count) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    rows,
+                )
+        self._pending.clear()
+
+    def evict_missing(self, root: str, seen: Iterable[str]) -> int:
+        """Delete entries under `root` whose file no longer exists."""
+        seen_set = set(seen)
+        prefix = os.path.join(root, "")
+        stale = [
+            (p,) for (p,) in self._conn.execute("SELECT path FROM signatures")
+            if p.startswith(prefix) and p not in seen_set and not os.path.exists(p)
+        ]
+        if stale:
+            with self._conn:
+                self._conn.executemany("DELETE FROM signatures WHERE path = ?", stale)
+        self.stats["evicted"] += len(stale)
+        return len(stale)
+
+    def minhash_matrix(self, signatures: List, perms: int, engine: str):
+        """`minhash.minhash_matrix` that reuses stored rows and stores the ones it computes."""
+        tags = [f"{engine}:{perms}:{_shingles_tag(sig.shingles)}" for sig in signatures]
+        rows: List = [None] * len(signatures)
+        for idx, sig in enumerate(signatures):
+            row = self._conn.execute(
+                "SELECT minhash FROM signatures WHERE path = ? AND minhash_tag = ? AND shingle_count = ?",
+                (sig.path, tags[idx], len(sig.shingles)),
+            ).fetchone()
+            if row is not None:
+                rows[idx] = unpack_uint64(row[0])
+        missing = [i for i, r in enumerate(rows) if r is None]
+        if missing:
+            fresh = minhash_matrix([signatures[i].shingles for i in missing], perms, engine=engine)
+            updates = []
+            for i, values in zip(missing, fresh):
+                packed = pack_uint64(values)
+                rows[i] = unpack_uint64(packed)
+                updates.append((tags[i], packed, signatures[i].path))
+            with self._conn:
+                self._conn.executemany("UPDATE signatures SET minhash_tag = ?, minhash = ? WHERE path = ?", updates)
+        np = numpy_or_none()
+        if np is not None and engine == "fast":
+            matrix = np.empty((len(rows), perms), dtype=np.uint32)
+            for idx, row in enumerate(rows):
+                matrix[idx] = row
+            return matrix
+        return [[int(v) for v in row] for row in rows]
+
+    def close(self) -> None:
+        self._conn.close()
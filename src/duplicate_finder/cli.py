@@ -1,7 +1,142 @@
 import json
+import os
+import sys
+from contextlib import contextmanager
 import click
-from .core import DuplicateFinder
-from .cluster import build_clusters
+from .ignore import DEFAULT_IGNORES, IGNORE_FILE, IgnoreMatcher
+
+# The matching engine (core, minhash, numpy, sqlite3, multiprocessing) is imported inside
+# the commands, so `--help` and hook start-up only pay for click; see tests/performance/test_startup.py.
+
+# `check` exit codes (click itself exits 2 on usage errors)
+EXIT_CLEAN = 0
+EXIT_DUPLICATES = 1
+
+def _parse_extensions(ext: str):
+    return [e.strip() for e in ext.split(",") if e.strip()]
+
+_SIZE_UNITS = {"": 1, "K": 1 << 10, "M": 1 << 20, "G": 1 << 30}
+
+def _parse_size(ctx, param, value):
+    if value is None:
+        return None
+    text = value.strip().upper().rstrip("B")
+    unit = text[-1:] if text[-1:] in _SIZE_UNITS else ""
+    try:
+        return int(float(text[:len(text) - len(unit)]) * _SIZE_UNITS[unit])
+    except ValueError:
+        raise click.BadParameter(f"expected a size like 500K, 20M or 1G, got {value!r}")
+
+def _walk_options(f):
+    """Ignore/size options shared by the commands that walk a directory tree."""
+    options = [
+        click.option("--exclude", multiple=True, help="gitignore-style glob to skip (repeatable); matching directories are not descended"),
+        click.option("--exclude-regex", multiple=True, help="Regex searched in root-relative paths to skip (repeatable)"),
+        click.option("--ignore-file", type=click.Path(exists=True, dir_okay=False), multiple=True, help=f"gitignore-style pattern file (repeatable; PATH/{IGNORE_FILE} is read automatically)"),
+        click.option("--no-default-ignores", is_flag=True, help="Also walk " + ", ".join(p.rstrip("/") for p in DEFAULT_IGNORES)),
+        click.option("--min-file-size", type=str, callback=_parse_size, help="Skip files smaller than this (e.g. 1K), decided from the directory listing"),
+    ]
+    for option in reversed(options):
+        f = option(f)
+    return f
+
+def _stats_options(f):
+    """Run statistics / profiling options shared by the commands that sign a tree."""
+    options = [
+        click.option("--stats", is_flag=True, help="Print files, bytes, tokens, pair counts, per-stage times and peak RSS to stderr"),
+        click.option("--stats-json", type=click.Path(dir_okay=False), help="Write the run statistics as JSON to this file"),
+        click.option("--profile-out", type=click.Path(dir_okay=False), help="Run under cProfile and dump pstats data here (snakeviz, python -m pstats)"),
+    ]
+    for option in reversed(options):
+        f = option(f)
+    return f
+
+@contextmanager
+def _run_stats(finder, stats, stats_json, profile_out):
+    profiler = None
+    if profile_out:
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+    try:
+        yield
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(profile_out)
+    if stats or stats_json:
+        from .stats import format_stats
+        report = finder.stats_report()
+        if stats:
+            for line in format_stats(report):
+                click.echo(line, err=True)
+        if stats_json:
+            with open(stats_json, "w", encoding="utf-8") as f:
+                json.dump({"schema_version": 1, **report}, f, indent=2)
+
+def _build_ignore(root, exclude, exclude_regex, ignore_file, no_default_ignores):
+    files = list(ignore_file)
+    auto = os.path.join(root, IGNORE_FILE)
+    if os.path.isfile(auto) and auto not in files:
+        files.append(auto)
+    patterns = ([] if no_default_ignores else list(DEFAULT_IGNORES)) + list(exclude)
+    try:
+        return IgnoreMatcher.from_files(files, patterns, exclude_regex)
+    except ValueError as exc:
+        raise click.BadParameter(str(exc), param_hint="--exclude-regex")
+
+def _df_table(finder, sigs, path, rebuild):
+    from .frequency import ShingleFrequency
+    if path and not rebuild and os.path.exists(path):
+        try:
+            table = ShingleFrequency.load(path)
+        except (OSError, ValueError):
+            table = None
+        if table is not None and table.config == finder._cache_config():
+            return table
+    table = finder.shingle_frequency(sigs)
+    if path:
+        table.save(path)
+    return table
+
+def _open_cache(cache_path, no_cache, cache_verify):
+    if cache_path and not no_cache:
+        from .cache import SignatureCache
+        return SignatureCache(cache_path, verify_content=cache_verify)
+    return None
+
+def _close_cache(cache):
+    if cache is not None:
+        click.echo("cache: {hits} hits, {misses} misses, {evicted} evicted".format(**cache.stats), err=True)
+        cache.close()
+
+def _report_prefilter(finder):
+    st = finder.prefilter_stats
+    if not st:
+        return
+    if "rows" in st:
+        click.echo(f"lsh: perms={st['perms']} bands={st['bands']} rows={st['rows']}, predicted FNR at threshold {st['fnr']:.2%}", err=True)
+    reduction = 1.0 - st["candidates"] / st["pairs"] if st["pairs"] else 0.0
+    click.echo(f"lsh: {st['candidates']} candidate pairs of {st['pairs']} ({reduction:.2%} reduction)", err=True)
+    click.echo(f"lsh: {st['buckets']} shared buckets, largest {st['largest_bucket']}, {st['oversized_buckets']} split, {st['raw_pairs']} pairs before dedupe", err=True)
+    if "estimate_band" in st:
+        click.echo(f"estimate: {st['estimate_accepted']} accepted, {st['estimate_rejected']} rejected from MinHash, {st['estimate_uncertain']} verified exactly (band ±{st['estimate_band']:.3f})", err=True)
+
+def _is_estimate(sim) -> bool:
+    return getattr(sim, "estimated", False)
+
+def _pair_record(sim, a, b, estimate: bool = False) -> dict:
+    record = {
+        "schema_version": 1,
+        "similarity": round(sim, 4),
+        "file_a": a.path,
+        "file_b": b.path,
+        "tokens_a": a.size,
+        "tokens_b": b.size,
+    }
+    if estimate:
+        record["estimated"] = _is_estimate(sim)
+    return record
 
 @click.group()
 def main():
@@ -12,61 +147,195 @@ def main():
 @click.option("--threshold", type=float, default=0.85, show_default=True, help="Similarity threshold (0-1)")
 @click.option("--ext", type=str, default=".py,.md,.txt", show_default=True, help="Comma-separated list of file extensions")
 @click.option("--k", type=int, default=5, show_default=True, help="Shingle size (tokens per shingle)")
-@click.option("--workers", type=int, default=0, show_default=True, help="Parallel worker processes (0 = serial signature phase)")
+@click.option("--hash-backend", type=click.Choice(["blake2b", "crc", "xxhash"]), default="blake2b", show_default=True, help="Token hash used for shingle fingerprints (xxhash needs the optional extra)")
+@click.option("--fingerprint", type=click.Choice(["all", "winnow", "mod"]), default="all", show_default=True, help="Keep every shingle, winnowed minima, or hashes that are 0 mod --fingerprint-window")
+@click.option("--fingerprint-window", type=click.IntRange(min=1), default=8, show_default=True, help="Winnowing window (shingles) or sampling modulus")
+@click.option("--tokenizer", type=click.Choice(["regex", "auto"]), default="regex", show_default=True, help="Word regex for every file, or language-aware by extension (.py via tokenize, Markdown, JSON)")
+@click.option("--compact", is_flag=True, help="Store shingles as sorted uint64 arrays instead of Python sets (much lower memory)")
+@click.option("--cache", "cache_path", type=click.Path(dir_okay=False), envvar="DUPLICATE_FINDER_CACHE", help="Signature cache file; only new or changed files are re-shingled")
+@click.option("--no-cache", is_flag=True, help="Ignore --cache / DUPLICATE_FINDER_CACHE for this run")
+@click.option("--cache-verify", is_flag=True, help="On mtime/size mismatch compare content digests before recomputing (fresh checkouts)")
+@click.option("--no-exact-fastpath", is_flag=True, help="Shingle byte-identical files individually instead of grouping them by size + content hash first")
+@click.option("--max-file-size", type=str, callback=_parse_size, help="Skip files larger than this (e.g. 20M); other files are streamed in chunks")
+@click.option("--workers", type=int, default=0, show_default=True, help="Parallel worker processes for signing and pair verification (0 = serial)")
+@click.option("--io-threads", type=click.IntRange(min=0), default=4, show_default=True, help="Read-ahead threads per signing process (0 = read inline)")
+@click.option("--prefetch-depth", type=click.IntRange(min=1), default=None, help="Files read ahead per signing process (default 2 x --io-threads)")
+@click.option("--max-df", type=click.FloatRange(0.0, 1.0, min_open=True), default=None, help="Drop shingles found in more than this fraction of files (boilerplate) before matching, e.g. 0.05")
+@click.option("--min-df-docs", type=click.IntRange(min=1), default=10, show_default=True, help="Never drop shingles found in this many files or fewer (protects small corpora)")
+@click.option("--df-table", type=click.Path(dir_okay=False), help="Shingle document-frequency table to reuse (created on first use, rebuilt if signature settings differ)")
+@click.option("--df-rebuild", is_flag=True, help="Recount --df-table from this scan")
 @click.option("--prefilter", is_flag=True, help="Enable MinHash+LSH candidate prefiltering (improves scalability)")
 @click.option("--minhash-perms", type=int, default=64, show_default=True, help="MinHash permutations when prefilter enabled")
-@click.option("--lsh-bands", type=int, default=16, show_default=True, help="Number of LSH bands (must divide perms roughly)")
+@click.option("--lsh-bands", type=int, default=16, show_default=True, help="Number of LSH bands (perms // bands rows each; leftover perms are unused)")
+@click.option("--lsh-recall", type=click.FloatRange(0.0, 1.0, min_open=True, max_open=True), default=None, help="Auto-tune perms/bands/rows for this recall at --threshold (implies --prefilter; overrides --minhash-perms/--lsh-bands)")
+@click.option("--lsh-max-bucket", type=click.IntRange(min=2), default=None, help="Split LSH buckets larger than this on further bands instead of pairing every member")
+@click.option("--minhash-engine", type=click.Choice(["fast", "compat"]), default="fast", show_default=True, help="MinHash implementation (compat = legacy per-salt MD5 reference)")
+@click.option("--estimate", is_flag=True, help="Score LSH candidates by MinHash agreement; exact Jaccard only near the threshold (implies --prefilter)")
+@click.option("--estimate-band", type=click.FloatRange(0.0, 1.0), default=None, help="Estimates within this distance of --threshold are verified exactly (default two standard errors at the threshold)")
 @click.option("--clusters", is_flag=True, help="Output duplicate clusters instead of raw pairs")
-@click.option("--json", "--json-output", is_flag=True, help="Emit JSON instead of table")
-def scan(path, threshold, ext, k, workers, prefilter, minhash_perms, lsh_bands, clusters, json_output):
+@click.option("--json", "--json-output", "json_output", is_flag=True, help="Emit JSON instead of table")
+@click.option("--jsonl", is_flag=True, help="Stream one JSON object per line as results are verified (unordered unless --sorted/--top)")
+@click.option("--top", type=click.IntRange(min=1), default=None, help="Only report the N most similar pairs (bounded heap, no full sort)")
+@click.option("--sorted", "sort_output", is_flag=True, help="Sort --jsonl output by similarity (buffers all pairs first)")
+@_walk_options
+@_stats_options
+def scan(path, threshold, ext, k, hash_backend, fingerprint, fingerprint_window, tokenizer, compact, cache_path, no_cache, cache_verify, no_exact_fastpath, max_file_size, workers, io_threads, prefetch_depth, max_df, min_df_docs, df_table, df_rebuild, prefilter, minhash_perms, lsh_bands, lsh_recall, lsh_max_bucket, minhash_engine, estimate, estimate_band, clusters, json_output, jsonl, top, sort_output, exclude, exclude_regex, ignore_file, no_default_ignores, min_file_size, stats, stats_json, profile_out):
     """Scan PATH recursively for duplicate / near-duplicate files."""
-    extensions = [e.strip() for e in ext.split(",") if e.strip()]
-    finder = DuplicateFinder(k=k, threshold=threshold)
-    sigs = finder.scan(path, extensions, workers=workers)
-    results = finder.find_duplicates(sigs, prefilter=prefilter, minhash_perms=minhash_perms, lsh_bands=lsh_bands)
+    from .core import DuplicateFinder, rank_duplicates
+    if json_output and jsonl:
+        raise click.UsageError("--json and --jsonl are mutually exclusive")
+    extensions = _parse_extensions(ext)
+    ignore = _build_ignore(path, exclude, exclude_regex, ignore_file, no_default_ignores)
+    cache = _open_cache(cache_path, no_cache, cache_verify)
+    try:
+        finder = DuplicateFinder(k=k, threshold=threshold, hash_backend=hash_backend, compact=compact, cache=cache, max_file_size=max_file_size, exact_fastpath=not no_exact_fastpath, ignore=ignore, min_file_size=min_file_size, fingerprint=fingerprint, fingerprint_window=fingerprint_window, io_threads=io_threads, prefetch_depth=prefetch_depth, tokenizer=tokenizer)
+    except ValueError as exc:
+        raise click.UsageError(str(exc))
+    with _run_stats(finder, stats, stats_json, profile_out):
+        sigs = finder.scan(path, extensions, workers=workers)
+        if max_df is not None:
+            sigs = finder.drop_common_shingles(sigs, max_df, min_df_docs, _df_table(finder, sigs, df_table, df_rebuild))
+            st = finder.filter_stats
+            removed = 1.0 - st["shingles_after"] / st["shingles_before"] if st["shingles_before"] else 0.0
+            click.echo(f"df filter: {st['common_shingles']} shingles in more than {st['cutoff_docs']} of {st['docs']} files dropped, {removed:.2%} of shingle occurrences removed", err=True)
+        match_opts = dict(prefilter=prefilter or lsh_recall is not None or estimate, minhash_perms=minhash_perms, lsh_bands=lsh_bands, minhash_engine=minhash_engine, workers=workers, lsh_recall=lsh_recall, lsh_max_bucket=lsh_max_bucket, estimate=estimate, estimate_band=estimate_band)
 
-    if clusters:
-        cluster_list = build_clusters(results)
-        if json_output:
-            out = {
-                "schema_version": 1,
-                "mode": "clusters",
-                "threshold": threshold,
-                "clusters": cluster_list,
-            }
-            click.echo(json.dumps(out, indent=2))
+        if clusters:
+            # pairs stream into a union-find; the pair list is never materialized
+            cluster_list = finder.find_clusters(sigs, **match_opts)
+            _report_prefilter(finder)
+            _close_cache(cache)
+            if jsonl:
+                for c in cluster_list:
+                    click.echo(json.dumps({"schema_version": 1, "mode": "cluster", **c}))
+                return
+            if json_output:
+                out = {
+                    "schema_version": 1,
+                    "mode": "clusters",
+                    "threshold": threshold,
+                    "clusters": cluster_list,
+                }
+                click.echo(json.dumps(out, indent=2))
+                return
+            if not cluster_list:
+                click.echo("No duplicate clusters above threshold.")
+                return
+            click.echo("CLUSTER_ID SIZE MAX_SIM REPRESENTATIVE")
+            click.echo("-" * 72)
+            for idx, c in enumerate(cluster_list, start=1):
+                click.echo(f"{idx:<10} {c['size']:<4} {c['max_similarity']:.4f} {c['representative']}")
             return
-        if not cluster_list:
-            click.echo("No duplicate clusters above threshold.")
+
+        pairs = finder.iter_duplicates(sigs, **match_opts)
+        if jsonl:
+            if top is not None or sort_output:
+                pairs = rank_duplicates(pairs, top)
+            for pair in pairs:
+                click.echo(json.dumps(_pair_record(*pair, estimate=estimate)))
+            _report_prefilter(finder)
+            _close_cache(cache)
             return
-        click.echo("CLUSTER_ID SIZE MAX_SIM REPRESENTATIVE")
-        click.echo("-" * 72)
-        for idx, c in enumerate(cluster_list, start=1):
-            click.echo(f"{idx:<10} {c['size']:<4} {c['max_similarity']:.4f} {c['representative']}")
-        return
 
+        results = rank_duplicates(pairs, top)
+        _report_prefilter(finder)
+        _close_cache(cache)
+        if json_output:
+            click.echo(json.dumps([_pair_record(*pair, estimate=estimate) for pair in results], indent=2))
+        else:
+            if not results:
+                click.echo("No duplicates above threshold.")
+                return
+            width = 8
+            click.echo(f"{'SIM':<{width}} FILE_A | FILE_B")
+            click.echo("-" * 80)
+            for sim, a, b in results:
+                score = f"{sim:.4f}" + ("~" if _is_estimate(sim) else "")
+                click.echo(f"{score:<{width}} {a.path} | {b.path}")
+            if estimate:
+                click.echo("~ = MinHash estimate (not verified with exact Jaccard)")
+
+@main.command("index")
+@click.argument("path", type=click.Path(exists=True, file_okay=False))
+@click.option("--out", "out_path", type=click.Path(dir_okay=False), required=True, help="Index file to write")
+@click.option("--ext", type=str, default=".py,.md,.txt", show_default=True, help="Comma-separated list of file extensions")
+@click.option("--k", type=int, default=5, show_default=True, help="Shingle size (tokens per shingle)")
+@click.option("--hash-backend", type=click.Choice(["blake2b", "crc", "xxhash"]), default="blake2b", show_default=True, help="Token hash used for shingle fingerprints")
+@click.option("--fingerprint", type=click.Choice(["all", "winnow", "mod"]), default="all", show_default=True, help="Keep every shingle, winnowed minima, or hashes that are 0 mod --fingerprint-window")
+@click.option("--fingerprint-window", type=click.IntRange(min=1), default=8, show_default=True, help="Winnowing window (shingles) or sampling modulus")
+@click.option("--tokenizer", type=click.Choice(["regex", "auto"]), default="regex", show_default=True, help="Word regex for every file, or language-aware by extension (.py via tokenize, Markdown, JSON)")
+@click.option("--minhash-perms", type=int, default=64, show_default=True, help="MinHash permutations per file")
+@click.option("--lsh-bands", type=int, default=16, show_default=True, help="Number of LSH bands")
+@click.option("--cache", "cache_path", type=click.Path(dir_okay=False), envvar="DUPLICATE_FINDER_CACHE", help="Signature cache file; only new or changed files are re-shingled")
+@click.option("--no-cache", is_flag=True, help="Ignore --cache / DUPLICATE_FINDER_CACHE for this run")
+@click.option("--workers", type=int, default=0, show_default=True, help="Parallel worker processes")
+@click.option("--io-threads", type=click.IntRange(min=0), default=4, show_default=True, help="Read-ahead threads per signing process (0 = read inline)")
+@click.option("--prefetch-depth", type=click.IntRange(min=1), default=None, help="Files read ahead per signing process (default 2 x --io-threads)")
+@_walk_options
+@_stats_options
+def build_index(path, out_path, ext, k, hash_backend, fingerprint, fingerprint_window, tokenizer, minhash_perms, lsh_bands, cache_path, no_cache, workers, io_threads, prefetch_depth, exclude, exclude_regex, ignore_file, no_default_ignores, min_file_size, stats, stats_json, profile_out):
+    """Build a saved LSH index of PATH for `check`."""
+    from .core import DuplicateFinder
+    from .index import SignatureIndex
+    ignore = _build_ignore(path, exclude, exclude_regex, ignore_file, no_default_ignores)
+    cache = _open_cache(cache_path, no_cache, False)
+    try:
+        finder = DuplicateFinder(k=k, hash_backend=hash_backend, compact=True, cache=cache, ignore=ignore, min_file_size=min_file_size, fingerprint=fingerprint, fingerprint_window=fingerprint_window, io_threads=io_threads, prefetch_depth=prefetch_depth, tokenizer=tokenizer)
+        index = SignatureIndex(perms=minhash_perms, bands=lsh_bands, config=finder._cache_config())
+    except ValueError as exc:
+        raise click.UsageError(str(exc))
+    with _run_stats(finder, stats, stats_json, profile_out):
+        index.add_many(finder.scan(os.path.abspath(path), _parse_extensions(ext), workers=workers))
+    _close_cache(cache)
+    index.save(out_path)
+    click.echo(f"Indexed {len(index)} files into {out_path}", err=True)
+
+@main.command()
+@click.argument("files", nargs=-1, type=click.Path())
+@click.option("--index", "index_path", type=click.Path(exists=True, dir_okay=False), required=True, help="Index written by `duplicate-finder index`")
+@click.option("--threshold", type=float, default=0.85, show_default=True, help="Similarity threshold (0-1)")
+@click.option("--ext", type=str, default=".py,.md,.txt", show_default=True, help="Only check files with these extensions (empty = all)")
+@click.option("--json", "--json-output", "json_output", is_flag=True, help="Emit JSON instead of table")
+def check(files, index_path, threshold, ext, json_output):
+    """Check FILES (or '-' for newline-separated paths on stdin) against a saved index.
+
+    Exit status: 0 when nothing matches, 1 when any file has a near-duplicate at or
+    above the threshold, 2 on usage errors. Only the given files are read and signed.
+    """
+    from .core import DuplicateFinder
+    from .index import SignatureIndex
+    paths = []
+    for f in files:
+        if f == "-":
+            paths.extend(line.strip() for line in sys.stdin if line.strip())
+        else:
+            paths.append(f)
+    ext_set = {e.lower() for e in _parse_extensions(ext)}
+    paths = [
+        os.path.abspath(p) for p in paths
+        if os.path.isfile(p) and (not ext_set or os.path.splitext(p)[1].lower() in ext_set)
+    ]
+    try:
+        index = SignatureIndex.load(index_path)
+        finder = DuplicateFinder(threshold=threshold, compact=True, io_threads=0, **json.loads(index.config))  # a handful of files: read inline
+    except ValueError as exc:
+        raise click.UsageError(str(exc))
+    matches = []
+    for sig in finder.sign_files(paths):
+        for sim, other in index.query(sig, threshold):
+            matches.append((sim, sig.path, other))
+    index.close()
     if json_output:
-        out = [
-            {
-                "schema_version": 1,
-                "similarity": round(sim, 4),
-                "file_a": a.path,
-                "file_b": b.path,
-                "tokens_a": a.size,
-                "tokens_b": b.size,
-            }
-            for sim, a, b in results
-        ]
-        click.echo(json.dumps(out, indent=2))
-    else:
-        if not results:
-            click.echo("No duplicates above threshold.")
-            return
-        width = 8
-        click.echo(f"{'SIM':<{width}} FILE_A | FILE_B")
+        click.echo(json.dumps([
+            {"schema_version": 1, "similarity": round(sim, 4), "file": path, "match": other}
+            for sim, path, other in matches
+        ], indent=2))
+    elif matches:
+        click.echo(f"{'SIM':<8} FILE | MATCH")
         click.echo("-" * 80)
-        for sim, a, b in results:
-            click.echo(f"{sim:<{width}.4f} {a.path} | {b.path}")
+        for sim, path, other in matches:
+            click.echo(f"{sim:<8.4f} {path} | {other}")
+    sys.exit(EXIT_DUPLICATES if matches else EXIT_CLEAN)
 
 if __name__ == "__main__":
     main()
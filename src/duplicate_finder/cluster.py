@@ -1,7 +1,9 @@
-from typing import List, Tuple, Dict, Set
-from .core import FileSignature
+from array import array
+from typing import TYPE_CHECKING, Iterable, List, Sequence, Tuple, Dict, Set
+if TYPE_CHECKING:  # core imports this module for its streaming cluster mode
+    from .core import FileSignature
 
-def build_clusters(pairs: List[Tuple[float, FileSignature, FileSignature]]):
+def build_clusters(pairs: List[Tuple[float, "FileSignature", "FileSignature"]]):
     """Convert pair list into cluster dicts.
     Returns list of clusters sorted by representative path.
     Cluster dict: {'representative': str, 'members': [paths], 'size': int, 'max_similarity': float}
@@ -41,3 +43,81 @@ def build_clusters(pairs: List[Tuple[float, FileSignature, FileSignature]]):
         })
     clusters.sort(key=lambda c: (c['representative'], -c['size']))
     return clusters
+
+
+class UnionFind:
+    """Array-backed disjoint sets over file indices (path compression, union by rank).
+    Each root also tracks its component size and the highest similarity merged into it,
+    so clusters can be emitted without keeping any pair.
+    """
+    def __init__(self, n: int = 0):
+        self.parent = array("q", range(n))
+        self.rank = array("B", bytes(n))
+        self.size = array("q", [1]) * n
+        self.max_sim = array("d", [0.0]) * n
+        self.linked = bytearray(n)  # 1 once the index appeared in any pair
+
+    def add(self) -> int:
+        """Append a singleton set and return its index."""
+        idx = len(self.parent)
+        self.parent.append(idx)
+        self.rank.append(0)
+        self.size.append(1)
+        self.max_sim.append(0.0)
+        self.linked.append(0)
+        return idx
+
+    def find(self, i: int) -> int:
+        parent = self.parent
+        root = i
+        while parent[root] != root:
+            root = parent[root]
+        while parent[i] != root:
+            parent[i], i = root, parent[i]
+        return root
+
+    def union(self, i: int, j: int, sim: float) -> int:
+        self.linked[i] = self.linked[j] = 1
+        ri, rj = self.find(i), self.find(j)
+        if ri != rj:
+            if self.rank[ri] < self.rank[rj]:
+                ri, rj = rj, ri
+            self.parent[rj] = ri
+            if self.rank[ri] == self.rank[rj]:
+                self.rank[ri] += 1
+            self.size[ri] += self.size[rj]
+            self.max_sim[ri] = max(self.max_sim[ri], self.max_sim[rj])
+        self.max_sim[ri] = max(self.max_sim[ri], sim)
+        return ri
+
+    def clusters(self, paths: Sequence[str]) -> List[dict]:
+        """Cluster dicts (same shape and order as `build_clusters`) for linked indices."""
+        members: Dict[int, List[str]] = {}
+        for i, linked in enumerate(self.linked):
+            if linked:
+                members.setdefault(self.find(i), []).append(paths[i])
+        clusters = []
+        for root, names in members.items():
+            names.sort()
+            clusters.append({
+                'representative': names[0],
+                'members': names,
+                'size': len(names),
+                'max_similarity': self.max_sim[root],
+            })
+        clusters.sort(key=lambda c: (c['representative'], -c['size']))
+        return clusters
+
+
+def build_clusters_streaming(pairs: Iterable[Tuple[float, "FileSignature", "FileSignature"]]):
+    """`build_clusters` for a pair stream: union-find over paths, memory O(files)."""
+    ids: Dict[str, int] = {}
+    paths: List[str] = []
+    uf = UnionFind()
+    for sim, a, b in pairs:
+        for path in (a.path, b.path):
+            if path not in ids:
+                ids[path] = uf.add()
+                paths.append(path)
+        uf.union(ids[a.path], ids[b.path], sim)
+    return uf.clusters(paths)
@@ -1,17 +1,46 @@
 import hashlib
+import heapq
+import json
 import os
-import re
+import time
+from collections import deque
 from dataclasses import dataclass
-from typing import Iterable, List, Set, Tuple, Optional
-from concurrent.futures import ProcessPoolExecutor
-from .minhash import minhash_signature, lsh_candidates
+from itertools import chain
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Set, Tuple, Optional
+from .minhash import default_estimate_band, estimate_candidates, minhash_matrix, lsh_candidate_pairs, tune_lsh
+from .hashing import ShingleAccumulator, shingle_fingerprints, token_hasher, validate_fingerprint
+from .cache import SignatureCache, unpack_uint64
+from .arena import ArenaBatch, discard_arena, read_arena, start_tracker, write_arena
+from .prefetch import FileData, iter_text_chunks, prefetch
+from .verify import iter_verified
+from .join import prefix_filter_pairs
+from .cluster import UnionFind
+from .exact import ContentGrouper
+from .ignore import IgnoreMatcher, walk_files
+from .frequency import ShingleFrequency, drop_shingles
+from .stats import FileStats, RunStats
+from .tokenizers import TOKEN_RE, tokenizer_for, validate_tokenizer
+from .similarity import compute_jaccard as compute_jaccard, sorted_jaccard as sorted_jaccard  # moved; still importable here
 
-TOKEN_RE = re.compile(r"[A-Za-z0-9_]+")
+READ_CHUNK = 1 << 20  # characters per streamed read
+# Parallel signing dispatches batches of about this many bytes (or files, whichever first).
+SIGN_BATCH_BYTES = 4 << 20
+SIGN_BATCH_FILES = 512
+SIGN_INFLIGHT_PER_WORKER = 2  # batches submitted ahead of the one being collected
 
 def read_file(path: str) -> str:
     with open(path, "r", encoding="utf-8", errors="ignore") as f:
         return f.read()
 
+def iter_file_chunks(path: str, chunk_size: Optional[int] = None) -> Iterator[str]:
+    chunk_size = chunk_size or READ_CHUNK
+    with open(path, "r", encoding="utf-8", errors="ignore") as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
 def normalize(text: str) -> str:
     return " ".join(text.split())
 
@@ -27,96 +56,444 @@ def shingle_hash(shingle: Tuple[str, ...]) -> int:
     h = hashlib.md5("::".join(shingle).encode("utf-8")).hexdigest()
     return int(h, 16)
 
-def hashed_shingles(tokens: List[str], k: int = 5) -> Set[int]:
-    return {shingle_hash(s) for s in make_shingles(tokens, k)}
-
-def compute_jaccard(a: Set[int], b: Set[int]) -> float:
-    if not a and not b:
-        return 1.0
-    if not a or not b:
-        return 0.0
-    inter = len(a & b)
-    union = len(a | b)
-    return inter / union if union else 0.0
+def hashed_shingles(tokens: List[str], k: int = 5, backend: str = "blake2b") -> Set[int]:
+    # Rolling 64-bit window hashes; make_shingles/shingle_hash remain as the MD5 reference.
+    return set(shingle_fingerprints(tokens, k, backend).tolist())
 
 @dataclass
 class FileSignature:
+    # shingles: set of ints, or a sorted unique uint64 buffer in compact mode
+    __slots__ = ("path", "shingles", "size")
     path: str
     shingles: Set[int]
     size: int
 
-def _compute_file_signature(args):
-    path, k = args
+class _SignOptions(NamedTuple):
+    k: int
+    backend: str
+    compact: bool
+    max_file_size: Optional[int]
+    fingerprint: str = "all"
+    fingerprint_window: int = 0
+    io_threads: int = 0  # read-ahead threads per signing process (0 = read inline)
+    prefetch_depth: int = 0  # files read ahead at most
+    tokenizer: str = "regex"
+
+def _signature_from_chunks(path: str, chunks: Iterable[str], opts: _SignOptions, tally: Optional[FileStats] = None) -> FileSignature:
+    # Streamed: chunked text -> incremental tokens -> rolling window hashes.
+    # Whitespace normalization is implied, tokens never contain whitespace.
+    # Each stage is timed per chunk batch (about 1 MB), so the clock calls cost nothing.
+    tally = tally if tally is not None else FileStats()
+    acc = ShingleAccumulator(opts.k, opts.backend, opts.fingerprint, opts.fingerprint_window)
+    read = tokenize = hashed = 0.0
+
+    def timed_chunks() -> Iterator[str]:
+        nonlocal read
+        it = iter(chunks)
+        while True:
+            start = time.perf_counter()
+            chunk = next(it, None)
+            read += time.perf_counter() - start
+            if chunk is None:
+                return
+            yield chunk
+
+    batches = tokenizer_for(path, opts.tokenizer).batches(timed_chunks())
+    while True:
+        start = time.perf_counter()
+        tokens = next(batches, None)
+        mid = time.perf_counter()
+        tokenize += mid - start
+        if tokens is None:
+            break
+        acc.update(tokens)
+        hashed += time.perf_counter() - mid
+    start = time.perf_counter()
+    sh = acc.result()
+    if not opts.compact:
+        sh = set(sh.tolist())
+    tally.add_time("read", read)
+    tally.add_time("tokenize", tokenize - read)  # reads happen inside the tokenizer's pulls
+    tally.add_time("hash", hashed + time.perf_counter() - start)
+    tally.add("files_signed")
+    tally.add("tokens", acc.tokens)
+    tally.add("shingles", len(sh))
+    return FileSignature(path=path, shingles=sh, size=acc.tokens)
+
+def _compute_file_signature(args, tally: Optional[FileStats] = None):
+    """Sign one file read inline; None when it is too large or fails (counted in `tally`)."""
+    path, opts = args
+    tally = tally if tally is not None else FileStats()
     try:
-        text = normalize(read_file(path))
-        tokens = tokenize(text)
-        sh = hashed_shingles(tokens, k)
-        return FileSignature(path=path, shingles=sh, size=len(tokens))
-    except Exception:
+        size = os.path.getsize(path)
+        if opts.max_file_size is not None and size > opts.max_file_size:
+            tally.add("files_too_large")
+            return None
+        tally.add("bytes_read", size)
+        return _signature_from_chunks(path, iter_file_chunks(path), opts, tally)
+    except Exception as exc:
+        tally.fail(path, exc)
         return None
 
+def _sign_prefetched(files: Iterable[str], opts: _SignOptions, tally: Optional[FileStats] = None) -> Iterator[Optional[FileSignature]]:
+    """Sign `files` in order while I/O threads read ahead (opts.io_threads, bounded by
+    opts.prefetch_depth); tokenizing and hashing stay on the calling thread."""
+    tally = tally if tally is not None else FileStats()
+    if opts.io_threads <= 0:
+        for f in files:
+            yield _compute_file_signature((f, opts), tally)
+        return
+    for path, data in prefetch(files, opts.io_threads, opts.prefetch_depth, opts.max_file_size):
+        if data is None:
+            tally.add("files_too_large")
+            yield None
+            continue
+        if not isinstance(data, FileData):
+            tally.fail(path, data)
+            yield None
+            continue
+        tally.add("bytes_read", len(data.view))
+        tally.add_time("read", data.seconds)  # on the I/O thread, overlapping the others
+        try:
+            sig = _signature_from_chunks(path, iter_text_chunks(data), opts, tally)
+        except Exception as exc:
+            tally.fail(path, exc)
+            sig = None
+        yield sig
+
+def _size_batches(files: Iterable[str], sizes: Optional[Dict[str, int]] = None) -> Iterator[List[str]]:
+    """Group paths into batches of about SIGN_BATCH_BYTES (at most SIGN_BATCH_FILES files),
+    yielding each batch as soon as it is full. Sizes recorded by the walk are used (and
+    dropped) when available; other paths are stat'ed."""
+    batch: List[str] = []
+    size = 0
+    for f in files:
+        batch.append(f)
+        known = sizes.pop(f, None) if sizes is not None else None
+        if known is not None:
+            size += known
+        else:
+            try:
+                size += os.path.getsize(f)
+            except OSError:
+                pass
+        if size >= SIGN_BATCH_BYTES or len(batch) >= SIGN_BATCH_FILES:
+            yield batch
+            batch, size = [], 0
+    if batch:
+        yield batch
+
+def _sign_batch(paths: List[str], opts: _SignOptions) -> Tuple[List[int], ArenaBatch, Dict]:
+    """Worker: sign a batch and hand its shingle arrays back through a shared-memory arena,
+    along with the batch's counters and stage times."""
+    tally = FileStats()
+    sigs = list(_sign_prefetched(paths, opts._replace(compact=True), tally))
+    tokens = [sig.size if sig else -1 for sig in sigs]
+    return tokens, write_arena([sig.shingles if sig else None for sig in sigs]), tally.as_dict()
+
+def _unpack_batch(paths: List[str], tokens: List[int], batch: ArenaBatch, compact: bool) -> List[Optional[FileSignature]]:
+    out: List[Optional[FileSignature]] = []
+    for path, count, shingles in zip(paths, tokens, read_arena(batch)):
+        if shingles is None:
+            out.append(None)
+            continue
+        if not compact:
+            shingles = set(shingles.tolist())
+        out.append(FileSignature(path=path, shingles=shingles, size=count))
+    return out
+
+def _compute_parallel(files: Iterable[str], opts: _SignOptions, workers: int, stats: RunStats, sizes: Optional[Dict[str, int]] = None) -> List[Optional[FileSignature]]:
+    """Sign on a process pool in size-balanced batches; one IPC round trip per batch and
+    only offsets are pickled. Batches are submitted as discovery fills them, with at most
+    SIGN_INFLIGHT_PER_WORKER per worker outstanding, which also bounds the number of live
+    shared-memory segments. Batches the pool could not finish are signed serially."""
+    from concurrent.futures import ProcessPoolExecutor  # multiprocessing only when used
+    from concurrent.futures.process import BrokenProcessPool
+    batches = _size_batches(files, sizes)
+    pending: deque = deque()  # [batch, future] in submission order; future None until submitted
+    results: List[Optional[FileSignature]] = []
+
+    def collect() -> None:
+        batch, fut = pending[0]
+        tokens, arena, tally = fut.result()
+        pending.popleft()
+        results.extend(_unpack_batch(batch, tokens, arena, opts.compact))
+        stats.merge(tally)
+
+    try:
+        start_tracker()
+        with ProcessPoolExecutor(max_workers=workers) as ex:
+            for batch in batches:
+                pending.append([batch, None])  # queued first: a failing submit must not lose it
+                pending[-1][1] = ex.submit(_sign_batch, batch, opts)
+                if len(pending) >= workers * SIGN_INFLIGHT_PER_WORKER:
+                    collect()
+            while pending:
+                collect()
+    except (OSError, BrokenProcessPool):
+        for _, fut in pending:
+            if fut is not None and fut.done() and not fut.cancelled() and fut.exception() is None:
+                discard_arena(fut.result()[1])  # finished but never read: free its segment
+        tally = FileStats()
+        for batch in chain([b for b, _ in pending], batches):
+            results.extend(_sign_prefetched(batch, opts, tally))
+        stats.merge(tally.as_dict())
+    return results
+
 class DuplicateFinder:
-    def __init__(self, k: int = 5, threshold: float = 0.85):
+    def __init__(self, k: int = 5, threshold: float = 0.85, hash_backend: str = "blake2b", compact: bool = False, cache: Optional[SignatureCache] = None, max_file_size: Optional[int] = None, exact_fastpath: bool = True, ignore: Optional[IgnoreMatcher] = None, min_file_size: Optional[int] = None, fingerprint: str = "all", fingerprint_window: int = 8, io_threads: int = 4, prefetch_depth: Optional[int] = None, tokenizer: str = "regex"):
         self.k = k
         self.threshold = threshold
+        token_hasher(hash_backend)  # fail fast on unknown / unavailable backends
+        validate_fingerprint(fingerprint, fingerprint_window)
+        validate_tokenizer(tokenizer)
+        self.tokenizer = tokenizer  # "regex" everywhere, or "auto": chosen by file extension
+        self.hash_backend = hash_backend
+        self.fingerprint = fingerprint
+        self.fingerprint_window = fingerprint_window if fingerprint != "all" else 0
+        self.compact = compact
+        self.max_file_size = max_file_size  # bytes; larger files are skipped
+        self.min_file_size = min_file_size  # bytes; smaller files are skipped during the walk
+        self.ignore = ignore
+        self.io_threads = io_threads  # read-ahead threads per signing process
+        self.prefetch_depth = prefetch_depth if prefetch_depth is not None else 2 * max(1, io_threads)
+        self.exact_fastpath = exact_fastpath
+        self.cache = cache
+        self.prefilter_stats: Dict[str, float] = {}  # LSH layout and candidate counts of the last match
+        self.filter_stats: Dict[str, int] = {}  # last drop_common_shingles call
+        self.stats = RunStats()  # counters and stage times, accumulated over every call
+        if cache is not None:
+            cache.configure(self._cache_config())
+
+    def signature_settings(self) -> Dict[str, object]:
+        """Constructor arguments that change a file's shingle set; recorded by the
+        signature cache and saved indexes so they are only reused with matching settings."""
+        settings: Dict[str, object] = {"k": self.k, "hash_backend": self.hash_backend}
+        if self.fingerprint != "all":
+            settings.update(fingerprint=self.fingerprint, fingerprint_window=self.fingerprint_window)
+        if self.tokenizer != "regex":
+            settings["tokenizer"] = self.tokenizer
+        return settings
+
+    def _cache_config(self) -> str:
+        return json.dumps(self.signature_settings(), sort_keys=True)
+
+    def iter_files(self, root: str, extensions: Iterable[str], sizes: Optional[Dict[str, int]] = None) -> Iterator[str]:
+        """Yield matching paths as the walk finds them; ignored subtrees are never listed.
+        `sizes`, when given, receives each path's size from the walk's own stat."""
+        return walk_files(root, extensions, self.ignore, self.min_file_size, self.max_file_size, self.stats, sizes)
 
     def _gather_files(self, root: str, extensions: Iterable[str]) -> List[str]:
-        ext_set = {e.lower() for e in extensions}
-        out: List[str] = []
-        for dirpath, _, filenames in os.walk(root):
-            for name in filenames:
-                fp = os.path.join(dirpath, name)
-                _, ext = os.path.splitext(name)
-                if not ext_set or ext.lower() in ext_set:
-                    out.append(fp)
-        return out
+        return list(self.iter_files(root, extensions))
 
-    def scan(self, root: str, extensions: Iterable[str], min_tokens: int = 0, workers: int = 0) -> List[FileSignature]:
-        files = self._gather_files(root, extensions)
-        sigs: List[FileSignature] = []
+    def _compute_signatures(self, files: Iterable[str], workers: int, sizes: Optional[Dict[str, int]] = None) -> List[Optional[FileSignature]]:
+        opts = _SignOptions(self.k, self.hash_backend, self.compact, self.max_file_size, self.fingerprint, self.fingerprint_window, self.io_threads, self.prefetch_depth, self.tokenizer)
         if workers and workers > 1:
-            with ProcessPoolExecutor(max_workers=workers) as ex:
-                for sig in ex.map(_compute_file_signature, [(f, self.k) for f in files]):
-                    if sig and sig.size >= min_tokens:
-                        sigs.append(sig)
-        else:
-            for f in files:
-                sig = _compute_file_signature((f, self.k))
-                if sig and sig.size >= min_tokens:
-                    sigs.append(sig)
+            return _compute_parallel(files, opts, workers, self.stats, sizes)
+        tally = FileStats()
+        sigs = list(_sign_prefetched(files, opts, tally))
+        self.stats.merge(tally.as_dict())
         return sigs
 
-    def find_duplicates(self, signatures: List[FileSignature], prefilter: bool = False, minhash_perms: int = 64, lsh_bands: int = 16) -> List[Tuple[float, FileSignature, FileSignature]]:
-        n = len(signatures)
-        if n < 2:
-            return []
+    def _cached_signature(self, path: str) -> Optional[FileSignature]:
+        hit = self.cache.lookup(path)
+        if hit is None:
+            return None
+        tokens, blob = hit
+        shingles = unpack_uint64(blob)
+        if not self.compact:
+            shingles = set(shingles.tolist())
+        return FileSignature(path=path, shingles=shingles, size=tokens)
+
+    def sign_files(self, files: Iterable[str], workers: int = 0, sizes: Optional[Dict[str, int]] = None) -> List[FileSignature]:
+        """Signatures for `files` in input order; unreadable or oversized files are dropped.
+        `files` may be a lazy iterable: paths are dispatched as they are produced. `sizes`
+        may hold byte sizes already known for them (see `iter_files`); entries are consumed."""
+        order: List[str] = []
+        by_path: Dict[str, FileSignature] = {}
+        grouper = ContentGrouper() if self.exact_fastpath else None
+
+        def misses() -> Iterator[str]:
+            for f in files:
+                order.append(f)
+                if grouper is not None and grouper.add(f) is not None:
+                    self.stats.add("exact_copies")
+                    if sizes is not None:
+                        sizes.pop(f, None)
+                    continue  # byte-identical to an earlier file: share its signature
+                if self.cache is not None:
+                    sig = self._cached_signature(f)
+                    if sig is not None:
+                        self.stats.add("cache_hits")
+                        by_path[f] = sig
+                        if sizes is not None:
+                            sizes.pop(f, None)
+                        continue
+                yield f
+
+        computed = [sig for sig in self._compute_signatures(misses(), workers, sizes) if sig]
+        if self.cache is not None:
+            self.cache.store(computed)
+        by_path.update((sig.path, sig) for sig in computed)
+        if grouper is not None:
+            for copy, rep in grouper.copies.items():
+                rep_sig = by_path.get(rep)
+                if rep_sig is not None:
+                    by_path[copy] = FileSignature(path=copy, shingles=rep_sig.shingles, size=rep_sig.size)
+        return [by_path[f] for f in order if f in by_path]
+
+    def scan(self, root: str, extensions: Iterable[str], min_tokens: int = 0, workers: int = 0) -> List[FileSignature]:
+        seen: List[str] = []
+        sizes: Optional[Dict[str, int]] = {} if workers and workers > 1 else None  # batches by size
+
+        def discovered() -> Iterator[str]:
+            for f in self.stats.timed("discovery", self.iter_files(root, extensions, sizes)):
+                seen.append(f)
+                yield f
+
+        sigs = self.sign_files(discovered(), workers=workers, sizes=sizes)
+        self.stats.add("files_discovered", len(seen))
+        if self.cache is not None:
+            self.cache.evict_missing(root, seen)
+        kept = [sig for sig in sigs if sig.size >= min_tokens]
+        self.stats.add("files_below_min_tokens", len(sigs) - len(kept))
+        return kept
+
+    def shingle_frequency(self, signatures: List[FileSignature]) -> ShingleFrequency:
+        """Document frequency over `signatures`, counting byte-identical copies once."""
+        unique = {id(sig.shingles): sig.shingles for sig in signatures}
+        return ShingleFrequency.count(unique.values(), self._cache_config())
+
+    def drop_common_shingles(self, signatures: List[FileSignature], max_df: float, min_docs: int = 10, frequency: Optional[ShingleFrequency] = None) -> List[FileSignature]:
+        """Remove boilerplate shingles (license headers, import blocks, ...) found in more
+        than `max_df` of the files before MinHash and Jaccard. `frequency` may be a table
+        saved by an earlier run. Files made only of common shingles keep their full set,
+        otherwise they would all compare equal; copies keep sharing one shingles object."""
+        if frequency is None:
+            frequency = self.shingle_frequency(signatures)
+        common = frequency.common(max_df, min_docs)
+        unique = {id(sig.shingles): sig.shingles for sig in signatures}
+        filtered = {}
+        kept = 0
+        for key, shingles in unique.items():
+            reduced = drop_shingles(shingles, common)
+            if not len(reduced) and len(shingles):
+                reduced = shingles
+                kept += 1
+            filtered[key] = reduced
+        self.filter_stats = {
+            "docs": frequency.docs,
+            "cutoff_docs": frequency.cutoff(max_df, min_docs),
+            "common_shingles": len(common),
+            "shingles_before": sum(len(sh) for sh in unique.values()),
+            "shingles_after": sum(len(sh) for sh in filtered.values()),
+            "all_common_files": kept,
+        }
+        return [FileSignature(path=sig.path, shingles=filtered[id(sig.shingles)], size=sig.size) for sig in signatures]
+
+    def _rep_matches(self, signatures: List[FileSignature], prefilter: bool, minhash_perms: int, lsh_bands: int, minhash_engine: str, workers: int, lsh_recall: Optional[float], lsh_max_bucket: Optional[int], estimate: bool = False, estimate_band: Optional[float] = None):
+        """Collapse byte-identical copies (they share one shingles object, see sign_files)
+        and return (copy groups, stream of (sim, group_i, group_j) verified matches).
+        With `estimate` (LSH path only), candidates are first scored by MinHash agreement and
+        only those within `estimate_band` of the threshold get exact Jaccard."""
+        groups: Dict[int, List[int]] = {}
+        for idx, sig in enumerate(signatures):
+            groups.setdefault(id(sig.shingles), []).append(idx)
+        members = list(groups.values())
+        reps = [signatures[m[0]] for m in members]
+        n = len(reps)
         # Determine candidate pairs
+        self.prefilter_stats = {}
+        estimated: List[Tuple[float, int, int]] = []
         if prefilter and n > 50:  # threshold to benefit from LSH
-            # Build MinHash signatures
-            mh_sigs = [minhash_signature(sig.shingles, minhash_perms) for sig in signatures]
-            cand_pairs = lsh_candidates(mh_sigs, lsh_bands)
-            # Guarantee we don't miss trivially identical cases by adding exact hash bucket quick path
-            if n < 5000:  # small overhead: add identical shingle set matches
-                shingle_map = {}
-                for idx, sig in enumerate(signatures):
-                    key = tuple(sorted(sig.shingles))
-                    shingle_map.setdefault(key, []).append(idx)
-                for idxs in shingle_map.values():
-                    if len(idxs) > 1:
-                        for i in range(len(idxs)):
-                            for j in range(i+1, len(idxs)):
-                                a, b = idxs[i], idxs[j]
-                                if a > b: a, b = b, a
-                                cand_pairs.add((a, b))
+            if lsh_recall is not None:
+                tuned = tune_lsh(self.threshold, lsh_recall)
+                minhash_perms, lsh_bands = tuned.perms, tuned.bands
+                self.prefilter_stats.update(tuned._asdict())
+            # Build MinHash signatures; identical shingle sets always share every band
+            with self.stats.stage("minhash"):
+                if self.cache is not None:
+                    mh_sigs = self.cache.minhash_matrix(reps, minhash_perms, minhash_engine)
+                else:
+                    mh_sigs = minhash_matrix([sig.shingles for sig in reps], minhash_perms, engine=minhash_engine)
+            with self.stats.stage("lsh"):
+                cand_pairs = lsh_candidate_pairs(mh_sigs, lsh_bands, lsh_max_bucket, self.prefilter_stats)
+            self.prefilter_stats["pairs"] = n * (n - 1) // 2
+            self.stats.add("candidate_pairs", len(cand_pairs))
+            if estimate:
+                if estimate_band is None:
+                    estimate_band = default_estimate_band(self.threshold, len(mh_sigs[0]))
+                self.prefilter_stats["estimate_band"] = estimate_band
+                with self.stats.stage("verify"):
+                    estimated, cand_pairs = estimate_candidates(mh_sigs, cand_pairs, self.threshold, estimate_band, self.prefilter_stats)
+                for key in ("estimate_accepted", "estimate_uncertain", "estimate_rejected"):
+                    self.stats.add(key, self.prefilter_stats[key])
         else:
-            cand_pairs = {(i, j) for i in range(n) for j in range(i+1, n)}
-
-        results: List[Tuple[float, FileSignature, FileSignature]] = []
-        for i, j in cand_pairs:
-            a = signatures[i]
-            b = signatures[j]
-            sim = compute_jaccard(a.shingles, b.shingles)
-            if sim >= self.threshold:
-                results.append((sim, a, b))
-        results.sort(key=lambda x: (-x[0], x[1].path, x[2].path))
-        return results
+            # exact: only pairs that pass the size and rare-prefix filters can reach the threshold
+            with self.stats.stage("join"):
+                cand_pairs = prefix_filter_pairs([sig.shingles for sig in reps], self.threshold)
+            self.stats.add("candidate_pairs", n * (n - 1) // 2 if cand_pairs is None else len(cand_pairs))
+        self.stats.add("all_pairs", n * (n - 1) // 2)
+        matches = self.stats.timed("verify", iter_verified([sig.shingles for sig in reps], cand_pairs, self.threshold, workers=workers))
+        return members, chain(estimated, matches)
+
+    def iter_duplicates(self, signatures: List[FileSignature], prefilter: bool = False, minhash_perms: int = 64, lsh_bands: int = 16, minhash_engine: str = "fast", workers: int = 0, lsh_recall: Optional[float] = None, lsh_max_bucket: Optional[int] = None, estimate: bool = False, estimate_band: Optional[float] = None) -> Iterator[Tuple[float, FileSignature, FileSignature]]:
+        """Yield (similarity, a, b) as pairs are verified, in no particular order; `a` comes
+        before `b` in `signatures`. Use `rank_duplicates` when an ordering is needed.
+        With `estimate`, similarities decided from MinHash alone are `EstimatedSimilarity`
+        floats (their `estimated` attribute is True)."""
+        if len(signatures) < 2:
+            return
+        members, matches = self._rep_matches(signatures, prefilter, minhash_perms, lsh_bands, minhash_engine, workers, lsh_recall, lsh_max_bucket, estimate, estimate_band)
+        if self.threshold <= 1.0:  # copies of one content are identical
+            for m in members:
+                for x in range(len(m)):
+                    for y in range(x + 1, len(m)):
+                        yield 1.0, signatures[m[x]], signatures[m[y]]
+        for sim, ri, rj in matches:
+            self.stats.add("verified_matches")
+            for a in members[ri]:
+                for b in members[rj]:
+                    yield sim, signatures[min(a, b)], signatures[max(a, b)]
+
+    def find_duplicates(self, signatures: List[FileSignature], prefilter: bool = False, minhash_perms: int = 64, lsh_bands: int = 16, minhash_engine: str = "fast", workers: int = 0, lsh_recall: Optional[float] = None, lsh_max_bucket: Optional[int] = None, estimate: bool = False, estimate_band: Optional[float] = None) -> List[Tuple[float, FileSignature, FileSignature]]:
+        return rank_duplicates(self.iter_duplicates(signatures, prefilter, minhash_perms, lsh_bands, minhash_engine, workers, lsh_recall, lsh_max_bucket, estimate, estimate_band))
+
+    def find_clusters(self, signatures: List[FileSignature], prefilter: bool = False, minhash_perms: int = 64, lsh_bands: int = 16, minhash_engine: str = "fast", workers: int = 0, lsh_recall: Optional[float] = None, lsh_max_bucket: Optional[int] = None, estimate: bool = False, estimate_band: Optional[float] = None) -> List[dict]:
+        """Same output as build_clusters(find_duplicates(...)), but verified pairs stream
+        straight into a union-find over file indices: memory scales with file count, not
+        pair count."""
+        uf = UnionFind(len(signatures))
+        if len(signatures) < 2:
+            return []
+        members, matches = self._rep_matches(signatures, prefilter, minhash_perms, lsh_bands, minhash_engine, workers, lsh_recall, lsh_max_bucket, estimate, estimate_band)
+        start, verify_before = time.perf_counter(), self.stats.timings["verify"]
+        if self.threshold <= 1.0:
+            for m in members:
+                for other in m[1:]:
+                    uf.union(m[0], other, 1.0)
+        for sim, ri, rj in matches:
+            self.stats.add("verified_matches")
+            # every copy already shares its representative's set
+            uf.union(members[ri][0], members[rj][0], sim)
+        clusters = uf.clusters([sig.path for sig in signatures])
+        # union-find work only: verification pulled inside the loop is charged to "verify"
+        self.stats.add_time("cluster", time.perf_counter() - start - (self.stats.timings["verify"] - verify_before))
+        return clusters
+
+    def stats_report(self) -> Dict[str, object]:
+        """JSON-ready run statistics: counters, stage times, peak RSS, plus the LSH and
+        document-frequency filter details of the last match / filter call."""
+        return self.stats.to_dict(lsh=self.prefilter_stats, df_filter=self.filter_stats)
+
+
+def _pair_order(pair: Tuple[float, FileSignature, FileSignature]):
+    return -pair[0], pair[1].path, pair[2].path
+
+
+def rank_duplicates(pairs: Iterable[Tuple[float, FileSignature, FileSignature]], top: Optional[int] = None) -> List[Tuple[float, FileSignature, FileSignature]]:
+    """Most similar first (ties by path). With `top`, keep only that many via a bounded
+    heap instead of sorting every pair."""
+    if top is not None:
+        return heapq.nsmallest(top, pairs, key=_pair_order)
+    return sorted(pairs, key=_pair_order)
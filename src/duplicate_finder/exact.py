@@ -0,0 +1,81 @@
+import hashlib
+import os
+from typing import Dict, Optional, Union
+
+SAMPLE_BYTES = 4096
+_DIGEST_CHUNK = 1 << 20
+
+
+class _Entry:
+    __slots__ = ("path", "size", "_sample", "_digest")
+
+    def __init__(self, path: str, size: int):
+        self.path = path
+        self.size = size
+        self._sample: Optional[bytes] = None
+        self._digest: Optional[bytes] = None
+
+    def sample(self) -> bytes:
+        """Hash of the first and last SAMPLE_BYTES; covers the whole file when small."""
+        if self._sample is None:
+            h = hashlib.blake2b(digest_size=16)
+            with open(self.path, "rb") as f:
+                h.update(f.read(SAMPLE_BYTES))
+                if self.size > 2 * SAMPLE_BYTES:
+                    f.seek(-SAMPLE_BYTES, os.SEEK_END)
+                    h.update(f.read(SAMPLE_BYTES))
+                elif self.size > SAMPLE_BYTES:
+                    h.update(f.read())
+            self._sample = h.digest()
+        return self._sample
+
+    def digest(self) -> bytes:
+        if self._digest is None:
+            if self.size <= 2 * SAMPLE_BYTES:
+                self._digest = self.sample()
+            else:
+                h = hashlib.blake2b(digest_size=16)
+                with open(self.path, "rb") as f:
+                    for chunk in iter(lambda: f.read(_DIGEST_CHUNK), b""):
+                        h.update(chunk)
+                self._digest = h.digest()
+        return self._digest
+
+
+class ContentGrouper:
+    """Streaming byte-identity detection for the scan's first stage.
+    Files are bucketed by size; only on a size collision is a head/tail sample hashed,
+    and only on a sample collision is the full content hashed. The first file of each
+    distinct content is its group's representative. Each level is a dict holding a lone
+    entry until a second file arrives, so every add is one lookup per level.
+    """
+    def __init__(self):
+        # size -> entry | {sample -> entry | {digest -> entry}}
+        self._by_size: Dict[int, Union[_Entry, Dict[bytes, Union[_Entry, Dict[bytes, _Entry]]]]] = {}
+        self.copies: Dict[str, str] = {}  # copy path -> representative path
+
+    def add(self, path: str) -> Optional[str]:
+        """Return the representative `path` is byte-identical to, or None if it is new."""
+        try:
+            size = os.stat(path).st_size
+            entry = _Entry(path, size)
+            by_sample = self._by_size.get(size)
+            if by_sample is None:
+                self._by_size[size] = entry
+                return None
+            if isinstance(by_sample, _Entry):
+                by_sample = self._by_size[size] = {by_sample.sample(): by_sample}
+            key = entry.sample()
+            by_digest = by_sample.get(key)
+            if by_digest is None:
+                by_sample[key] = entry
+                return None
+            if isinstance(by_digest, _Entry):
+                by_digest = by_sample[key] = {by_digest.digest(): by_digest}
+            rep = by_digest.setdefault(entry.digest(), entry)
+        except OSError:
+            return None
+        if rep is entry:
+            return None
+        self.copies[path] = rep.path
+        return rep.path
@@ -0,0 +1,108 @@
+import json
+import math
+import os
+import struct
+from array import array
+from collections import Counter
+from typing import Iterable
+from ._optional import numpy_or_none
+from .cache import pack_uint64, unpack_uint64
+from .similarity import _is_set
+
+_MAGIC = b"DFDFT001"
+_U64 = struct.Struct("<Q")
+
+
+_MASK64 = (1 << 64) - 1  # set shingles outside uint64 wrap, as in minhash._as_uint64
+
+
+def _as_uint64(np, shingles):
+    if _is_set(shingles):
+        return np.fromiter((s & _MASK64 for s in shingles), dtype=np.uint64, count=len(shingles))
+    return np.asarray(shingles, dtype=np.uint64)
+
+
+class ShingleFrequency:
+    """Document frequency of hashed shingles across a corpus.
+    Only shingles found in two or more documents are kept (the rest can never be common),
+    as parallel sorted arrays of shingle values and counts. Tables written with `save`
+    record the signature settings they were counted under.
+    """
+    def __init__(self, docs: int = 0, keys=None, counts=None, config: str = ""):
+        self.docs = docs
+        self.config = config
+        self.keys = keys if keys is not None else array("Q")
+        self.counts = counts if counts is not None else array("Q")
+
+    @classmethod
+    def count(cls, shingle_sets: Iterable, config: str = "") -> "ShingleFrequency":
+        """Count each collection of unique shingles (set or sorted uint64 buffer) once."""
+        np = numpy_or_none()
+        sets = list(shingle_sets)
+        if np is not None:
+            parts = [_as_uint64(np, s) for s in sets]
+            values, counts = np.unique(np.concatenate(parts) if parts else np.empty(0, dtype=np.uint64), return_counts=True)
+            shared = counts > 1
+            return cls(len(sets), values[shared], counts[shared].astype(np.uint64), config)
+        tally: Counter = Counter()
+        for s in sets:
+            if _is_set(s):
+                s = [v & _MASK64 for v in s]
+            tally.update(s)
+        common = sorted((v, c) for v, c in tally.items() if c > 1)
+        return cls(len(sets), array("Q", [v for v, _ in common]), array("Q", [c for _, c in common]), config)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def cutoff(self, max_df: float, min_docs: int = 10) -> int:
+        """Shingles in more than this many documents count as boilerplate."""
+        return max(min_docs, math.floor(max_df * self.docs))
+
+    def common(self, max_df: float, min_docs: int = 10):
+        """Sorted shingles found in more than `max_df` of the documents (and in more than
+        `min_docs` of them, so small corpora keep the overlap between true duplicates)."""
+        limit = self.cutoff(max_df, min_docs)
+        np = numpy_or_none()
+        if np is not None:
+            return np.asarray(self.keys, dtype=np.uint64)[np.asarray(self.counts, dtype=np.uint64) > limit]
+        return array("Q", [k for k, c in zip(self.keys, self.counts) if c > limit])
+
+    def save(self, path: str) -> None:
+        header = json.dumps({"docs": self.docs, "config": self.config, "n": len(self.keys)}).encode("utf-8")
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(_MAGIC)
+            f.write(_U64.pack(len(header)))
+            f.write(header)
+            f.write(pack_uint64(self.keys))
+            f.write(pack_uint64(self.counts))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str) -> "ShingleFrequency":
+        with open(path, "rb") as f:
+            data = f.read()
+        if data[:8] != _MAGIC:
+            raise ValueError(f"Not a shingle frequency table: {path}")
+        (header_len,) = _U64.unpack(data[8:16])
+        header = json.loads(data[16:16 + header_len].decode("utf-8"))
+        pos, n = 16 + header_len, header["n"]
+        keys = unpack_uint64(data[pos:pos + 8 * n])
+        counts = unpack_uint64(data[pos + 8 * n:pos + 16 * n])
+        return cls(header["docs"], keys, counts, header["config"])
+
+
+def drop_shingles(shingles, common):
+    """`shingles` minus the sorted `common` values, in the same representation."""
+    if not len(common):
+        return shingles
+    if _is_set(shingles):
+        drop = set(common.tolist())
+        return shingles.difference([s for s in shingles if s & _MASK64 in drop])
+    np = numpy_or_none()
+    if np is not None:
+        return np.setdiff1d(np.asarray(shingles, dtype=np.uint64), common, assume_unique=True)
+    drop = set(common)
+    return array("Q", [s for s in shingles if s not in drop])
+
@@ -0,0 +1,222 @@
+import hashlib
+import zlib
+from array import array
+from collections import deque
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, Iterator, List, Sequence
+from ._optional import numpy_or_none, optional_import
+
+HASH_BACKENDS = ("blake2b", "crc", "xxhash")
+# Which window fingerprints a signature keeps: every one, the minimum of each run of
+# w consecutive windows (winnowing), or those whose mixed value is 0 mod p.
+FINGERPRINT_MODES = ("all", "winnow", "mod")
+
+_MASK64 = (1 << 64) - 1
+# Odd multiplier for the polynomial window combine; window hashes wrap mod 2**64.
+_ROLL_BASE = 0x100000001B3
+_TOKEN_CACHE = 1 << 16
+
+
+def mix64(x: int) -> int:
+    """splitmix64 finalizer: cheap, well-distributed 64-bit mixing."""
+    x = (x + 0x9E3779B97F4A7C15) & _MASK64
+    x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+    x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & _MASK64
+    return x ^ (x >> 31)
+
+
+def _mix64_np(np, x):
+    x = x + np.uint64(0x9E3779B97F4A7C15)
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+
+def _blake2b64(token: str) -> int:
+    return int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def _crc64(token: str) -> int:
+    data = token.encode("utf-8")
+    return mix64(zlib.adler32(data) << 32 | zlib.crc32(data))
+
+
+_hashers: Dict[str, Callable[[str], int]] = {}
+
+
+def token_hasher(backend: str = "blake2b") -> Callable[[str], int]:
+    """Return a memoized str -> 64-bit int hash function for `backend`."""
+    fn = _hashers.get(backend)
+    if fn is not None:
+        return fn
+    if backend == "blake2b":
+        raw = _blake2b64
+    elif backend == "crc":
+        raw = _crc64
+    elif backend == "xxhash":
+        xxhash = optional_import("xxhash")
+        if xxhash is None:
+            raise ValueError("xxhash backend requires the optional 'xxhash' package")
+        xxh3 = xxhash.xxh3_64_intdigest
+        raw = lambda token: xxh3(token.encode("utf-8"))
+    else:
+        raise ValueError(f"Unknown hash backend: {backend}")
+    fn = _hashers[backend] = lru_cache(maxsize=_TOKEN_CACHE)(raw)
+    return fn
+
+
+def token_hashes(tokens: Iterable[str], backend: str = "blake2b") -> List[int]:
+    h = token_hasher(backend)
+    return [h(t) for t in tokens]
+
+
+def rolling_shingle_hashes(hashes: Iterable[int], k: int = 5) -> Iterator[int]:
+    """Stream one 64-bit fingerprint per k-token window from a stream of token hashes.
+    Window value is sum(h_i * B**(k-1-i)) mod 2**64, updated in O(1) per token.
+    """
+    if k <= 0:
+        return
+    drop = pow(_ROLL_BASE, k - 1, 1 << 64)
+    window: deque = deque()
+    h = 0
+    for t in hashes:
+        if len(window) == k:
+            h = (h - window.popleft() * drop) & _MASK64
+        window.append(t)
+        h = (h * _ROLL_BASE + t) & _MASK64
+        if len(window) == k:
+            yield h
+
+
+def _window_hashes_np(np, hashes: Sequence[int], k: int):
+    t = np.array(hashes, dtype=np.uint64)
+    n = t.size - k + 1
+    out = np.zeros(n, dtype=np.uint64)
+    base = np.uint64(_ROLL_BASE)
+    for j in range(k):
+        out *= base
+        out += t[j:j + n]
+    return out
+
+
+def window_minima(values: Sequence[int], w: int) -> Iterator[int]:
+    """Minimum of every run of `w` consecutive values (monotonic deque, O(n))."""
+    q: deque = deque()  # indices of increasing values
+    for i, v in enumerate(values):
+        while q and values[q[-1]] >= v:
+            q.pop()
+        q.append(i)
+        if q[0] <= i - w:
+            q.popleft()
+        if i >= w - 1:
+            yield values[q[0]]
+
+
+def _window_minima_np(np, values, w: int):
+    return np.lib.stride_tricks.sliding_window_view(values, w).min(axis=1)
+
+
+def validate_fingerprint(mode: str, window: int) -> None:
+    if mode not in FINGERPRINT_MODES:
+        raise ValueError(f"Unknown fingerprint mode: {mode}")
+    if mode != "all" and window < 1:
+        raise ValueError("fingerprint window must be >= 1")
+
+
+class ShingleAccumulator:
+    """Streaming k-shingle fingerprinting.
+    Feed token batches with `update`; windows spanning two batches are carried over via
+    the last k-1 token hashes, so the result equals hashing the concatenated stream.
+    Working memory is one batch plus the distinct fingerprints seen so far.
+    With `fingerprint="winnow"` only the minimum of each `window` consecutive windows is
+    kept (every shared run of window + k - 1 tokens still shares a fingerprint; a file
+    with fewer windows keeps its overall minimum); `"mod"` keeps windows whose mixed
+    hash is 0 mod `window`.
+    """
+    # Merge pending per-batch unique arrays once they hold this many values.
+    _MERGE_AT = 1 << 20
+
+    def __init__(self, k: int = 5, backend: str = "blake2b", fingerprint: str = "all", window: int = 0):
+        validate_fingerprint(fingerprint, window)
+        self.k = k
+        self.fingerprint = fingerprint
+        self.window = window
+        self.windows = 0  # k-shingles seen, before selection
+        self._wtail: list = []  # last window - 1 shingle hashes (winnowing)
+        self.tokens = 0
+        self._hash = token_hasher(backend)
+        self._np = numpy_or_none()
+        self._tail: List[int] = []
+        self._parts: list = []
+        self._pending = 0
+        self._set: set = set()
+
+    def update(self, tokens: Sequence[str]) -> None:
+        self.tokens += len(tokens)
+        k = self.k
+        if k <= 0:
+            return
+        h = self._hash
+        hashes = self._tail + [h(t) for t in tokens]
+        if len(hashes) >= k:
+            np = self._np
+            if np is not None:
+                self._add(np.unique(self._select(_window_hashes_np(np, hashes, k))))
+            else:
+                self._set.update(self._select(list(rolling_shingle_hashes(hashes, k))))
+        self._tail = hashes[-(k - 1):] if k > 1 else []
+
+    def _select(self, shingles):
+        """Apply the fingerprint mode to one batch of window hashes (in stream order)."""
+        self.windows += len(shingles)
+        np = self._np
+        if self.fingerprint == "mod":
+            if np is not None:
+                return shingles[_mix64_np(np, shingles) % np.uint64(self.window) == 0]
+            return [h for h in shingles if mix64(h) % self.window == 0]
+        if self.fingerprint == "winnow":
+            w = self.window
+            if np is not None:
+                seq = np.concatenate((np.array(self._wtail, dtype=np.uint64), shingles))
+                self._wtail = seq[-(w - 1):].tolist() if w > 1 else []
+                return _window_minima_np(np, seq, w) if seq.size >= w else seq[:0]
+            seq = self._wtail + shingles
+            self._wtail = seq[-(w - 1):] if w > 1 else []
+            return list(window_minima(seq, w))
+        return shingles
+
+    def _add(self, part) -> None:
+        np = self._np
+        self._parts.append(part)
+        self._pending += part.size
+        if self._pending >= self._MERGE_AT and len(self._parts) > 1:
+            self._parts = [np.unique(np.concatenate(self._parts))]
+            self._pending = self._parts[0].size
+
+    def result(self):
+        """Sorted unique uint64 fingerprints (NumPy array, or array('Q') without NumPy)."""
+        np = self._np
+        if self.fingerprint == "winnow" and 0 < self.windows < self.window:
+            # too short for one full winnowing window: the whole file is the window
+            smallest = min(self._wtail)
+            if np is not None:
+                self._add(np.array([smallest], dtype=np.uint64))
+            else:
+                self._set.add(smallest)
+        if np is None:
+            return array("Q", sorted(self._set))
+        if not self._parts:
+            return np.empty(0, dtype=np.uint64)
+        if len(self._parts) == 1:
+            return self._parts[0]
+        return np.unique(np.concatenate(self._parts))
+
+
+def shingle_fingerprints(tokens: Sequence[str], k: int = 5, backend: str = "blake2b", fingerprint: str = "all", window: int = 0):
+    """Sorted unique 64-bit fingerprints of every k-token window (or the subset selected
+    by `fingerprint`, see ShingleAccumulator).
+    Returns a NumPy uint64 array when NumPy is installed, otherwise an array('Q').
+    """
+    acc = ShingleAccumulator(k, backend, fingerprint, window)
+    acc.update(tokens)
+    return acc.result()
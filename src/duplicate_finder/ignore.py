@@ -0,0 +1,165 @@
+import os
+import re
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Always-skipped directories unless the caller opts out (VCS metadata, dependency and
+# virtualenv trees, bytecode caches).
+DEFAULT_IGNORES = (".git/", ".hg/", ".svn/", "node_modules/", "__pycache__/", ".venv/", "venv/", ".tox/", ".mypy_cache/")
+IGNORE_FILE = ".dupignore"
+
+
+def _glob_to_regex(glob: str) -> str:
+    out: List[str] = []
+    i = 0
+    while i < len(glob):
+        c = glob[i]
+        if glob.startswith("**/", i):
+            out.append("(?:.*/)?")
+            i += 3
+            continue
+        if glob.startswith("**", i):
+            out.append(".*")
+            i += 2
+            continue
+        if c == "*":
+            out.append("[^/]*")
+        elif c == "?":
+            out.append("[^/]")
+        elif c == "[" and "]" in glob[i + 1:]:
+            end = glob.index("]", i + 1)
+            body = glob[i + 1:end].replace("\\", "\\\\")
+            out.append("[" + ("^" + body[1:] if body.startswith("!") else body) + "]")
+            i = end + 1
+            continue
+        else:
+            out.append(re.escape(c))
+        i += 1
+    return "".join(out)
+
+
+def parse_pattern(line: str) -> Optional[Tuple[bool, bool, str]]:
+    """gitignore-style line -> (negated, directory only, regex over '/'-separated relative
+    paths), or None for blanks and comments. Patterns without an inner '/' match at any depth."""
+    line = line.rstrip("\r\n").rstrip()
+    if not line or line.startswith("#"):
+        return None
+    negated = line.startswith("!")
+    if negated:
+        line = line[1:]
+    dir_only = line.endswith("/")
+    line = line.rstrip("/")
+    anchored = "/" in line
+    rx = _glob_to_regex(line.lstrip("/"))
+    return negated, dir_only, rx if anchored else "(?:.*/)?" + rx
+
+
+def _combine(globs: List[str], regexes: List[str]):
+    parts = [f"(?:^(?:{g})$)" for g in globs] + [f"(?:{r})" for r in regexes]
+    return re.compile("|".join(parts)) if parts else None
+
+
+class IgnoreMatcher:
+    """Excludes compiled once into one regex per kind (files, directories, re-includes).
+    Paths are relative to the scan root with '/' separators. Regex excludes are searched
+    anywhere in the path. An excluded directory is never descended, so (as with git) a
+    `!` pattern cannot re-include a file below it.
+    """
+    def __init__(self, patterns: Iterable[str] = (), regexes: Iterable[str] = ()):
+        file_globs: List[str] = []
+        dir_globs: List[str] = []
+        keep_globs: List[str] = []
+        for line in patterns:
+            parsed = parse_pattern(line)
+            if parsed is None:
+                continue
+            negated, dir_only, rx = parsed
+            if negated:
+                keep_globs.append(rx)
+                continue
+            dir_globs.append(rx)
+            if not dir_only:
+                file_globs.append(rx)
+        regexes = list(regexes)
+        for rx in regexes:
+            try:
+                re.compile(rx)
+            except re.error as exc:
+                raise ValueError(f"Invalid exclude regex {rx!r}: {exc}")
+        self._files = _combine(file_globs, regexes)
+        self._dirs = _combine(dir_globs, regexes)
+        self._keep = _combine(keep_globs, [])
+
+    @classmethod
+    def from_files(cls, paths: Iterable[str], patterns: Iterable[str] = (), regexes: Iterable[str] = ()) -> "IgnoreMatcher":
+        lines = list(patterns)
+        for path in paths:
+            with open(path, "r", encoding="utf-8", errors="ignore") as f:
+                lines.extend(f)
+        return cls(lines, regexes)
+
+    def _ignored(self, matcher, rel_path: str) -> bool:
+        if matcher is None or not matcher.search(rel_path):
+            return False
+        return self._keep is None or not self._keep.search(rel_path)
+
+    def ignores_file(self, rel_path: str) -> bool:
+        return self._ignored(self._files, rel_path)
+
+    def ignores_dir(self, rel_path: str) -> bool:
+        return self._ignored(self._dirs, rel_path)
+
+
+def walk_files(root: str, extensions: Iterable[str] = (), ignore: Optional[IgnoreMatcher] = None,
+               min_size: Optional[int] = None, max_size: Optional[int] = None, stats=None,
+               sizes: Optional[Dict[str, int]] = None) -> Iterator[str]:
+    """`os.walk`-equivalent file discovery built on `os.scandir`.
+    Ignored directories are pruned before they are listed, and the size filters use the
+    DirEntry's stat, so no skipped file is ever opened. Symlinked directories are not
+    followed (os.walk's default). `stats` (a RunStats) counts pruned directories and
+    skipped files. `sizes`, when given, receives the byte size of every yielded path.
+    """
+    ext_set = {e.lower() for e in extensions}
+    sized = min_size is not None or max_size is not None or sizes is not None
+    stack = [(root, "")]
+    while stack:
+        dirpath, rel = stack.pop()
+        try:
+            it = os.scandir(dirpath)
+        except OSError:
+            continue
+        subdirs = []
+        with it:
+            for entry in it:
+                rel_path = rel + entry.name
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    continue
+                if is_dir:
+                    if entry.is_symlink():
+                        continue
+                    if ignore is not None and ignore.ignores_dir(rel_path):
+                        if stats is not None:
+                            stats.add("dirs_pruned")
+                        continue
+                    subdirs.append((entry.path, rel_path + "/"))
+                    continue
+                if ext_set and os.path.splitext(entry.name)[1].lower() not in ext_set:
+                    continue
+                if ignore is not None and ignore.ignores_file(rel_path):
+                    if stats is not None:
+                        stats.add("files_ignored")
+                    continue
+                if sized:
+                    try:
+                        size = entry.stat().st_size
+                    except OSError:
+                        continue
+                    if (min_size is not None and size < min_size) or (max_size is not None and size > max_size):
+                        if stats is not None:
+                            stats.add("files_size_filtered")
+                        continue
+                    if sizes is not None:
+                        sizes[entry.path] = size
+                yield entry.path
+        stack.extend(reversed(subdirs))
@@ -1,22 +1,268 @@
-from typing import List, Dict, Set
-from .core import FileSignature, compute_jaccard
+import bisect
+import json
+import mmap
+import os
+import struct
+from array import array
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from ._optional import numpy_or_none
+from .core import FileSignature
+from .similarity import _is_set, bounded_jaccard, compute_jaccard, intersection_size
+from .minhash import band_keys, minhash_matrix
+
+_MAGIC = b"DFLSH001"
+_U64 = struct.Struct("<Q")
+
+
+def _pad8(n: int) -> int:
+    return (n + 7) & ~7
+
+
+_MASK64 = (1 << 64) - 1
+
+
+def _uint64_set(shingles):
+    """Set shingles as they compare with persisted uint64 arrays: ints outside uint64
+    wrap, as in minhash._as_uint64 (the set is returned as is when none do)."""
+    if not shingles or (min(shingles) >= 0 and max(shingles) <= _MASK64):
+        return shingles
+    return {s & _MASK64 for s in shingles}
+
+
+def _sorted_shingles(shingles):
+    if isinstance(shingles, (set, frozenset)):
+        return array("Q", sorted(_uint64_set(shingles)))
+    return shingles
+
+
+def _uint64_view(buf, offset: int, count: int):
+    np = numpy_or_none()
+    if np is not None:
+        return np.frombuffer(buf, dtype=np.uint64, count=count, offset=offset)
+    return memoryview(buf)[offset:offset + count * 8].cast("Q")
+
 
 class SignatureIndex:
-    """In-memory index for potential future acceleration.
-    Currently stores raw shingles; can be extended to LSH buckets.
+    """LSH index over file signatures.
+    Each file is MinHashed and filed under one 64-bit bucket key per band, so `query`
+    only verifies files that share at least one band. Indexes written with `save` are
+    memory-mapped by `load`; later add/remove/update calls go to an in-memory overlay
+    (removals of persisted files are tombstones) until the next `save`.
     """
-    def __init__(self):
-        self._map: Dict[str, Set[int]] = {}
+    def __init__(self, perms: int = 64, bands: int = 16, engine: str = "fast", config: str = ""):
+        self.perms = perms
+        self.bands = bands
+        self.engine = engine
+        self.config = config
+        band_keys([[0] * perms], bands)  # validates perms/bands early
+        # overlay: path -> (shingles, token count, band keys)
+        self._docs: Dict[str, Tuple[object, int, List[int]]] = {}
+        self._buckets: Dict[int, Set[str]] = {}
+        # memory-mapped base written by `save`
+        self._mmap: Optional[mmap.mmap] = None
+        self._base_paths: List[str] = []
+        self._base_sizes: List[int] = []
+        self._base_ids: Dict[str, int] = {}
+        self._base_keys = self._base_docs = self._base_offsets = self._base_shingles = ()
+        self._removed: Set[int] = set()
+
+    # -- mutation -------------------------------------------------------------
+    def _keys_for(self, shingle_sets: List) -> List[List[int]]:
+        keys = band_keys(minhash_matrix(shingle_sets, self.perms, engine=self.engine), self.bands)
+        return [[int(k) for k in row] for row in keys]
 
     def add(self, sig: FileSignature) -> None:
-        self._map[sig.path] = sig.shingles
+        self.add_many([sig])
+
+    def add_many(self, sigs: Iterable[FileSignature]) -> None:
+        sigs = list(sigs)
+        for sig in sigs:
+            self.remove(sig.path)
+        for sig, keys in zip(sigs, self._keys_for([s.shingles for s in sigs])):
+            self._docs[sig.path] = (sig.shingles, sig.size, keys)
+            for key in keys:
+                self._buckets.setdefault(key, set()).add(sig.path)
+
+    def update(self, sig: FileSignature) -> None:
+        self.add(sig)
+
+    def remove(self, path: str) -> bool:
+        entry = self._docs.pop(path, None)
+        if entry is not None:
+            for key in entry[2]:
+                bucket = self._buckets.get(key)
+                if bucket is not None:
+                    bucket.discard(path)
+                    if not bucket:
+                        del self._buckets[key]
+            return True
+        base_id = self._base_ids.get(path)
+        if base_id is not None and base_id not in self._removed:
+            self._removed.add(base_id)
+            return True
+        return False
+
+    # -- lookup ---------------------------------------------------------------
+    def __len__(self) -> int:
+        return len(self._docs) + len(self._base_paths) - len(self._removed)
+
+    def __contains__(self, path: str) -> bool:
+        return self._shingles_of(path) is not None
+
+    def paths(self) -> List[str]:
+        live = [p for i, p in enumerate(self._base_paths) if i not in self._removed and p not in self._docs]
+        return live + list(self._docs)
+
+    def _shingles_of(self, path: str):
+        entry = self._docs.get(path)
+        if entry is not None:
+            return entry[0]
+        base_id = self._base_ids.get(path)
+        if base_id is None or base_id in self._removed:
+            return None
+        return self._base_shingles[int(self._base_offsets[base_id]):int(self._base_offsets[base_id + 1])]
+
+    def _base_candidates(self, keys: List[int]) -> Set[int]:
+        out: Set[int] = set()
+        if not self._base_paths:
+            return out
+        np = numpy_or_none()
+        if np is not None:
+            q = np.array(keys, dtype=np.uint64)
+            lo = np.searchsorted(self._base_keys, q, side="left")
+            hi = np.searchsorted(self._base_keys, q, side="right")
+            for a, b in zip(lo.tolist(), hi.tolist()):
+                out.update(self._base_docs[a:b].tolist())
+        else:
+            for key in keys:
+                a = bisect.bisect_left(self._base_keys, key)
+                b = bisect.bisect_right(self._base_keys, key, lo=a)
+                out.update(self._base_docs[a:b].tolist())
+        return out - self._removed
+
+    def query(self, signature, threshold: float) -> List[Tuple[float, str]]:
+        """Return (similarity, path) for indexed files at or above `threshold`, best first.
+        `signature` is a FileSignature (its own path is excluded) or a shingle collection.
+        Only files sharing an LSH band with the query are verified with exact Jaccard.
+        """
+        shingles = getattr(signature, "shingles", signature)
+        own_path = getattr(signature, "path", None)
+        keys = self._keys_for([shingles])[0]
+        cand: Set[str] = set()
+        for key in keys:
+            cand.update(self._buckets.get(key, ()))
+        for base_id in self._base_candidates(keys):
+            path = self._base_paths[base_id]
+            if path not in self._docs:
+                cand.add(path)
+        cand.discard(own_path)
+        out = []
+        wrapped = None
+        for path in cand:
+            other = self._shingles_of(path)
+            probe = shingles
+            if _is_set(shingles) and not _is_set(other):  # persisted: compare as uint64
+                if wrapped is None:
+                    wrapped = _uint64_set(shingles)
+                probe = wrapped
+            sim = bounded_jaccard(probe, other, threshold)
+            if sim is not None:
+                out.append((sim, path))
+        out.sort(key=lambda x: (-x[0], x[1]))
+        return out
 
     def candidates(self, shingles: Set[int], min_overlap: int = 1) -> List[str]:
+        """Exhaustive overlap scan (not LSH); kept for callers needing exact overlap counts."""
         out: List[str] = []
-        for path, other in self._map.items():
-            if len(shingles & other) >= min_overlap:
+        for path in self.paths():
+            if intersection_size(shingles, self._shingles_of(path)) >= min_overlap:
                 out.append(path)
         return out
 
     def similarity(self, a: str, b: str) -> float:
-        return compute_jaccard(self._map.get(a, set()), self._map.get(b, set()))
+        sa, sb = self._shingles_of(a), self._shingles_of(b)
+        sa, sb = (sa if sa is not None else set()), (sb if sb is not None else set())
+        if _is_set(sa) != _is_set(sb):  # one side persisted: compare as uint64
+            sa, sb = (_uint64_set(x) if _is_set(x) else x for x in (sa, sb))
+        return compute_jaccard(sa, sb)
+
+    # -- persistence ----------------------------------------------------------
+    def save(self, path: str) -> None:
+        """Write the live index as one file: JSON header, then sorted bucket keys, their
+        document ids, shingle offsets and concatenated sorted shingles (uint64 LE)."""
+        paths = self.paths()
+        entries = []
+        for p in paths:
+            entry = self._docs.get(p)
+            if entry is not None:
+                shingles, size, keys = entry
+            else:
+                base_id = self._base_ids[p]
+                shingles, size = self._shingles_of(p), self._base_sizes[base_id]
+                keys = None
+            entries.append((p, _sorted_shingles(shingles), size, keys))
+        base_keys = self._base_key_map()
+        pairs = []
+        for doc_id, (p, _, _, keys) in enumerate(entries):
+            for key in (keys if keys is not None else base_keys[p]):
+                pairs.append((key, doc_id))
+        pairs.sort()
+        offsets = [0]
+        for _, shingles, _, _ in entries:
+            offsets.append(offsets[-1] + len(shingles))
+        header = json.dumps({
+            "perms": self.perms, "bands": self.bands, "rows": self.perms // self.bands, "engine": self.engine, "config": self.config,
+            "paths": paths, "sizes": [e[2] for e in entries],
+            "n_keys": len(pairs), "n_shingles": offsets[-1],
+        }).encode("utf-8")
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(_MAGIC)
+            f.write(_U64.pack(len(header)))
+            f.write(header)
+            f.write(b"\0" * (_pad8(len(header)) - len(header)))
+            f.write(array("Q", [k for k, _ in pairs]).tobytes())
+            f.write(array("Q", [d for _, d in pairs]).tobytes())
+            f.write(array("Q", offsets).tobytes())
+            for _, shingles, _, _ in entries:
+                f.write(shingles.tobytes())
+        os.replace(tmp, path)
+
+    def _base_key_map(self) -> Dict[str, List[int]]:
+        if not self._base_paths:
+            return {}
+        out: Dict[str, List[int]] = {p: [] for p in self._base_paths}
+        for key, doc in zip(self._base_keys.tolist(), self._base_docs.tolist()):
+            out[self._base_paths[doc]].append(key)
+        return out
+
+    @classmethod
+    def load(cls, path: str) -> "SignatureIndex":
+        with open(path, "rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if mm[:8] != _MAGIC:
+            mm.close()
+            raise ValueError(f"Not a signature index file: {path}")
+        (header_len,) = _U64.unpack(mm[8:16])
+        header = json.loads(mm[16:16 + header_len].decode("utf-8"))
+        if "rows" not in header and header["perms"] % header["bands"]:
+            mm.close()  # keys were built with a wider last band
+            raise ValueError(f"Index uses an outdated band layout, rebuild it: {path}")
+        index = cls(perms=header["perms"], bands=header["bands"], engine=header["engine"], config=header["config"])
+        n, m, s = len(header["paths"]), header["n_keys"], header["n_shingles"]
+        pos = 16 + _pad8(header_len)
+        index._mmap = mm
+        index._base_keys = _uint64_view(mm, pos, m)
+        index._base_docs = _uint64_view(mm, pos + 8 * m, m)
+        index._base_offsets = _uint64_view(mm, pos + 16 * m, n + 1)
+        index._base_shingles = _uint64_view(mm, pos + 16 * m + 8 * (n + 1), s)
+        index._base_paths = header["paths"]
+        index._base_sizes = header["sizes"]
+        index._base_ids = {p: i for i, p in enumerate(index._base_paths)}
+        return index
+
+    def close(self) -> None:
+        if self._mmap is not None:
+            self._base_keys = self._base_docs = self._base_offsets = self._base_shingles = ()
+            self._mmap.close()
+            self._mmap = None
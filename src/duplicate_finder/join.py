@@ -0,0 +1,98 @@
+import math
+from array import array
+from collections import Counter
+from typing import Dict, List, Optional, Sequence
+from ._optional import numpy_or_none
+from .similarity import _is_set
+
+# Slack on threshold arithmetic: bounds are loosened by this much so float rounding can
+# only add candidates, never drop a qualifying pair.
+_EPS = 1e-9
+
+
+def probe_prefix_length(size: int, threshold: float) -> int:
+    """Tokens of a set (rarest first) that any set with Jaccard >= threshold must share."""
+    return max(0, min(size, size - math.ceil(threshold * size - _EPS) + 1))
+
+
+def index_prefix_length(size: int, threshold: float) -> int:
+    """Shorter prefix to index when sets are processed by ascending size (AllPairs): a later,
+    larger set needs overlap >= 2t/(1+t) * size with this one."""
+    return max(0, min(size, size - math.ceil(2 * threshold / (1 + threshold) * size - _EPS) + 1))
+
+
+def _prefixes_np(np, shingle_sets: Sequence, sizes: List[int], threshold: float) -> List[List[int]]:
+    arrays = [np.asarray(s, dtype=np.uint64) for s in shingle_sets]
+    values, counts = np.unique(np.concatenate(arrays) if arrays else np.empty(0, dtype=np.uint64), return_counts=True)
+    rank = np.empty(values.size, dtype=np.int64)
+    rank[np.lexsort((values, counts))] = np.arange(values.size)  # rarest shingles first
+    out = []
+    for arr, size in zip(arrays, sizes):
+        p = probe_prefix_length(size, threshold)
+        if not p:
+            out.append([])
+            continue
+        r = rank[np.searchsorted(values, arr)]
+        if p < size:
+            r = np.partition(r, p - 1)[:p]
+        out.append(np.sort(r).tolist())
+    return out
+
+
+def _prefixes_py(shingle_sets: Sequence, sizes: List[int], threshold: float) -> List[List[int]]:
+    counts: Counter = Counter()
+    for s in shingle_sets:
+        counts.update(s)
+    order = sorted(counts, key=lambda v: (counts[v], v))
+    rank = {v: r for r, v in enumerate(order)}
+    return [sorted(rank[v] for v in s)[:probe_prefix_length(size, threshold)] for s, size in zip(shingle_sets, sizes)]
+
+
+def prefix_filter_pairs(shingle_sets: Sequence, threshold: float, stats: Optional[Dict[str, int]] = None):
+    """Candidate pairs for an exact Jaccard self-join (AllPairs-style size + prefix filtering).
+    Shingles are ranked rarest first; two sets can only reach `threshold` if their rarest
+    prefixes overlap and their sizes are within the ratio `threshold` allows. Sets are
+    probed in ascending size against an inverted index of the prefixes seen so far, so no
+    qualifying pair is ever missed. Returns sorted packed int64 `i * n + j` (i < j) like
+    `minhash.lsh_candidate_pairs`, or None when `threshold` <= 0 (every pair qualifies).
+    """
+    if threshold <= 0:
+        return None
+    n = len(shingle_sets)
+    sizes = [len(s) for s in shingle_sets]
+    np = numpy_or_none()
+    # sets may hold any ints (negative, 128-bit shingle_hash values): rank them in Python
+    vectorize = np is not None and n and not any(_is_set(s) for s in shingle_sets)
+    prefixes = _prefixes_np(np, shingle_sets, sizes, threshold) if vectorize else _prefixes_py(shingle_sets, sizes, threshold)
+    index: Dict[int, List[int]] = {}
+    start: Dict[int, int] = {}  # postings before this offset are too small for every later probe
+    found: List[int] = []
+    empties: List[int] = []
+    for x in sorted(range(n), key=sizes.__getitem__):
+        size = sizes[x]
+        if not size:
+            empties.append(x)  # two empty sets compare equal (Jaccard 1.0)
+            continue
+        min_size = threshold * size - _EPS
+        probe = prefixes[x]
+        cands = set()
+        for tok in probe:
+            postings = index.get(tok)
+            if postings is None:
+                continue
+            lo = start.get(tok, 0)
+            while lo < len(postings) and sizes[postings[lo]] < min_size:
+                lo += 1
+            start[tok] = lo
+            cands.update(postings[lo:])
+        found.extend(y * n + x if y < x else x * n + y for y in cands)
+        for tok in probe[:index_prefix_length(size, threshold)]:
+            index.setdefault(tok, []).append(x)
+    empties.sort()
+    found.extend(a * n + b for i, a in enumerate(empties) for b in empties[i + 1:])
+    if stats is not None:
+        stats["indexed_tokens"] = sum(len(p) for p in index.values())
+        stats["candidates"] = len(found)
+    if np is not None:
+        return np.sort(np.array(found, dtype=np.int64))
+    return array("q", sorted(found))
@@ -1,22 +1,60 @@
 import hashlib
-from typing import Iterable, List, Set, Tuple, Dict
+import math
+from array import array
+from functools import lru_cache
+from itertools import combinations
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Set, Tuple
+from ._optional import numpy_or_none
+from .hashing import _mix64_np, mix64
+
+# Stable salts (hex of incremental numbers hashed once for diffusion), generated on demand
+_SALTS: List[int] = []
+
+
+def _salts(perms: int) -> List[int]:
+    for i in range(len(_SALTS), perms):
+        _SALTS.append(int(hashlib.md5(f"salt-{i}".encode()).hexdigest(), 16) & ((1<<64)-1))
+    return _SALTS[:perms]
+
+MINHASH_ENGINES = ("fast", "compat")
+
+_MASK64 = (1 << 64) - 1
+# Universal hashing h(x) = (a*x + b) mod p over 32-bit folded shingle hashes.
+# With p < 2**32 and a, x < 2**32 the product plus b never overflows uint64.
+_UH_PRIME = (1 << 32) - 5
+_UH_EMPTY = (1 << 32) - 1
+_UH_CHUNK = 4096
+_uh_params: List[Tuple[int, int]] = []
+
+
+def _universal_params(perms: int) -> List[Tuple[int, int]]:
+    """Return (a, b) coefficients for the first `perms` permutations.
+    Coefficient i depends only on i, so a prefix of a longer signature equals a shorter one.
+    """
+    for i in range(len(_uh_params), perms):
+        a = 1 + mix64(2 * i) % (_UH_PRIME - 1)
+        b = mix64(2 * i + 1) % _UH_PRIME
+        _uh_params.append((a, b))
+    return _uh_params[:perms]
+
+
+def _fold32(h: int) -> int:
+    h &= _MASK64
+    return (h ^ (h >> 32)) & 0xFFFFFFFF
 
-# Pre-generated stable salts (hex of incremental numbers hashed once for diffusion)
-_SALTS = [
-    int(hashlib.md5(f"salt-{i}".encode()).hexdigest(), 16) & ((1<<64)-1) for i in range(128)
-]
 
 def minhash_signature(shingles: Set[int], perms: int = 64) -> List[int]:
     """Compute a MinHash signature list of length `perms`.
     Deterministic: uses stable salt list and MD5 hashing.
+    Reference ("compat") implementation; see `minhash_matrix` for the fast engine.
     """
-    if perms > len(_SALTS):
-        raise ValueError("perms exceeds available salts")
+    if perms <= 0:
+        raise ValueError("perms must be positive")
     if not shingles:
         # Represent empty set as maximal values (won't collide spuriously)
         return [(1<<64)-1] * perms
     sig: List[int] = []
-    for salt in _SALTS[:perms]:
+    for salt in _salts(perms):
         m = (1<<64)-1
         # Iterate shingles, XOR salt then hash -> take min 64-bit prefix
         for s in shingles:
@@ -27,35 +65,322 @@ def minhash_signature(shingles: Set[int], perms: int = 64) -> List[int]:
         sig.append(m)
     return sig
 
-def lsh_candidates(signatures: List[List[int]], bands: int) -> Set[Tuple[int, int]]:
+
+def _universal_minhash_py(shingles: Iterable[int], perms: int) -> List[int]:
+    xs = [_fold32(s) for s in shingles]
+    if not xs:
+        return [_UH_EMPTY] * perms
+    p = _UH_PRIME
+    return [min((a * x + b) % p for x in xs) for a, b in _universal_params(perms)]
+
+
+def _as_uint64(np, shingles):
+    if isinstance(shingles, np.ndarray):
+        return shingles.astype(np.uint64, copy=False)
+    if getattr(shingles, "typecode", None) == "Q":
+        return np.frombuffer(shingles, dtype=np.uint64)
+    return np.fromiter((s & _MASK64 for s in shingles), dtype=np.uint64, count=len(shingles))
+
+
+def _universal_minhash_np(np, a, b, shingles, out) -> None:
+    x = _as_uint64(np, shingles)
+    out.fill(_UH_EMPTY)
+    if not x.size:
+        return
+    x = (x ^ (x >> np.uint64(32))) & np.uint64(0xFFFFFFFF)
+    for start in range(0, x.size, _UH_CHUNK):
+        vals = (a * x[start:start + _UH_CHUNK] + b) % np.uint64(_UH_PRIME)
+        np.minimum(out, vals.min(axis=1), out=out)
+
+
+def minhash_matrix(shingle_sets: Sequence[Iterable[int]], perms: int = 64, engine: str = "fast"):
+    """Sign many files at once.
+    The fast engine computes all permutations per file with universal hashing; with NumPy
+    installed it returns an (n, perms) uint32 matrix, otherwise a list of lists with the same
+    values. The compat engine returns `minhash_signature` lists.
+    """
+    if engine not in MINHASH_ENGINES:
+        raise ValueError(f"Unknown MinHash engine: {engine}")
+    if perms <= 0:
+        raise ValueError("perms must be positive")
+    if engine == "compat":
+        return [minhash_signature(s, perms) for s in shingle_sets]
+    np = numpy_or_none()
+    if np is None:
+        return [_universal_minhash_py(s, perms) for s in shingle_sets]
+    params = _universal_params(perms)
+    a = np.array([p[0] for p in params], dtype=np.uint64)[:, None]
+    b = np.array([p[1] for p in params], dtype=np.uint64)[:, None]
+    matrix = np.empty((len(shingle_sets), perms), dtype=np.uint32)
+    row = np.empty(perms, dtype=np.uint64)
+    for idx, shingles in enumerate(shingle_sets):
+        _universal_minhash_np(np, a, b, shingles, row)
+        matrix[idx] = row
+    return matrix
+
+
+def band_ranges(perms: int, bands: int) -> List[Tuple[int, int]]:
+    """(start, end) signature slice per band. Every band has perms // bands rows; leftover
+    permutations are unused, since a wider last band would skew the S-curve."""
+    if bands <= 0 or bands > perms:
+        raise ValueError("Invalid band count")
+    rows = perms // bands
+    return [(b * rows, (b + 1) * rows) for b in range(bands)]
+
+
+def candidate_probability(similarity: float, bands: int, rows: int) -> float:
+    """Chance that a pair with Jaccard `similarity` shares at least one band: 1 - (1 - s^r)^b."""
+    return 1.0 - (1.0 - similarity ** rows) ** bands
+
+
+def _false_positive_area(threshold: float, bands: int, rows: int, steps: int = 64) -> float:
+    # Mean candidate probability for pairs uniformly spread below the threshold (midpoint rule)
+    width = threshold / steps
+    return sum(candidate_probability((i + 0.5) * width, bands, rows) for i in range(steps)) / steps
+
+
+class LSHParams(NamedTuple):
+    perms: int
+    bands: int
+    rows: int
+    fnr: float  # predicted miss rate for a pair exactly at the threshold
+    fpr: float  # predicted candidate rate for pairs below the threshold (uniform prior)
+
+
+@lru_cache(maxsize=64)
+def tune_lsh(threshold: float, target_recall: float = 0.95, max_perms: int = 256, slack: float = 0.1) -> LSHParams:
+    """Pick (perms, bands, rows) from the banding S-curve.
+    Among layouts whose recall at `threshold` reaches `target_recall`, the ones with the
+    fewest expected false candidates win; perms is then the smallest b * r whose false
+    candidate rate is within `slack` (relative) of that best, since MinHash cost grows
+    with perms. When no layout reaches the target, the highest-recall one is returned.
+    """
+    if not 0.0 < threshold <= 1.0:
+        raise ValueError("threshold must be in (0, 1]")
+    if not 0.0 < target_recall < 1.0:
+        raise ValueError("target_recall must be in (0, 1)")
+    feasible = []
+    fallback = None
+    for rows in range(1, max_perms + 1):
+        for bands in range(1, max_perms // rows + 1):
+            recall = candidate_probability(threshold, bands, rows)
+            if recall >= target_recall:
+                feasible.append((_false_positive_area(threshold, bands, rows), bands * rows, bands, rows))
+            elif fallback is None or recall > fallback[0]:
+                fallback = (recall, bands, rows)
+    if not feasible:
+        _, bands, rows = fallback
+        return LSHParams(bands * rows, bands, rows, 1.0 - fallback[0], _false_positive_area(threshold, bands, rows))
+    best = min(f[0] for f in feasible)
+    fpr, perms, bands, rows = min((f for f in feasible if f[0] <= best * (1.0 + slack)), key=lambda f: (f[1], f[0]))
+    return LSHParams(perms, bands, rows, 1.0 - candidate_probability(threshold, bands, rows), fpr)
+
+
+def band_keys(signatures, bands: int):
+    """One 64-bit bucket key per (file, band), mixing the band number with its slice values.
+    Returns an (n, bands) uint64 matrix for NumPy input, otherwise a list of lists.
+    """
+    np = numpy_or_none()
+    if np is not None and isinstance(signatures, np.ndarray):
+        ranges = band_ranges(signatures.shape[1], bands)
+        sig64 = signatures.astype(np.uint64)
+        keys = np.empty((signatures.shape[0], bands), dtype=np.uint64)
+        for b, (start, end) in enumerate(ranges):
+            h = np.full(signatures.shape[0], mix64(b), dtype=np.uint64)
+            for col in range(start, end):
+                h = _mix64_np(np, h ^ sig64[:, col])
+            keys[:, b] = h
+        return keys
+    out = []
+    for sig in signatures:
+        row = []
+        for b, (start, end) in enumerate(band_ranges(len(sig), bands)):
+            h = mix64(b)
+            for v in sig[start:end]:
+                h = mix64(h ^ (int(v) & _MASK64))
+            row.append(h)
+        out.append(row)
+    return out
+
+
+def _group_spans(np, col):
+    """(order, [(start, end), ...]) for runs of equal values in `col` holding 2+ rows."""
+    order = np.argsort(col, kind="stable")  # stable: indices ascend within a run
+    edges = np.concatenate(([0], np.flatnonzero(np.diff(col[order])) + 1, [len(col)]))
+    sizes = np.diff(edges)
+    multi = np.flatnonzero(sizes > 1)
+    return order, zip(edges[multi].tolist(), edges[multi + 1].tolist())
+
+
+def _size_bin(size: int) -> int:
+    """Upper bound of the power-of-two histogram bin holding a bucket of `size` members."""
+    return 1 << (size - 1).bit_length()
+
+
+def _bin_label(hi: int) -> str:
+    lo = hi // 2 + 1
+    return str(hi) if lo == hi else f"{lo}-{hi}"
+
+
+def _candidates_np(np, keys, max_bucket: Optional[int], stats: Dict[str, int], hist: Dict[int, int]):
+    n, bands = keys.shape
+    found = np.empty(0, dtype=np.int64)
+
+    def emit(group, band: int, depth: int, out: List) -> None:
+        stats["largest_bucket"] = max(stats["largest_bucket"], len(group))
+        if max_bucket and len(group) > max_bucket and depth < bands - 1:
+            # split on the next band; members identical in every band are emitted as-is
+            stats["oversized_buckets"] += 1
+            sub = keys[group, (band + depth + 1) % bands]
+            order, spans = _group_spans(np, sub)
+            for a, b in spans:
+                emit(group[order[a:b]], band, depth + 1, out)
+            return
+        i, j = np.triu_indices(len(group), 1)
+        out.append(group[i] * n + group[j])
+
+    for b in range(bands):
+        order, spans = _group_spans(np, keys[:, b])
+        chunks: List = []
+        for start, end in spans:
+            stats["buckets"] += 1
+            size_bin = _size_bin(end - start)
+            hist[size_bin] = hist.get(size_bin, 0) + 1
+            emit(order[start:end].astype(np.int64), b, 0, chunks)
+        if chunks:
+            packed = np.concatenate(chunks)
+            stats["raw_pairs"] += int(packed.size)
+            found = np.union1d(found, packed)
+    return found
+
+
+def _candidates_py(keys: List[List[int]], max_bucket: Optional[int], stats: Dict[str, int], hist: Dict[int, int]):
+    n = len(keys)
+    bands = len(keys[0])
+    found: Set[int] = set()
+
+    def emit(group: List[int], band: int, depth: int) -> None:
+        stats["largest_bucket"] = max(stats["largest_bucket"], len(group))
+        if max_bucket and len(group) > max_bucket and depth < bands - 1:
+            stats["oversized_buckets"] += 1
+            sub: Dict[int, List[int]] = {}
+            for idx in group:
+                sub.setdefault(keys[idx][(band + depth + 1) % bands], []).append(idx)
+            for members in sub.values():
+                if len(members) > 1:
+                    emit(members, band, depth + 1)
+            return
+        stats["raw_pairs"] += len(group) * (len(group) - 1) // 2
+        found.update(i * n + j for i, j in combinations(group, 2))
+
+    for b in range(bands):
+        buckets: Dict[int, List[int]] = {}
+        for idx, row in enumerate(keys):
+            buckets.setdefault(row[b], []).append(idx)
+        for group in buckets.values():
+            if len(group) > 1:
+                stats["buckets"] += 1
+                size_bin = _size_bin(len(group))
+                hist[size_bin] = hist.get(size_bin, 0) + 1
+                emit(group, b, 0)  # indices ascend within a bucket
+    return array("q", sorted(found))
+
+
+def lsh_candidate_pairs(signatures, bands: int, max_bucket: Optional[int] = None, stats: Optional[Dict[str, int]] = None):
+    """Candidate pairs from LSH banding, packed as sorted unique int64 `i * n + j` (i < j).
+    Returns a NumPy array for matrix input, otherwise an array('q'). Buckets larger than
+    `max_bucket` are split on further bands until they fit, so one band shared by thousands
+    of boilerplate files cannot explode into millions of pairs. `stats`, when given, receives
+    buckets / largest_bucket / oversized_buckets / raw_pairs / candidates counts and a
+    `bucket_sizes` histogram of shared buckets by member count (power-of-two bins).
+    """
+    stats = stats if stats is not None else {}
+    for key in ("buckets", "largest_bucket", "oversized_buckets", "raw_pairs"):
+        stats[key] = 0
+    hist: Dict[int, int] = {}
+    np = numpy_or_none()
+    if np is not None and isinstance(signatures, np.ndarray):
+        if signatures.ndim != 2:
+            raise ValueError("Inconsistent signature lengths")
+        band_ranges(signatures.shape[1], bands)
+        found = _candidates_np(np, band_keys(signatures, bands), max_bucket, stats, hist) if len(signatures) else np.empty(0, dtype=np.int64)
+    else:
+        perms = len(signatures[0]) if len(signatures) else 0
+        if any(len(sig) != perms for sig in signatures):
+            raise ValueError("Inconsistent signature lengths")
+        band_ranges(perms, bands)
+        found = _candidates_py(band_keys(signatures, bands), max_bucket, stats, hist) if len(signatures) else array("q")
+    stats["candidates"] = len(found)
+    stats["bucket_sizes"] = {_bin_label(hi): hist[hi] for hi in sorted(hist)}
+    return found
+
+
+def unpack_pairs(packed, n: int) -> Iterable[Tuple[int, int]]:
+    for p in packed:
+        yield divmod(int(p), n)
+
+
+def lsh_candidates(signatures: List[List[int]], bands: int, max_bucket: Optional[int] = None) -> Set[Tuple[int, int]]:
     """Generate candidate index pairs via LSH banding.
     Each band is a contiguous slice of the signature; items sharing identical band tuple are candidates.
-    Returns set of (i,j) with i<j.
+    Accepts a list of signature lists or a 2-D NumPy matrix from `minhash_matrix`.
+    Returns set of (i,j) with i<j; see `lsh_candidate_pairs` for the compact form.
     """
-    if not signatures:
+    if len(signatures) == 0:
         return set()
-    perms = len(signatures[0])
-    if any(len(sig) != perms for sig in signatures):
-        raise ValueError("Inconsistent signature lengths")
-    if bands <= 0 or bands > perms:
-        raise ValueError("Invalid band count")
-    band_size = perms // bands
-    # Last band consumes remaining if not divisible
-    buckets: Dict[Tuple[int, Tuple[int, ...]], List[int]] = {}
-    for idx, sig in enumerate(signatures):
-        for b in range(bands):
-            start = b * band_size
-            end = (b+1) * band_size if b < bands - 1 else perms
-            key = (b, tuple(sig[start:end]))
-            buckets.setdefault(key, []).append(idx)
-    candidates: Set[Tuple[int, int]] = set()
-    for item_list in buckets.values():
-        if len(item_list) > 1:
-            base = item_list
-            for i in range(len(base)):
-                for j in range(i+1, len(base)):
-                    a, b = base[i], base[j]
-                    if a > b:
-                        a, b = b, a
-                    candidates.add((a, b))
-    return candidates
+    return set(unpack_pairs(lsh_candidate_pairs(signatures, bands, max_bucket), len(signatures)))
+
+
+# Packed candidate pairs scored per NumPy block in `estimate_candidates`.
+_ESTIMATE_BLOCK = 1 << 16
+
+
+class EstimatedSimilarity(float):
+    """A MinHash estimate of Jaccard similarity (fraction of agreeing signature slots),
+    returned instead of an exact score by `estimate_candidates`."""
+    __slots__ = ()
+    estimated = True
+
+
+def default_estimate_band(threshold: float, perms: int) -> float:
+    """Two standard errors of the agreement estimate at `threshold` (at least one slot),
+    so pairs decided without exact Jaccard are rarely on the wrong side of it."""
+    return max(2.0 * math.sqrt(threshold * (1.0 - threshold) / perms), 1.0 / perms)
+
+
+def estimate_candidates(signatures, pairs, threshold: float, band: float, stats: Optional[Dict[str, int]] = None):
+    """Score packed candidate pairs (see `lsh_candidate_pairs`) by signature agreement.
+    Pairs estimated at >= threshold + band are accepted as (EstimatedSimilarity, i, j);
+    pairs below threshold - band are dropped; the rest are returned, still packed and
+    sorted, for exact verification. Returns (accepted, uncertain)."""
+    n = len(signatures)
+    accepted: List[Tuple[float, int, int]] = []
+    hi, lo = threshold + band, threshold - band
+    np = numpy_or_none()
+    if np is not None and len(pairs):
+        matrix = signatures if isinstance(signatures, np.ndarray) else np.asarray(signatures, dtype=np.uint64)
+        perms = matrix.shape[1]
+        keep = []
+        for start in range(0, len(pairs), _ESTIMATE_BLOCK):
+            block = np.asarray(pairs[start:start + _ESTIMATE_BLOCK], dtype=np.int64)
+            left, right = np.divmod(block, n)
+            est = np.count_nonzero(matrix[left] == matrix[right], axis=1) / perms
+            sure = est >= hi
+            accepted.extend(zip(map(EstimatedSimilarity, est[sure].tolist()), left[sure].tolist(), right[sure].tolist()))
+            keep.append(block[(est >= lo) & ~sure])
+        uncertain = np.concatenate(keep)
+    else:
+        uncertain = array("q")
+        for p in pairs:
+            i, j = divmod(int(p), n)
+            a, b = signatures[i], signatures[j]
+            est = sum(x == y for x, y in zip(a, b)) / len(a)
+            if est >= hi:
+                accepted.append((EstimatedSimilarity(est), i, j))
+            elif est >= lo:
+                uncertain.append(i * n + j)
+    if stats is not None:
+        stats["estimate_accepted"] = len(accepted)
+        stats["estimate_uncertain"] = len(uncertain)
+        stats["estimate_rejected"] = len(pairs) - len(accepted) - len(uncertain)
+    return accepted, uncertain
@@ -0,0 +1,143 @@
+import codecs
+import mmap
+import os
+import threading
+import time
+from collections import deque
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+# Files up to this size are read whole into pooled buffers; larger ones are mmap'd.
+PREFETCH_MAX_BYTES = 8 << 20
+DECODE_CHUNK = 1 << 20  # bytes decoded per step
+# Release consumed pages of large mmap'd files (not available on Windows).
+_DONTNEED = getattr(mmap, "MADV_DONTNEED", None) if hasattr(mmap.mmap, "madvise") else None
+
+
+class BufferPool:
+    """Reusable bytearrays for whole-file reads; at most `depth` + 1 are live at once."""
+    def __init__(self):
+        self._free: List[bytearray] = []
+        self._lock = threading.Lock()
+
+    def take(self, size: int) -> bytearray:
+        with self._lock:
+            buf = self._free.pop() if self._free else None
+        if buf is None or len(buf) < size:
+            buf = bytearray(max(size, 1))
+        return buf
+
+    def give(self, buf: bytearray) -> None:
+        with self._lock:
+            self._free.append(buf)
+
+
+class FileData:
+    """Bytes of one file: a view of a pooled buffer, or an mmap for large files.
+    `release` must be called once the consumer is done with `view`. `seconds` is the time
+    the I/O thread spent reading it."""
+    __slots__ = ("view", "seconds", "_buf", "_mm", "_pool")
+
+    def __init__(self, view, buf=None, mm=None, pool=None):
+        self.view = view
+        self.seconds = 0.0
+        self._buf = buf
+        self._mm = mm
+        self._pool = pool
+
+    def consumed(self, start: int, length: int) -> None:
+        """Drop the resident pages of an mmap'd range once it has been read; they are
+        re-read from the file if touched again, so rounding `start` down is harmless."""
+        if self._mm is not None and _DONTNEED is not None:
+            lo = start - start % mmap.PAGESIZE
+            self._mm.madvise(_DONTNEED, lo, start + length - lo)
+
+    def release(self) -> None:
+        self.view.release()
+        if self._mm is not None:
+            self._mm.close()
+        elif self._pool is not None:
+            self._pool.give(self._buf)
+        self._buf = self._mm = self._pool = None
+
+
+def read_file_data(path: str, pool: BufferPool, max_size: Optional[int] = None):
+    """Stat + bulk read on an I/O thread. Returns FileData, None when the file exceeds
+    `max_size`, and raises OSError on read failures."""
+    with open(path, "rb", buffering=0) as f:
+        size = os.fstat(f.fileno()).st_size
+        if max_size is not None and size > max_size:
+            return None
+        if size > PREFETCH_MAX_BYTES:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            if hasattr(mm, "madvise"):
+                mm.madvise(mmap.MADV_SEQUENTIAL)
+            return FileData(memoryview(mm), mm=mm)
+        buf = pool.take(size)
+        view = memoryview(buf)
+        n = 0
+        while n < size:
+            got = f.readinto(view[n:size])
+            if not got:
+                break
+            n += got
+        view.release()
+        return FileData(memoryview(buf)[:n], buf=buf, pool=pool)
+
+
+def iter_text_chunks(data: FileData) -> Iterator[str]:
+    """Decode UTF-8 (invalid bytes dropped, as the text-mode reader does) in bounded steps.
+    Pages of an mmap'd file are dropped once decoded, so resident memory stays at about
+    one chunk however large the file is."""
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="ignore")
+    view = data.view
+    for start in range(0, len(view), DECODE_CHUNK):
+        text = decoder.decode(view[start:start + DECODE_CHUNK])
+        data.consumed(start, min(DECODE_CHUNK, len(view) - start))
+        if text:
+            yield text
+    tail = decoder.decode(b"", final=True)
+    if tail:
+        yield tail
+
+
+def prefetch(paths: Iterable[str], threads: int, depth: int, max_size: Optional[int] = None) -> Iterator[Tuple[str, object]]:
+    """Yield (path, FileData | None | OSError) in input order while up to `depth` reads run
+    ahead on `threads` I/O threads. `paths` is consumed lazily: a new read is only
+    submitted when the consumer takes a result (backpressure), so memory stays bounded.
+    Each yielded FileData is released when the consumer asks for the next item.
+    """
+    from concurrent.futures import ThreadPoolExecutor  # deferred: not needed for inline reads
+    pool = BufferPool()
+
+    def read(path: str):
+        start = time.perf_counter()
+        try:
+            data = read_file_data(path, pool, max_size)
+        except OSError as exc:
+            return exc
+        if data is not None:
+            data.seconds = time.perf_counter() - start
+        return data
+
+    it = iter(paths)
+    pending: deque = deque()
+    with ThreadPoolExecutor(max_workers=max(1, threads), thread_name_prefix="dupfinder-io") as ex:
+        try:
+            for path in it:
+                pending.append((path, ex.submit(read, path)))
+                if len(pending) >= depth:
+                    break
+            while pending:
+                path, fut = pending.popleft()
+                data = fut.result()
+                for nxt in it:
+                    pending.append((nxt, ex.submit(read, nxt)))
+                    break
+                try:
+                    yield path, data
+                finally:
+                    if isinstance(data, FileData):
+                        data.release()
+        finally:
+            for _, fut in pending:
+                fut.cancel()
@@ -0,0 +1,145 @@
+import math
+from itertools import islice
+from typing import Optional, Set
+from ._optional import numpy_or_none
+
+# Elements probed between early-exit checks in `bounded_jaccard`.
+BOUND_BLOCK = 1024
+# Slack on the overlap bound so float rounding can only delay an abort, never cause one.
+_EPS = 1e-9
+
+def _is_set(x) -> bool:
+    return isinstance(x, (set, frozenset))
+
+def sorted_intersection_size(a, b) -> int:
+    """Count common values of two sorted unique uint64 buffers (NumPy array or array('Q'))."""
+    if len(a) > len(b):
+        a, b = b, a
+    if not len(a):
+        return 0
+    np = numpy_or_none()
+    if np is not None:
+        a = np.asarray(a, dtype=np.uint64)
+        b = np.asarray(b, dtype=np.uint64)
+        idx = np.searchsorted(b, a)
+        idx[idx == b.size] = 0
+        return int(np.count_nonzero(b[idx] == a))
+    # Merge walk over the two sorted buffers
+    i = j = inter = 0
+    la, lb = len(a), len(b)
+    while i < la and j < lb:
+        x, y = a[i], b[j]
+        if x == y:
+            inter += 1
+            i += 1
+            j += 1
+        elif x < y:
+            i += 1
+        else:
+            j += 1
+    return inter
+
+def intersection_size(a, b) -> int:
+    if _is_set(a) and _is_set(b):
+        return len(a & b)
+    if _is_set(a) or _is_set(b):
+        return len(set(a).intersection(b))
+    return sorted_intersection_size(a, b)
+
+def sorted_jaccard(a, b) -> float:
+    """Jaccard of two sorted unique uint64 buffers without building temporary sets."""
+    la, lb = len(a), len(b)
+    if not la and not lb:
+        return 1.0
+    if not la or not lb:
+        return 0.0
+    inter = sorted_intersection_size(a, b)
+    return inter / (la + lb - inter)
+
+def compute_jaccard(a: Set[int], b: Set[int]) -> float:
+    if not _is_set(a) or not _is_set(b):
+        if not _is_set(a) and not _is_set(b):
+            return sorted_jaccard(a, b)
+        a, b = set(a), set(b)
+    if not a and not b:
+        return 1.0
+    if not a or not b:
+        return 0.0
+    inter = len(a & b)
+    return inter / (len(a) + len(b) - inter)
+
+
+def min_overlap(la: int, lb: int, threshold: float) -> int:
+    """Smallest |A & B| with |A & B| / (la + lb - |A & B|) >= threshold."""
+    return math.ceil(threshold * (la + lb) / (1 + threshold) - _EPS)
+
+
+def _bounded_sets(small, big, need: int) -> Optional[int]:
+    it = iter(small)
+    left = len(small)
+    inter = 0
+    contains = big.__contains__
+    while left:
+        step = min(left, BOUND_BLOCK)
+        inter += sum(map(contains, islice(it, step)))
+        left -= step
+        if inter + left < need:
+            return None
+    return inter
+
+
+def _bounded_sorted(np, a, b, need: int) -> Optional[int]:
+    if np is not None:
+        a = np.asarray(a, dtype=np.uint64)
+        b = np.asarray(b, dtype=np.uint64)
+        inter = 0
+        for start in range(0, a.size, BOUND_BLOCK):
+            part = a[start:start + BOUND_BLOCK]
+            idx = np.searchsorted(b, part)
+            idx[idx == b.size] = 0
+            inter += int(np.count_nonzero(b[idx] == part))
+            if inter + a.size - start - part.size < need:
+                return None
+        return inter
+    i = j = inter = 0
+    la, lb = len(a), len(b)
+    while i < la and j < lb:
+        if inter + min(la - i, lb - j) < need:
+            return None
+        x, y = a[i], b[j]
+        if x == y:
+            inter += 1
+            i += 1
+            j += 1
+        elif x < y:
+            i += 1
+        else:
+            j += 1
+    return inter if inter >= need else None
+
+
+def bounded_jaccard(a, b, threshold: float) -> Optional[float]:
+    """`compute_jaccard(a, b)` if it is >= `threshold`, else None.
+    Walks the smaller input (sets, or sorted uint64 buffers merged / searched in blocks)
+    and gives up as soon as the overlap still reachable cannot meet the threshold; a
+    size ratio below the threshold is rejected before touching any element. Union size
+    is |A| + |B| - |A & B|, so no intermediate sets are built.
+    """
+    if threshold <= 0:
+        return compute_jaccard(a, b)
+    if _is_set(a) != _is_set(b):
+        a, b = set(a), set(b)
+    la, lb = len(a), len(b)
+    if la > lb:
+        a, b, la, lb = b, a, lb, la
+    if not la:
+        sim = 0.0 if lb else 1.0
+        return sim if sim >= threshold else None
+    if la < (threshold - _EPS) * lb:  # J <= |A| / |B|
+        return None
+    need = min_overlap(la, lb, threshold)
+    inter = _bounded_sets(a, b, need) if _is_set(a) else _bounded_sorted(numpy_or_none(), a, b, need)
+    if inter is None:
+        return None
+    sim = inter / (la + lb - inter)
+    return sim if sim >= threshold else None
@@ -0,0 +1,134 @@
+import sys
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+STAGES = ("discovery", "read", "tokenize", "hash", "minhash", "lsh", "join", "verify", "cluster")
+MAX_ERRORS = 20  # failure messages kept verbatim; the rest are only counted
+
+
+def peak_rss() -> Optional[int]:
+    """Peak resident set size in bytes of this process plus its finished children."""
+    if resource is None:
+        return None
+    scale = 1 if sys.platform == "darwin" else 1024  # ru_maxrss is KiB on Linux
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return max(own, children) * scale
+
+
+class RunStats:
+    """Counters and per-stage wall time for one or more scans.
+    Stage times of file-level work (read, tokenize, hash) are summed over files and
+    worker processes, so with --workers or read-ahead threads they can exceed wall time.
+    """
+    def __init__(self):
+        self.counters: Dict[str, int] = {}
+        self.timings: Dict[str, float] = {stage: 0.0 for stage in STAGES}
+        self.errors: List[str] = []
+
+    def add(self, name: str, n: int = 1) -> None:
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def add_time(self, stage: str, seconds: float) -> None:
+        self.timings[stage] = self.timings.get(stage, 0.0) + seconds
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - start)
+
+    def timed(self, stage: str, it):
+        """Re-yield `it`, charging the time spent producing each item to `stage`."""
+        it = iter(it)
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(it)
+            except StopIteration:
+                self.add_time(stage, time.perf_counter() - start)
+                return
+            self.add_time(stage, time.perf_counter() - start)
+            yield item
+
+    def merge(self, part: Dict) -> None:
+        """Fold in a worker's {"counters", "timings", "errors"} dict."""
+        for name, n in part.get("counters", {}).items():
+            self.add(name, n)
+        for stage, seconds in part.get("timings", {}).items():
+            self.add_time(stage, seconds)
+        self.record_errors(part.get("errors", ()))
+
+    def record_errors(self, errors) -> None:
+        room = MAX_ERRORS - len(self.errors)
+        if room > 0:
+            self.errors.extend(list(errors)[:room])
+
+    def to_dict(self, **extra) -> Dict:
+        out = {
+            "counters": dict(sorted(self.counters.items())),
+            "timings_s": {k: round(v, 6) for k, v in self.timings.items()},
+            "errors": self.errors,
+            "peak_rss_bytes": peak_rss(),
+        }
+        out.update(extra)
+        return out
+
+
+class FileStats:
+    """Picklable per-batch tally filled while signing (possibly in a worker process)."""
+    __slots__ = ("counters", "timings", "errors")
+
+    def __init__(self):
+        self.counters: Dict[str, int] = {}
+        self.timings: Dict[str, float] = {}
+        self.errors: List[str] = []
+
+    def add(self, name: str, n: int = 1) -> None:
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def add_time(self, stage: str, seconds: float) -> None:
+        self.timings[stage] = self.timings.get(stage, 0.0) + seconds
+
+    def fail(self, path: str, exc: BaseException) -> None:
+        self.add("files_failed")
+        if len(self.errors) < MAX_ERRORS:
+            self.errors.append(f"{path}: {type(exc).__name__}: {exc}")
+
+    def as_dict(self) -> Dict:
+        return {"counters": self.counters, "timings": self.timings, "errors": self.errors}
+
+
+def _mb(n: Optional[int]) -> str:
+    return "n/a" if n is None else f"{n / (1 << 20):.1f} MB"
+
+
+def format_stats(report: Dict) -> List[str]:
+    """Human-readable lines for a `DuplicateFinder.stats_report()` dict."""
+    counters = report["counters"]
+
+    def get(name: str) -> int:
+        return counters.get(name, 0)
+
+    lines = [
+        f"files: {get('files_discovered')} discovered, {get('files_signed')} signed, {get('exact_copies')} exact copies, "
+        f"{get('cache_hits')} cache hits, {get('files_failed')} failed, {get('files_too_large')} too large, "
+        f"{get('files_ignored')} ignored, {get('files_size_filtered')} size-filtered, {get('dirs_pruned')} dirs pruned",
+        f"data: {_mb(get('bytes_read'))} read, {get('tokens')} tokens, {get('shingles')} shingles",
+        f"pairs: {get('all_pairs')} possible, {get('candidate_pairs')} candidates, {get('verified_matches')} verified matches",
+        "time: " + ", ".join(f"{stage} {seconds:.3f}s" for stage, seconds in report["timings_s"].items()),
+        f"memory: peak RSS {_mb(report.get('peak_rss_bytes'))}",
+    ]
+    buckets = report.get("lsh", {}).get("bucket_sizes")
+    if buckets:
+        lines.append("lsh bucket sizes: " + ", ".join(f"{size}: {n}" for size, n in buckets.items()))
+    lines.extend(f"failed: {err}" for err in report["errors"])
+    return ["stats: " + line for line in lines]
@@ -0,0 +1,212 @@
+import os
+import re
+import tokenize as pytokenize
+import unicodedata
+from itertools import chain
+from typing import Dict, Iterable, Iterator, List
+
+TOKEN_RE = re.compile(r"[A-Za-z0-9_]+")
+# "regex" tokenizes every file with TOKEN_RE; "auto" picks a tokenizer by extension.
+TOKENIZER_MODES = ("regex", "auto")
+BATCH_TOKENS = 1 << 14  # tokens per yielded batch for the line-based tokenizers
+STR, NUM = "<str>", "<num>"  # literal placeholders; never produced by TOKEN_RE
+
+
+def iter_token_batches(chunks: Iterable[str]) -> Iterator[List[str]]:
+    """Tokenize a stream of text chunks; a token cut by a chunk boundary is carried
+    into the next chunk, so the concatenated batches equal tokenize(whole text)."""
+    carry = ""
+    for chunk in chunks:
+        text = carry + chunk
+        tokens = TOKEN_RE.findall(text)
+        carry = ""
+        if tokens and TOKEN_RE.match(text[-1]):
+            carry = tokens.pop()
+        if tokens:
+            yield tokens
+    if carry:
+        yield [carry]
+
+
+def iter_lines(chunks: Iterable[str]) -> Iterator[str]:
+    """Re-split a chunk stream into lines (keeping line endings)."""
+    carry = ""
+    for chunk in chunks:
+        lines = (carry + chunk).splitlines(keepends=True)
+        carry = lines.pop() if lines and not lines[-1].endswith(("\n", "\r")) else ""
+        yield from lines
+    if carry:
+        yield carry
+
+
+class Tokenizer:
+    """Turns a file's text chunks into batches of tokens for ShingleAccumulator.
+    Subclasses override `batches`; they must be deterministic and keep no per-file
+    state (one instance serves every file)."""
+    name = "regex"
+
+    def batches(self, chunks: Iterable[str]) -> Iterator[List[str]]:
+        return iter_token_batches(chunks)
+
+
+class PythonTokenizer(Tokenizer):
+    """Python source via the stdlib `tokenize` module. Comments, docstrings (string
+    expression statements) and layout tokens are dropped; string and number literals
+    become placeholders; identifiers are NFKC-normalized as the interpreter does.
+    Operators and brackets are dropped like in the regex tokenizer. Source that does not
+    tokenize (not Python, bad indentation) continues with the regex tokenizer."""
+    name = "python"
+    _BREAKS = {pytokenize.NEWLINE, pytokenize.INDENT, pytokenize.DEDENT, pytokenize.ENDMARKER}
+    _LAYOUT = {pytokenize.COMMENT, pytokenize.NL, pytokenize.ENCODING}
+    _FSTRING_START = getattr(pytokenize, "FSTRING_START", None)  # 3.12+: f-strings are split up
+    _FSTRING_END = getattr(pytokenize, "FSTRING_END", None)
+
+    def batches(self, chunks: Iterable[str]) -> Iterator[List[str]]:
+        lines = iter_lines(chunks)
+        pending: List[str] = []  # lines of the unfinished statement, replayed on errors
+
+        def readline() -> str:
+            line = next(lines, "")
+            pending.append(line)
+            return line
+
+        out: List[str] = []
+        done = 0  # len(out) at the end of the last complete statement
+        at_statement_start = True
+        held = False  # a string opening a statement: a docstring unless more follows
+        fstring_depth = 0
+        try:
+            for tok in pytokenize.generate_tokens(readline):
+                kind = tok.type
+                if fstring_depth:
+                    fstring_depth += (kind == self._FSTRING_START) - (kind == self._FSTRING_END)
+                    continue
+                if kind == pytokenize.NEWLINE or (kind == pytokenize.NL and at_statement_start):
+                    pending.clear()  # a DEDENT comes after the next line is read: keep that
+                    done = len(out)
+                    if done >= BATCH_TOKENS:  # flush whole statements only
+                        yield out
+                        out, done = [], 0
+                if kind in self._BREAKS:
+                    held = False  # the held string was the whole statement
+                    at_statement_start = True
+                    continue
+                if kind in self._LAYOUT:
+                    continue
+                if held:
+                    out.append(STR)
+                    held = False
+                if kind == pytokenize.OP:
+                    pass
+                elif kind == pytokenize.STRING or kind == self._FSTRING_START:
+                    if kind == self._FSTRING_START:
+                        fstring_depth = 1
+                    if at_statement_start:
+                        held = True
+                    else:
+                        out.append(STR)
+                elif kind == pytokenize.NUMBER:
+                    out.append(NUM)
+                elif kind == pytokenize.NAME:
+                    name = tok.string
+                    out.append(name if name.isascii() else unicodedata.normalize("NFKC", name))
+                else:
+                    out.extend(TOKEN_RE.findall(tok.string))  # ERRORTOKEN and friends
+                at_statement_start = False
+        except (pytokenize.TokenError, SyntaxError):
+            # the regex tokenizer redoes the unfinished statement from its first line
+            del out[done:]
+            if out:
+                yield out
+            out = []
+            yield from iter_token_batches(chain(pending, lines))
+        if out:
+            yield out
+
+
+class MarkdownTokenizer(Tokenizer):
+    """Markdown: fence delimiter lines (and their info strings), link and image targets,
+    reference definitions and HTML tags are dropped; prose and the bodies of fenced code
+    blocks are tokenized like the regex tokenizer."""
+    name = "markdown"
+    _FENCE = re.compile(r"^ {0,3}(`{3,}|~{3,})")
+    _REF_DEF = re.compile(r"^ {0,3}\[[^\]]+\]:\s*\S+")
+    _MARKUP = re.compile(r"\]\([^)]*\)|<[^>\n]*>")  # ](target) and <tag>/<autolink>
+
+    def batches(self, chunks: Iterable[str]) -> Iterator[List[str]]:
+        out: List[str] = []
+        fence = ""
+        for line in iter_lines(chunks):
+            m = self._FENCE.match(line)
+            if fence:
+                if m and m.group(1)[0] == fence[0] and len(m.group(1)) >= len(fence) and not line[m.end():].strip():
+                    fence = ""
+                else:
+                    out.extend(TOKEN_RE.findall(line))
+            elif m:
+                fence = m.group(1)
+            elif not self._REF_DEF.match(line):
+                out.extend(TOKEN_RE.findall(self._MARKUP.sub("]", line)))
+            if len(out) >= BATCH_TOKENS:
+                yield out
+                out = []
+        if out:
+            yield out
+
+
+class JsonTokenizer(Tokenizer):
+    """JSON structural tokens: brackets, `key:` tokens for object keys, words of string
+    values, and numbers / true / false / null as written. Lexical only, so JSON with
+    comments or trailing commas still tokenizes. Reads the whole document."""
+    name = "json"
+    _LEX = re.compile(r'"((?:[^"\\]|\\.)*)"(\s*:)?|(-?\d+(?:\.\d+)?(?:[eE][+-]?\d+)?|true|false|null)|([{}\[\]])')
+
+    def batches(self, chunks: Iterable[str]) -> Iterator[List[str]]:
+        out: List[str] = []
+        for m in self._LEX.finditer("".join(chunks)):
+            string, is_key, scalar, bracket = m.groups()
+            if is_key:
+                out.append("key:" + string)
+            elif string is not None:
+                out.extend(TOKEN_RE.findall(string))
+            else:
+                out.append(scalar or bracket)
+            if len(out) >= BATCH_TOKENS:
+                yield out
+                out = []
+        if out:
+            yield out
+
+
+REGEX = Tokenizer()
+_registry: Dict[str, Tokenizer] = {}
+
+
+def register_tokenizer(extensions: Iterable[str], tokenizer: Tokenizer) -> None:
+    """Use `tokenizer` for files with these extensions under `tokenizer="auto"`.
+    Register before scanning: workers of a process pool started on a spawn platform do not
+    see later registrations, and signature caches do not record which plugins produced
+    an entry (use a separate cache file per plugin set)."""
+    for ext in extensions:
+        _registry[ext.lower()] = tokenizer
+
+
+def tokenizer_for(path: str, mode: str = "auto") -> Tokenizer:
+    if mode == "regex":
+        return REGEX
+    return _registry.get(os.path.splitext(path)[1].lower(), REGEX)
+
+
+def validate_tokenizer(mode: str) -> None:
+    if mode not in TOKENIZER_MODES:
+        raise ValueError(f"Unknown tokenizer mode: {mode}")
+
+
+def tokenize_text(text: str, path: str, mode: str = "auto") -> List[str]:
+    """All tokens of `text` as the tokenizer chosen for `path` produces them."""
+    return [t for batch in tokenizer_for(path, mode).batches([text]) for t in batch]
+
+
+register_tokenizer((".py", ".pyi", ".pyw"), PythonTokenizer())
+register_tokenizer((".md", ".markdown"), MarkdownTokenizer())
+register_tokenizer((".json",), JsonTokenizer())
@@ -0,0 +1,141 @@
+import math
+from array import array
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
+from .similarity import bounded_jaccard
+
+# Below this many comparisons the pool start-up costs more than it saves.
+PARALLEL_MIN_PAIRS = 20_000
+# Candidate pairs per block shipped to a worker.
+PAIR_BLOCK = 50_000
+
+Match = Tuple[float, int, int]
+
+# Per-worker copy of every file's shingles, installed once by the pool initializer.
+_shared: Sequence = ()
+
+
+def _init_worker(shingle_sets: Sequence) -> None:
+    global _shared
+    _shared = shingle_sets
+
+
+def _verify_tile(sets: Sequence, tile: Tuple[int, int, int, int], threshold: float) -> List[Match]:
+    i0, i1, j0, j1 = tile
+    out: List[Match] = []
+    for i in range(i0, i1):
+        a = sets[i]
+        for j in range(max(j0, i + 1), j1):
+            sim = bounded_jaccard(a, sets[j], threshold)
+            if sim is not None:
+                out.append((sim, i, j))
+    return out
+
+
+def _verify_pairs(sets: Sequence, left: Sequence[int], right: Sequence[int], threshold: float) -> List[Match]:
+    out: List[Match] = []
+    for i, j in zip(left, right):
+        sim = bounded_jaccard(sets[i], sets[j], threshold)
+        if sim is not None:
+            out.append((sim, i, j))
+    return out
+
+
+def _worker_tile(tile, threshold):
+    return _verify_tile(_shared, tile, threshold)
+
+
+def _worker_pairs(left, right, threshold):
+    return _verify_pairs(_shared, left, right, threshold)
+
+
+def all_pair_tiles(n: int, blocks: int) -> List[Tuple[int, int, int, int]]:
+    """Split the upper triangle of an n x n comparison matrix into (i0, i1, j0, j1) tiles."""
+    step = max(1, math.ceil(n / max(1, blocks)))
+    edges = list(range(0, n, step)) + [n]
+    tiles = []
+    for bi in range(len(edges) - 1):
+        for bj in range(bi, len(edges) - 1):
+            tiles.append((edges[bi], edges[bi + 1], edges[bj], edges[bj + 1]))
+    return tiles
+
+
+def _is_packed(pairs) -> bool:
+    return getattr(pairs, "typecode", None) == "q" or getattr(pairs, "ndim", None) == 1
+
+
+def _pair_blocks(pairs, n: int):
+    """Blocks of (left, right) index arrays in ascending pair order. `pairs` holds (i, j)
+    tuples or sorted packed int64 `i * n + j` values (see minhash.lsh_candidate_pairs)."""
+    if _is_packed(pairs):
+        for start in range(0, len(pairs), PAIR_BLOCK):
+            block = pairs[start:start + PAIR_BLOCK]
+            left, right = array("q"), array("q")
+            if hasattr(block, "tobytes") and hasattr(block, "ndim"):
+                left.frombytes((block // n).tobytes())
+                right.frombytes((block % n).tobytes())
+            else:
+                for p in block:
+                    i, j = divmod(p, n)
+                    left.append(i)
+                    right.append(j)
+            yield left, right
+        return
+    left, right = array("q"), array("q")
+    for i, j in sorted(pairs):
+        left.append(i)
+        right.append(j)
+        if len(left) >= PAIR_BLOCK:
+            yield left, right
+            left, right = array("q"), array("q")
+    if left:
+        yield left, right
+
+
+def iter_verified(shingle_sets: Sequence, pairs: Optional[Iterable[Tuple[int, int]]], threshold: float, workers: int = 0) -> Iterator[Match]:
+    """Exact Jaccard for candidate (i, j) index pairs (tuples or packed int64, see
+    `_pair_blocks`), or every i < j pair when `pairs` is None.
+    Yields (similarity, i, j) for passing pairs block by block, so consumers never need
+    the whole result list. With `workers` > 1 blocks run on a process pool; shingles are
+    sent to each worker once by the pool initializer, never per pair. Output is the same
+    as the serial path (up to order).
+    """
+    n = len(shingle_sets)
+    total = n * (n - 1) // 2 if pairs is None else len(pairs)
+    if workers and workers > 1 and total >= PARALLEL_MIN_PAIRS:
+        yield from _iter_parallel(shingle_sets, pairs, threshold, workers)
+        return
+    if pairs is None:
+        for tile in all_pair_tiles(n, max(1, n // 256)):
+            yield from _verify_tile(shingle_sets, tile, threshold)
+        return
+    for left, right in _pair_blocks(pairs, n):
+        yield from _verify_pairs(shingle_sets, left, right, threshold)
+
+
+def verify_candidates(shingle_sets: Sequence, pairs: Optional[Iterable[Tuple[int, int]]], threshold: float, workers: int = 0) -> List[Match]:
+    """List form of `iter_verified` (the caller sorts it)."""
+    return list(iter_verified(shingle_sets, pairs, threshold, workers))
+
+
+def _iter_parallel(shingle_sets: Sequence, pairs, threshold: float, workers: int) -> Iterator[Match]:
+    if pairs is None:
+        # ~4 tiles per worker along each axis keeps the triangle balanced
+        tiles = all_pair_tiles(len(shingle_sets), workers * 4)
+        blocks = [(_worker_tile, (tile, threshold)) for tile in tiles]
+    else:
+        blocks = [(_worker_pairs, (left, right, threshold)) for left, right in _pair_blocks(pairs, len(shingle_sets))]
+    from concurrent.futures import ProcessPoolExecutor  # multiprocessing only when used
+    from concurrent.futures.process import BrokenProcessPool
+    done = 0
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(list(shingle_sets),)) as ex:
+            futures = [ex.submit(fn, *args) for fn, args in blocks]
+            for fut in futures:
+                result = fut.result()
+                done += 1
+                yield from result
+    except (OSError, BrokenProcessPool):
+        # Finish the blocks not yet yielded on the serial path
+        _init_worker(shingle_sets)
+        for fn, args in blocks[done:]:
+            yield from fn(*args)
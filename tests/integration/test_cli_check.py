@@ -0,0 +1,68 @@
+import pytest
+from click.testing import CliRunner
+from duplicate_finder.cli import main
+import json
+
+
+def build(runner, sample_dir, tmp_path):
+    idx = str(tmp_path / "corpus.idx")
+    result = runner.invoke(main, ["index", str(sample_dir), "--out", idx, "--ext", ".txt,.md", "--k", "2"])
+    assert result.exit_code == 0
+    return idx
+
+
+def test_check_reports_near_duplicate(sample_dir, tmp_path):
+    runner = CliRunner()
+    idx = build(runner, sample_dir, tmp_path)
+    new = tmp_path / "new.txt"
+    new.write_text("alpha beta gamma delta epsilon", encoding="utf-8")
+    result = runner.invoke(main, ["check", str(new), "--index", idx, "--threshold", "0.9", "--json"])
+    assert result.exit_code == 1
+    data = json.loads(result.stdout)
+    assert {rec["match"] for rec in data} == {str(sample_dir / "a.txt"), str(sample_dir / "d.md")}
+
+
+def test_check_clean_file_and_stdin(sample_dir, tmp_path):
+    runner = CliRunner()
+    idx = build(runner, sample_dir, tmp_path)
+    clean = tmp_path / "clean.txt"
+    clean.write_text("nothing in common with the corpus at all", encoding="utf-8")
+    result = runner.invoke(main, ["check", "-", "--index", idx], input=f"{clean}\n{tmp_path / 'gone.txt'}\n")
+    assert result.exit_code == 0
+    assert result.stdout == ""
+
+
+def test_check_excludes_indexed_file_itself(sample_dir, tmp_path):
+    runner = CliRunner()
+    idx = build(runner, sample_dir, tmp_path)
+    result = runner.invoke(main, ["check", str(sample_dir / "b.txt"), "--index", idx, "--threshold", "0.99"])
+    assert result.exit_code == 0
+
+
+def test_check_missing_index(tmp_path):
+    runner = CliRunner()
+    result = runner.invoke(main, ["check", "x.txt", "--index", str(tmp_path / "nope.idx")])
+    assert result.exit_code == 2
+
+
+def test_check_reuses_index_tokenizer(tmp_path):
+    corpus = tmp_path / "corpus"
+    corpus.mkdir()
+    (corpus / "a.py").write_text("def load(path):\n    # read it\n    return open(path, 'rb').read()\n", encoding="utf-8")
+    idx = str(tmp_path / "py.idx")
+    runner = CliRunner()
+    assert runner.invoke(main, ["index", str(corpus), "--out", idx, "--ext", ".py", "--k", "2", "--tokenizer", "auto"]).exit_code == 0
+    new = tmp_path / "new.py"
+    new.write_text("def load(path):\n    return open(path, 'r').read()  # text mode\n", encoding="utf-8")
+    result = runner.invoke(main, ["check", str(new), "--index", idx, "--ext", ".py", "--threshold", "1.0"])
+    assert result.exit_code == 1  # comments and literal values are not part of the signature
+
+
+def test_check_reads_inline(sample_dir, tmp_path, monkeypatch):
+    from duplicate_finder import core
+    runner = CliRunner()
+    idx = build(runner, sample_dir, tmp_path)
+    monkeypatch.setattr(core, "prefetch", lambda *a, **kw: pytest.fail("check started read-ahead threads"))
+    new = tmp_path / "new.txt"
+    new.write_text("alpha beta gamma delta epsilon", encoding="utf-8")
+    assert runner.invoke(main, ["check", str(new), "--index", idx, "--threshold", "0.9"]).exit_code == 1
@@ -1,3 +1,4 @@
+import os
 from click.testing import CliRunner
 from duplicate_finder.cli import main
 import json
@@ -33,3 +34,108 @@ def test_cli_clusters_json(sample_dir):
     if data["clusters"]:
         cluster = data["clusters"][0]
         assert "representative" in cluster and "members" in cluster and "size" in cluster
+
+
+def test_cli_cache_stats(sample_dir, tmp_path):
+    runner = CliRunner()
+    db = str(tmp_path / "cache" / "sigs.sqlite")
+    args = ["scan", str(sample_dir), "--json", "--ext", ".txt,.md", "--threshold", "0.5", "--cache", db]
+    first = runner.invoke(main, args)
+    second = runner.invoke(main, args)
+    assert first.exit_code == 0 and second.exit_code == 0
+    assert json.loads(first.stdout) == json.loads(second.stdout)
+    # d.md is byte-identical to a.txt, so it reuses a.txt's signature without a lookup
+    assert "3 hits, 0 misses" in second.stderr
+    uncached = runner.invoke(main, args + ["--no-cache"])
+    assert "cache:" not in uncached.stderr
+
+
+def test_cli_jsonl_streams_same_pairs(sample_dir):
+    runner = CliRunner()
+    args = ["scan", str(sample_dir), "--ext", ".txt,.md", "--threshold", "0.5"]
+    full = json.loads(runner.invoke(main, args + ["--json"]).output)
+    result = runner.invoke(main, args + ["--jsonl"])
+    assert result.exit_code == 0
+    lines = [json.loads(line) for line in result.stdout.splitlines()]
+    assert sorted(lines, key=lambda r: (r["file_a"], r["file_b"])) == sorted(full, key=lambda r: (r["file_a"], r["file_b"]))
+    ordered = [json.loads(line) for line in runner.invoke(main, args + ["--jsonl", "--sorted"]).stdout.splitlines()]
+    assert ordered == full
+
+
+def test_cli_top_keeps_best_pairs(sample_dir):
+    runner = CliRunner()
+    args = ["scan", str(sample_dir), "--ext", ".txt,.md", "--threshold", "0.1", "--json"]
+    full = json.loads(runner.invoke(main, args).output)
+    top = json.loads(runner.invoke(main, args + ["--top", "2"]).output)
+    assert top == full[:2]
+
+
+def test_cli_jsonl_clusters(sample_dir):
+    runner = CliRunner()
+    result = runner.invoke(main, ["scan", str(sample_dir), "--clusters", "--jsonl", "--ext", ".txt,.md", "--threshold", "0.5"])
+    assert result.exit_code == 0
+    records = [json.loads(line) for line in result.stdout.splitlines()]
+    assert records and all(r["mode"] == "cluster" and r["size"] == len(r["members"]) for r in records)
+
+
+def test_cli_json_and_jsonl_conflict(sample_dir):
+    result = CliRunner().invoke(main, ["scan", str(sample_dir), "--json", "--jsonl"])
+    assert result.exit_code != 0
+
+
+def test_cli_lsh_recall_reports_layout(tmp_path):
+    for i in range(55):
+        (tmp_path / f"f{i}.txt").write_text(" ".join(f"t{i}_{j}" for j in range(20)))
+    result = CliRunner().invoke(main, ["scan", str(tmp_path), "--ext", ".txt", "--lsh-recall", "0.9", "--json"])
+    assert result.exit_code == 0
+    assert "predicted FNR" in result.stderr
+    assert "reduction" in result.stderr
+
+
+def test_cli_excludes_and_default_ignores(tmp_path):
+    text = "alpha beta gamma delta epsilon zeta eta theta"
+    for rel in ("a.txt", "copy/b.txt", "node_modules/c.txt", "vendor/d.txt"):
+        (tmp_path / rel).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / rel).write_text(text)
+    (tmp_path / ".dupignore").write_text("# vendored\nvendor/\n")
+    runner = CliRunner()
+    args = ["scan", str(tmp_path), "--ext", ".txt", "--json"]
+    files = lambda res: {os.path.basename(p) for rec in json.loads(res.output) for p in (rec["file_a"], rec["file_b"])}
+    assert files(runner.invoke(main, args)) == {"a.txt", "b.txt"}
+    assert files(runner.invoke(main, args + ["--exclude", "copy/"])) == set()
+    assert files(runner.invoke(main, args + ["--no-default-ignores"])) == {"a.txt", "b.txt", "c.txt"}
+
+
+def test_cli_max_df_reuses_table(tmp_path):
+    corpus = tmp_path / "corpus"
+    corpus.mkdir()
+    header = " ".join(f"lic{i}" for i in range(30))
+    for i in range(20):
+        (corpus / f"f{i}.txt").write_text(header + " " + " ".join(f"b{i}_{j}" for j in range(30)))
+    table = str(tmp_path / "df.bin")
+    runner = CliRunner()
+    args = ["scan", str(corpus), "--ext", ".txt", "--threshold", "0.3", "--json", "--max-df", "0.5", "--df-table", table]
+    first = runner.invoke(main, args)
+    assert first.exit_code == 0 and os.path.exists(table)
+    assert "df filter: 26 shingles" in first.stderr
+    assert json.loads(first.stdout) == []  # only the shared header made them similar
+    mtime = os.stat(table).st_mtime_ns
+    assert runner.invoke(main, args).exit_code == 0
+    assert os.stat(table).st_mtime_ns == mtime
+
+
+def test_cli_estimate_flags_scores(tmp_path):
+    for i in range(55):
+        (tmp_path / f"f{i}.txt").write_text(" ".join(f"t{i}_{j}" for j in range(20)))
+    base = " ".join(f"shared{j}" for j in range(60))
+    (tmp_path / "d1.txt").write_text(base)
+    (tmp_path / "d2.txt").write_text(base + " extra")
+    runner = CliRunner()
+    result = runner.invoke(main, ["scan", str(tmp_path), "--ext", ".txt", "--k", "3", "--threshold", "0.8", "--estimate", "--json"])
+    assert result.exit_code == 0
+    assert [rec["estimated"] for rec in json.loads(result.stdout)] == [True]
+    assert "estimate: 1 accepted" in result.stderr
+    exact = runner.invoke(main, ["scan", str(tmp_path), "--ext", ".txt", "--k", "3", "--threshold", "0.8", "--estimate", "--estimate-band", "1", "--json"])
+    assert [rec["estimated"] for rec in json.loads(exact.stdout)] == [False]
+    table = runner.invoke(main, ["scan", str(tmp_path), "--ext", ".txt", "--k", "3", "--threshold", "0.8", "--estimate"])
+    assert "~ " in table.stdout and "MinHash estimate" in table.stdout
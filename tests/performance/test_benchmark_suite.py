@@ -0,0 +1,45 @@
+import os
+import sys
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "benchmarks"))
+import suite  # noqa: E402
+
+
+def result(seconds, rss=50.0, recall=1.0, workers=1):
+    return {"corpus": "code", "files": 100, "workers": workers, "seconds": seconds, "peak_rss_mb": rss, "recall": recall}
+
+
+def test_compare_flags_regressions_beyond_tolerance():
+    baseline = {"results": [result(1.0), result(1.0, workers=2)]}
+    assert suite.compare({"results": [result(1.2)]}, baseline, 0.25, 0.02) == []
+    slow, fat, lossy = (suite.compare({"results": [r]}, baseline, 0.25, 0.02)
+                        for r in (result(1.5), result(1.0, rss=80.0), result(1.0, recall=0.9)))
+    assert len(slow) == len(fat) == len(lossy) == 1 and "code/100/w1" in slow[0]
+    assert suite.compare({"results": [result(9.0, workers=4)]}, baseline, 0.25, 0.02) == []  # no baseline case
+    assert suite.compare({"results": [result(0.04)]}, {"results": [result(0.01)]}, 0.25, 0.02) == []  # noise floor
+
+
+def test_corpora_are_reproducible(tmp_path):
+    import random
+    for name, gen in suite.CORPORA.items():
+        if name == "huge":
+            continue
+        a, b = tmp_path / f"{name}_a", tmp_path / f"{name}_b"
+        a.mkdir()
+        b.mkdir()
+        gen(random.Random("s"), str(a), 30)
+        gen(random.Random("s"), str(b), 30)
+        files = sorted(os.listdir(a))
+        assert len(files) == 30 and files == sorted(os.listdir(b))
+        assert all((a / f).read_text() == (b / f).read_text() for f in files)
+
+
+@pytest.mark.slow
+def test_suite_run_and_baseline_roundtrip():
+    opts = {"k": 5, "threshold": 0.8, "lsh_recall": None, "recall_max_files": 1000}
+    report = suite.run_suite(["chain"], [120], [1], opts, log=lambda line: None)
+    (r,) = report["results"]
+    assert r["signed_files"] == 120 and r["pairs"] > 0 and r["recall"] is not None
+    assert set(r["stages"]) >= {"discovery", "minhash", "lsh", "verify"}
+    assert suite.compare(report, report, 0.0, 0.0) == []
@@ -96,3 +96,54 @@ def test_memory_footprint():
         print(f"\nMemory delta: {rss_delta:.2f} MB for {len(sigs)} files")
         # Sanity check: should not exceed 500MB for this dataset
         assert rss_delta < 500
+
+
+@pytest.mark.slow
+def test_streaming_peak_memory_is_flat():
+    """Performance test: signing a ~40MB file keeps peak allocations near one read chunk."""
+    import tracemalloc
+    from duplicate_finder.core import _compute_file_signature, _SignOptions
+    paragraph = " ".join(f"tok{i % 997}" for i in range(2000)) + "\n"
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "huge.txt")
+        with open(path, "w", encoding="utf-8") as f:
+            for _ in range(4000):
+                f.write(paragraph)
+        tracemalloc.start()
+        sig = _compute_file_signature((path, _SignOptions(5, "blake2b", True, None)))
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        size_mb = os.path.getsize(path) / (1024 * 1024)
+        print(f"\nFile: {size_mb:.1f}MB, peak traced: {peak / (1024 * 1024):.1f}MB")
+        assert sig is not None and sig.size == 8_000_000
+        assert peak < 64 * 1024 * 1024
+
+
+@pytest.mark.slow
+def test_prefetch_peak_rss_is_flat():
+    """Performance test: the default read-ahead path (mmap for large files) keeps RSS flat."""
+    pytest.importorskip("resource")
+    import subprocess
+    import sys
+    paragraph = " ".join(f"tok{i % 997}" for i in range(2000)) + "\n"
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "huge.txt")
+        with open(path, "w", encoding="utf-8") as f:
+            for _ in range(8000):
+                f.write(paragraph)
+        script = (
+            "import resource, sys\n"
+            "from duplicate_finder.core import DuplicateFinder\n"
+            "finder = DuplicateFinder(compact=True)\n"
+            "finder.sign_files([])\n"
+            "before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss\n"
+            "sigs = finder.sign_files([sys.argv[1]])\n"
+            "assert len(sigs) == 1 and sigs[0].size == 16_000_000\n"
+            "print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - before)\n"
+        )
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+        out = subprocess.run([sys.executable, "-c", script, path], capture_output=True, text=True, env=env, check=True)
+        growth_mb = int(out.stdout) / (1024 * 1024 if sys.platform == "darwin" else 1024)
+        size_mb = os.path.getsize(path) / (1024 * 1024)
+        print(f"\nFile: {size_mb:.1f}MB, RSS growth: {growth_mb:.1f}MB")
+        assert growth_mb < size_mb / 2
@@ -0,0 +1,51 @@
+import os
+import subprocess
+import sys
+import pytest
+
+SRC = os.path.join(os.path.dirname(__file__), "..", "..", "src")
+# Modules only the matching work needs; none may load for `--help` or a bare import.
+HEAVY = ("numpy", "xxhash", "sqlite3", "multiprocessing", "concurrent.futures")
+BUDGET_MS = float(os.environ.get("DUPFINDER_IMPORT_BUDGET_MS", "100"))
+
+
+def importtime(statement: str):
+    """{module: cumulative microseconds} from `python -X importtime -c statement`."""
+    env = dict(os.environ, PYTHONPATH=os.path.abspath(SRC) + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    cmd = [sys.executable, "-X", "importtime", "-c", statement]
+    subprocess.run(cmd, env=env, check=True, capture_output=True)  # warm .pyc files
+    out = subprocess.run(cmd, env=env, check=True, capture_output=True, text=True).stderr
+    times = {}
+    for line in out.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            _, cumulative, name = line.split("|")
+            if cumulative.strip().isdigit():
+                times[name.strip()] = int(cumulative)
+    return times
+
+
+@pytest.mark.parametrize("statement", ["import duplicate_finder.cli", "import duplicate_finder"])
+def test_cli_import_is_lazy(statement):
+    loaded = importtime(statement)
+    assert "duplicate_finder.core" not in loaded and "duplicate_finder.minhash" not in loaded
+    assert [m for m in HEAVY if m in loaded] == []
+
+
+def test_core_defers_optional_backends():
+    loaded = importtime("import duplicate_finder.core, duplicate_finder.index")
+    assert [m for m in HEAVY if m in loaded] == []
+
+
+def test_package_exports_resolve_lazily():
+    import duplicate_finder
+    assert duplicate_finder.UnionFind.__name__ == "UnionFind"
+    assert set(duplicate_finder.__all__) <= set(dir(duplicate_finder))
+    with pytest.raises(AttributeError):
+        duplicate_finder.not_a_name
+
+
+@pytest.mark.slow
+def test_cli_import_budget():
+    """Hook start-up: importing the CLI (click included) stays under the budget."""
+    best = min(importtime("import duplicate_finder.cli")["duplicate_finder.cli"] for _ in range(3)) / 1000
+    assert best < BUDGET_MS, f"duplicate_finder.cli imports in {best:.1f} ms (budget {BUDGET_MS} ms)"
@@ -1,5 +1,5 @@
 from duplicate_finder.core import DuplicateFinder
-from duplicate_finder.cluster import build_clusters
+from duplicate_finder.cluster import UnionFind, build_clusters, build_clusters_streaming
 
 
 def write(fp: str, content: str):
@@ -20,3 +20,33 @@ def test_cluster_build(tmp_path):
     assert len(clusters) == 1
     assert clusters[0]['size'] == 3
     assert set(clusters[0]['members']) == {str(tmp_path / 'a.txt'), str(tmp_path / 'b.txt'), str(tmp_path / 'c.txt')}
+
+
+def test_union_find_matches_graph_clusters(tmp_path):
+    # Two chains plus a byte copy and an unrelated file
+    write(str(tmp_path / "a.txt"), "alpha beta gamma delta epsilon")
+    write(str(tmp_path / "b.txt"), "alpha beta gamma delta epsilon zeta")
+    write(str(tmp_path / "c.txt"), "alpha beta gamma delta epsilon zeta eta")
+    write(str(tmp_path / "d.txt"), "one two three four five six")
+    write(str(tmp_path / "e.txt"), "one two three four five six seven")
+    write(str(tmp_path / "f.txt"), "alpha beta gamma delta epsilon")
+    write(str(tmp_path / "g.txt"), "completely different words here")
+    finder = DuplicateFinder(k=2, threshold=0.5)
+    sigs = finder.scan(str(tmp_path), [".txt"], workers=0)
+    pairs = finder.find_duplicates(sigs)
+    expected = build_clusters(pairs)
+    assert len(expected) == 2
+    assert finder.find_clusters(sigs) == expected
+    assert build_clusters_streaming(iter(pairs)) == expected
+
+
+def test_union_find_tracks_size_and_max_sim():
+    uf = UnionFind(4)
+    uf.union(0, 1, 0.6)
+    uf.union(2, 3, 0.9)
+    uf.union(1, 3, 0.7)
+    assert uf.find(0) == uf.find(2)
+    (cluster,) = uf.clusters(["w", "x", "y", "z"])
+    assert cluster["size"] == 4
+    assert cluster["max_similarity"] == 0.9
+    assert cluster["representative"] == "w"
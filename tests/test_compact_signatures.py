@@ -0,0 +1,51 @@
+from array import array
+from duplicate_finder import _optional
+from duplicate_finder.core import DuplicateFinder
+from duplicate_finder.similarity import compute_jaccard, sorted_jaccard
+from duplicate_finder.cluster import build_clusters
+from duplicate_finder.index import SignatureIndex
+
+
+def write(fp: str, content: str):
+    with open(fp, "w", encoding="utf-8") as f:
+        f.write(content)
+
+
+def make_corpus(tmp_path):
+    base = "alpha beta gamma delta epsilon theta lambda"
+    for i in range(12):
+        content = base + (" phi" if i % 3 == 0 else "") + (" psi" if i % 4 == 0 else "")
+        write(str(tmp_path / f"f{i}.txt"), content)
+
+
+def test_sorted_jaccard_matches_sets(monkeypatch):
+    a, b = [1, 3, 5, 7, 9], [3, 4, 5, 9, 11, 12]
+    expected = compute_jaccard(set(a), set(b))
+    assert sorted_jaccard(array("Q", a), array("Q", b)) == expected
+    monkeypatch.setitem(_optional._modules, "numpy", None)
+    assert sorted_jaccard(array("Q", a), array("Q", b)) == expected
+    assert sorted_jaccard(array("Q"), array("Q")) == 1.0
+
+
+def test_compact_scan_matches_set_scan(tmp_path):
+    make_corpus(tmp_path)
+    plain = DuplicateFinder(k=3, threshold=0.6)
+    compact = DuplicateFinder(k=3, threshold=0.6, compact=True)
+    plain_sigs = plain.scan(str(tmp_path), [".txt"])
+    compact_sigs = compact.scan(str(tmp_path), [".txt"], workers=2)
+    assert not hasattr(compact_sigs[0], "__dict__")
+    expected = {(a.path, b.path, round(s, 6)) for s, a, b in plain.find_duplicates(plain_sigs)}
+    for prefilter in (False, True):
+        pairs = compact.find_duplicates(compact_sigs, prefilter=prefilter, minhash_perms=32, lsh_bands=8)
+        assert {(a.path, b.path, round(s, 6)) for s, a, b in pairs} == expected
+    assert build_clusters(compact.find_duplicates(compact_sigs)) == build_clusters(plain.find_duplicates(plain_sigs))
+
+
+def test_signature_index_accepts_compact(tmp_path):
+    make_corpus(tmp_path)
+    sigs = DuplicateFinder(k=3, compact=True).scan(str(tmp_path), [".txt"])
+    index = SignatureIndex()
+    for sig in sigs:
+        index.add(sig)
+    assert len(index.candidates(sigs[0].shingles)) == len(sigs)
+    assert index.similarity(sigs[0].path, sigs[0].path) == 1.0
@@ -0,0 +1,66 @@
+import os
+from duplicate_finder import _optional
+from duplicate_finder.core import DuplicateFinder
+from duplicate_finder.frequency import ShingleFrequency, drop_shingles
+import pytest
+
+HEADER = " ".join(f"license{i}" for i in range(40))
+
+
+def make_corpus(root, n=30):
+    for i in range(n):
+        body = " ".join(f"body{i}_{j}" for j in range(40))
+        (root / f"f{i}.txt").write_text(HEADER + " " + body)
+    # one near-duplicate of f0's body
+    (root / "near.txt").write_text(HEADER + " " + " ".join(f"body0_{j}" for j in range(39)))
+    (root / "only_header.txt").write_text(HEADER)
+
+
+@pytest.mark.parametrize("compact,use_numpy", [(False, True), (True, True), (True, False)])
+def test_common_shingles_dropped(tmp_path, monkeypatch, compact, use_numpy):
+    if not use_numpy:
+        monkeypatch.setitem(_optional._modules, "numpy", None)
+    make_corpus(tmp_path)
+    finder = DuplicateFinder(k=3, threshold=0.8, compact=compact)
+    sigs = finder.scan(str(tmp_path), [".txt"])
+    raw = {os.path.basename(s.path): len(s.shingles) for s in sigs}
+    filtered = finder.drop_common_shingles(sigs, max_df=0.5, min_docs=5)
+    sizes = {os.path.basename(s.path): len(s.shingles) for s in filtered}
+    assert sizes["f1.txt"] == raw["f1.txt"] - 38  # the 38 header windows are gone
+    assert sizes["only_header.txt"] == raw["only_header.txt"]  # nothing left: kept whole
+    st = finder.filter_stats
+    assert st["common_shingles"] == 38 and st["all_common_files"] == 1
+    pairs = finder.find_duplicates(filtered)
+    assert [{os.path.basename(a.path), os.path.basename(b.path)} for _, a, b in pairs] == [{"f0.txt", "near.txt"}]
+
+
+def test_small_corpus_keeps_shared_text(tmp_path):
+    (tmp_path / "a.txt").write_text("alpha beta gamma delta epsilon zeta")
+    (tmp_path / "b.txt").write_text("alpha beta gamma delta epsilon zeta")
+    finder = DuplicateFinder(k=2, threshold=0.9, exact_fastpath=False)
+    sigs = finder.scan(str(tmp_path), [".txt"])
+    assert finder.drop_common_shingles(sigs, max_df=0.1)[0].shingles == sigs[0].shingles
+
+
+def test_frequency_table_roundtrip(tmp_path):
+    make_corpus(tmp_path)
+    finder = DuplicateFinder(k=3)
+    sigs = finder.scan(str(tmp_path), [".txt"])
+    table = finder.shingle_frequency(sigs)
+    path = str(tmp_path / "df.bin")
+    table.save(path)
+    loaded = ShingleFrequency.load(path)
+    assert loaded.docs == table.docs == len(sigs)
+    assert loaded.config == finder._cache_config()
+    assert sorted(map(int, loaded.common(0.5, 5))) == sorted(map(int, table.common(0.5, 5)))
+
+
+@pytest.mark.parametrize("use_numpy", [True, False])
+def test_out_of_range_set_values(monkeypatch, use_numpy):
+    if not use_numpy:
+        monkeypatch.setitem(_optional._modules, "numpy", None)
+    big = 1 << 100
+    sets = [{-1, big, i} for i in range(10, 14)]
+    frequency = ShingleFrequency.count(sets)
+    common = frequency.common(0.5, min_docs=1)
+    assert [drop_shingles(s, common) for s in sets] == [{i} for i in range(10, 14)]
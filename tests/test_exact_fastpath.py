@@ -0,0 +1,52 @@
+import os
+from duplicate_finder.core import DuplicateFinder
+from duplicate_finder import exact
+from duplicate_finder.exact import ContentGrouper, SAMPLE_BYTES
+
+
+def write(fp: str, content: str):
+    with open(fp, "w", encoding="utf-8") as f:
+        f.write(content)
+
+
+def test_grouper_head_tail_then_full_digest(tmp_path):
+    big = "x" * (3 * SAMPLE_BYTES)
+    write(str(tmp_path / "a"), big)
+    write(str(tmp_path / "b"), big)
+    # same size, same head and tail, different middle byte
+    write(str(tmp_path / "c"), big[:SAMPLE_BYTES + 5] + "y" + big[SAMPLE_BYTES + 6:])
+    write(str(tmp_path / "d"), "short")
+    grouper = ContentGrouper()
+    assert [grouper.add(str(tmp_path / n)) for n in "abcd"] == [None, str(tmp_path / "a"), None, None]
+
+
+def test_copies_share_signature_and_match_slow_path(tmp_path):
+    for i in range(6):
+        write(str(tmp_path / f"copy{i}.txt"), "alpha beta gamma delta epsilon zeta")
+    write(str(tmp_path / "near.txt"), "alpha beta gamma delta epsilon zeta eta")
+    write(str(tmp_path / "other.txt"), "nothing alike here at all")
+    fast = DuplicateFinder(k=2, threshold=0.5)
+    slow = DuplicateFinder(k=2, threshold=0.5, exact_fastpath=False)
+    fast_sigs = fast.scan(str(tmp_path), [".txt"])
+    slow_sigs = slow.scan(str(tmp_path), [".txt"])
+    copies = [s for s in fast_sigs if "copy" in os.path.basename(s.path)]
+    assert len({id(s.shingles) for s in copies}) == 1
+    fast_pairs = {(a.path, b.path, round(s, 6)) for s, a, b in fast.find_duplicates(fast_sigs)}
+    slow_pairs = {(a.path, b.path, round(s, 6)) for s, a, b in slow.find_duplicates(slow_sigs)}
+    assert fast_pairs == slow_pairs
+    assert len(fast_pairs) == 15 + 6
+
+
+def test_grouper_scales_with_same_size_files(tmp_path, monkeypatch):
+    # every file has the same size, so a scan of the bucket would compare each add with all earlier files
+    n = 3000
+    for i in range(n):
+        write(str(tmp_path / f"f{i}"), f"{i:08d}")
+    write(str(tmp_path / "dup"), f"{n - 1:08d}")
+    calls = []
+    real_sample = exact._Entry.sample
+    monkeypatch.setattr(exact._Entry, "sample", lambda self: calls.append(1) or real_sample(self))
+    grouper = ContentGrouper()
+    assert [grouper.add(str(tmp_path / f"f{i}")) for i in range(n)] == [None] * n
+    assert grouper.add(str(tmp_path / "dup")) == str(tmp_path / f"f{n - 1}")
+    assert len(calls) < 3 * (n + 1)  # linear in files, not quadratic
@@ -32,3 +32,18 @@ def test_prefilter_skip_small(tmp_path):
     direct_pairs = finder.find_duplicates(sigs, prefilter=False)
     prefilter_pairs = finder.find_duplicates(sigs, prefilter=True)
     assert {(a.path, b.path) for _, a, b in direct_pairs} == {(a.path, b.path) for _, a, b in prefilter_pairs}
+
+
+def test_tuned_prefilter_reports_reduction(tmp_path):
+    for i in range(60):
+        write(str(tmp_path / f"u{i}.txt"), " ".join(f"w{i}_{j}" for j in range(30)))
+    base = " ".join(f"shared{j}" for j in range(30))
+    write(str(tmp_path / "d1.txt"), base)
+    write(str(tmp_path / "d2.txt"), base + " extra")
+    finder = DuplicateFinder(k=3, threshold=0.8)
+    sigs = finder.scan(str(tmp_path), [".txt"], workers=0)
+    pairs = finder.find_duplicates(sigs, prefilter=True, lsh_recall=0.95)
+    assert [{os.path.basename(a.path), os.path.basename(b.path)} for _, a, b in pairs] == [{"d1.txt", "d2.txt"}]
+    stats = finder.prefilter_stats
+    assert stats["perms"] == stats["bands"] * stats["rows"]
+    assert stats["candidates"] < stats["pairs"]
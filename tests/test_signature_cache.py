@@ -0,0 +1,109 @@
+import os
+from duplicate_finder.cache import SignatureCache
+from duplicate_finder.core import DuplicateFinder
+
+
+def write(fp: str, content: str):
+    with open(fp, "w", encoding="utf-8") as f:
+        f.write(content)
+
+
+def make_corpus(root, count=8):
+    for i in range(count):
+        write(os.path.join(root, f"f{i}.txt"), "alpha beta gamma delta epsilon " + "zeta " * (i % 3) + f"tag{i}")
+
+
+def pair_set(pairs):
+    return {(a.path, b.path, round(s, 6)) for s, a, b in pairs}
+
+
+def test_warm_rescan_hits_cache(tmp_path):
+    corpus = tmp_path / "corpus"
+    corpus.mkdir()
+    make_corpus(str(corpus))
+    db = str(tmp_path / "cache.sqlite")
+    cold = DuplicateFinder(k=2, threshold=0.5, cache=SignatureCache(db))
+    cold_pairs = cold.find_duplicates(cold.scan(str(corpus), [".txt"]))
+    assert cold.cache.stats["misses"] == 8
+
+    warm = DuplicateFinder(k=2, threshold=0.5, cache=SignatureCache(db))
+    warm_pairs = warm.find_duplicates(warm.scan(str(corpus), [".txt"]))
+    assert warm.cache.stats == {"hits": 8, "misses": 0, "evicted": 0}
+    assert pair_set(warm_pairs) == pair_set(cold_pairs)
+
+
+def test_changed_and_deleted_files(tmp_path):
+    corpus = tmp_path / "corpus"
+    corpus.mkdir()
+    make_corpus(str(corpus))
+    db = str(tmp_path / "cache.sqlite")
+    DuplicateFinder(k=2, cache=SignatureCache(db)).scan(str(corpus), [".txt"])
+    os.remove(corpus / "f0.txt")
+    write(str(corpus / "f1.txt"), "completely different words now")
+    st = os.stat(corpus / "f1.txt")
+    os.utime(corpus / "f1.txt", ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    finder = DuplicateFinder(k=2, compact=True, cache=SignatureCache(db))
+    sigs = finder.scan(str(corpus), [".txt"])
+    assert finder.cache.stats == {"hits": 6, "misses": 1, "evicted": 1}
+    fresh = DuplicateFinder(k=2, compact=True).scan(str(corpus), [".txt"])
+    assert {s.path: s.shingles.tolist() for s in sigs} == {s.path: s.shingles.tolist() for s in fresh}
+
+
+def test_content_digest_survives_touch(tmp_path):
+    corpus = tmp_path / "corpus"
+    corpus.mkdir()
+    make_corpus(str(corpus), count=3)
+    db = str(tmp_path / "cache.sqlite")
+    DuplicateFinder(k=2, cache=SignatureCache(db, verify_content=True)).scan(str(corpus), [".txt"])
+    for name in os.listdir(corpus):
+        os.utime(corpus / name, ns=(0, 10**9))
+    finder = DuplicateFinder(k=2, cache=SignatureCache(db, verify_content=True))
+    finder.scan(str(corpus), [".txt"])
+    assert finder.cache.stats["hits"] == 3
+
+
+def test_settings_change_invalidates(tmp_path):
+    corpus = tmp_path / "corpus"
+    corpus.mkdir()
+    make_corpus(str(corpus), count=3)
+    db = str(tmp_path / "cache.sqlite")
+    DuplicateFinder(k=2, cache=SignatureCache(db)).scan(str(corpus), [".txt"])
+    finder = DuplicateFinder(k=3, cache=SignatureCache(db))
+    finder.scan(str(corpus), [".txt"])
+    assert finder.cache.stats["misses"] == 3
+
+
+def test_cached_minhash_rows_reused(tmp_path):
+    corpus = tmp_path / "corpus"
+    corpus.mkdir()
+    for i in range(60):
+        write(str(corpus / f"f{i}.txt"), "alpha beta gamma delta epsilon theta " + f"w{i % 6} " * 3)
+    db = str(tmp_path / "cache.sqlite")
+    first = DuplicateFinder(k=3, threshold=0.6, cache=SignatureCache(db))
+    expected = pair_set(first.find_duplicates(first.scan(str(corpus), [".txt"]), prefilter=True))
+    second = DuplicateFinder(k=3, threshold=0.6, cache=SignatureCache(db))
+    assert pair_set(second.find_duplicates(second.scan(str(corpus), [".txt"]), prefilter=True)) == expected
+    assert expected
+
+
+def test_filtered_minhash_rows_not_reused_unfiltered(tmp_path):
+    corpus = tmp_path / "corpus"
+    corpus.mkdir()
+    boiler = " ".join(f"lic{j}" for j in range(40))
+    for i in range(60):
+        write(str(corpus / f"f{i}.txt"), boiler + " " + " ".join(f"u{i}_{j}" for j in range(6)))
+    db = str(tmp_path / "cache.sqlite")
+
+    def run(max_df=None):
+        finder = DuplicateFinder(k=3, threshold=0.3, cache=SignatureCache(db))
+        sigs = finder.scan(str(corpus), [".txt"])
+        if max_df is not None:
+            sigs = finder.drop_common_shingles(sigs, max_df, min_docs=5)
+        return pair_set(finder.find_duplicates(sigs, prefilter=True))
+
+    unfiltered = run()
+    filtered = run(max_df=0.5)
+    # boilerplate carries the similarity; without it no pair is left
+    assert unfiltered and not filtered
+    assert run() == unfiltered
+    assert run(max_df=0.5) == filtered
@@ -0,0 +1,69 @@
+from array import array
+
+import pytest
+from hypothesis import given, settings, strategies as st
+
+from duplicate_finder import _optional, similarity
+from duplicate_finder.similarity import bounded_jaccard, compute_jaccard, min_overlap
+
+THRESHOLDS = [0.0, 0.2, 1 / 3, 0.5, 2 / 3, 0.75, 0.8, 1.0]
+
+
+def expected(a, b, threshold):
+    sim = compute_jaccard(set(a), set(b))
+    return sim if sim >= threshold else None
+
+
+@settings(max_examples=100, deadline=None)
+@given(st.sets(st.integers(min_value=0, max_value=40), max_size=25),
+       st.sets(st.integers(min_value=0, max_value=40), max_size=25),
+       st.sampled_from(THRESHOLDS))
+def test_matches_compute_jaccard(a, b, threshold):
+    want = expected(a, b, threshold)
+    assert bounded_jaccard(a, b, threshold) == want
+    assert bounded_jaccard(array("Q", sorted(a)), array("Q", sorted(b)), threshold) == want
+    assert bounded_jaccard(a, array("Q", sorted(b)), threshold) == want
+
+
+@pytest.mark.parametrize("threshold", THRESHOLDS)
+def test_pure_python_merge(monkeypatch, threshold):
+    monkeypatch.setitem(_optional._modules, "numpy", None)
+    a, b = list(range(0, 60, 2)), list(range(0, 60, 3))
+    assert bounded_jaccard(array("Q", a), array("Q", b), threshold) == expected(a, b, threshold)
+
+
+def test_exact_boundary_passes():
+    assert bounded_jaccard(set(range(3)), set(range(4)), 0.75) == 0.75
+    assert bounded_jaccard(set(range(10)), set(range(1, 11)), 9 / 11) == 9 / 11
+    assert bounded_jaccard(set(range(10)), set(range(1, 11)), 0.82) is None
+
+
+def test_empty_inputs():
+    assert bounded_jaccard(set(), set(), 1.0) == 1.0
+    assert bounded_jaccard(set(), {1}, 0.5) is None
+    assert bounded_jaccard(set(), {1}, 0.0) == 0.0
+
+
+def test_aborts_early(monkeypatch):
+    # disjoint after the first block: the walk stops long before the end of the set
+    monkeypatch.setattr(similarity, "BOUND_BLOCK", 16)
+    probed = []
+
+    class Counting(set):
+        def __contains__(self, x):
+            probed.append(x)
+            return set.__contains__(self, x)
+
+    assert bounded_jaccard(set(range(1000)), Counting(range(1000, 2000)), 0.9) is None
+    assert 0 < len(probed) < 100  # aborts once fewer than 948 of 1000 can still match
+
+
+def test_size_ratio_rejects_without_walking(monkeypatch):
+    monkeypatch.setattr(similarity, "_bounded_sets", None)  # never reached
+    assert bounded_jaccard(set(range(10)), set(range(100)), 0.5) is None
+
+
+def test_min_overlap():
+    assert min_overlap(3, 4, 0.75) == 3
+    assert min_overlap(10, 10, 1.0) == 10
+    assert min_overlap(10, 10, 0.5) == 7
@@ -0,0 +1,84 @@
+import os
+import random
+
+import pytest
+
+from duplicate_finder import _optional
+from duplicate_finder.core import DuplicateFinder
+from duplicate_finder.minhash import EstimatedSimilarity, default_estimate_band, estimate_candidates, lsh_candidate_pairs, minhash_matrix
+
+
+def corpus(tmp_path):
+    for i in range(60):
+        (tmp_path / f"u{i}.txt").write_text(" ".join(f"w{i}_{j}" for j in range(30)))
+    base = [f"shared{j}" for j in range(60)]
+    (tmp_path / "d1.txt").write_text(" ".join(base))
+    (tmp_path / "d2.txt").write_text(" ".join(base + ["extra"]))  # Jaccard 58/59
+    (tmp_path / "d3.txt").write_text(" ".join(base[:48] + [f"other{j}" for j in range(12)]))  # ~0.65 vs d1
+    finder = DuplicateFinder(k=3, threshold=0.8)
+    return finder, finder.scan(str(tmp_path), [".txt"])
+
+
+def names(pairs):
+    return {frozenset((os.path.basename(a.path), os.path.basename(b.path))): sim for sim, a, b in pairs}
+
+
+def test_clear_duplicates_are_estimated(tmp_path):
+    finder, sigs = corpus(tmp_path)
+    pairs = names(finder.find_duplicates(sigs, estimate=True, prefilter=True))
+    assert list(pairs) == [frozenset({"d1.txt", "d2.txt"})]
+    sim = next(iter(pairs.values()))
+    assert isinstance(sim, EstimatedSimilarity) and sim.estimated
+    st = finder.prefilter_stats
+    assert st["estimate_accepted"] == 1
+    assert st["estimate_accepted"] + st["estimate_uncertain"] + st["estimate_rejected"] == st["candidates"]
+    assert finder.stats.counters["estimate_accepted"] == 1
+
+
+def test_full_band_verifies_everything_exactly(tmp_path):
+    finder, sigs = corpus(tmp_path)
+    exact = names(finder.find_duplicates(sigs, prefilter=True))
+    banded = names(finder.find_duplicates(sigs, prefilter=True, estimate=True, estimate_band=1.0))
+    assert banded == exact
+    assert not any(isinstance(sim, EstimatedSimilarity) for sim in banded.values())
+    assert finder.prefilter_stats["estimate_uncertain"] == finder.prefilter_stats["candidates"]
+
+
+def test_clusters_with_estimate(tmp_path):
+    finder, sigs = corpus(tmp_path)
+    clusters = finder.find_clusters(sigs, estimate=True, prefilter=True)
+    assert [sorted(os.path.basename(p) for p in c["members"]) for c in clusters] == [["d1.txt", "d2.txt"]]
+
+
+def test_small_scans_stay_exact(tmp_path):
+    for name in ("a.txt", "b.txt"):
+        (tmp_path / name).write_text("alpha beta gamma delta epsilon " + name)
+    finder = DuplicateFinder(k=2, threshold=0.5)
+    pairs = finder.find_duplicates(finder.scan(str(tmp_path), [".txt"]), prefilter=True, estimate=True)
+    assert len(pairs) == 1 and not isinstance(pairs[0][0], EstimatedSimilarity)
+
+
+def random_matrix(seed):
+    rng = random.Random(seed)
+    base = [set(rng.sample(range(5000), 200)) for _ in range(20)]
+    sets = base + [set(list(b)[:rng.randint(120, 200)]) | set(rng.sample(range(5000), 20)) for b in base]
+    return minhash_matrix(sets, 64)
+
+
+def test_pure_python_matches_numpy(monkeypatch):
+    pytest.importorskip("numpy")
+    matrix = random_matrix(1)
+    pairs = lsh_candidate_pairs(matrix, 16)
+    accepted, uncertain = estimate_candidates(matrix, pairs, 0.7, 0.1)
+    monkeypatch.setitem(_optional._modules, "numpy", None)
+    rows = matrix.tolist()
+    stats = {}
+    py_accepted, py_uncertain = estimate_candidates(rows, list(pairs), 0.7, 0.1, stats)
+    assert py_accepted == accepted and list(py_uncertain) == list(uncertain)
+    assert all(isinstance(sim, EstimatedSimilarity) and sim >= 0.8 for sim, _, _ in py_accepted)
+    assert stats["estimate_rejected"] == len(pairs) - len(accepted) - len(uncertain)
+
+
+def test_default_band():
+    assert default_estimate_band(0.8, 64) == pytest.approx(0.1)
+    assert default_estimate_band(1.0, 64) == 1 / 64  # never accept 1.0 from the estimate alone
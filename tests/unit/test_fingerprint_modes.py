@@ -0,0 +1,68 @@
+import random
+from duplicate_finder import _optional
+from duplicate_finder.core import DuplicateFinder
+from duplicate_finder.hashing import ShingleAccumulator, shingle_fingerprints, window_minima
+from duplicate_finder.similarity import compute_jaccard
+import pytest
+
+random.seed(7)
+WORDS = [f"w{i}" for i in range(300)]
+TOKENS = [random.choice(WORDS) for _ in range(2000)]
+
+
+def as_list(values):
+    return [int(v) for v in values]
+
+
+def test_window_minima():
+    assert list(window_minima([5, 3, 4, 1, 2, 6], 3)) == [3, 1, 1, 1]
+
+
+@pytest.mark.parametrize("mode,window", [("winnow", 8), ("mod", 4)])
+def test_numpy_and_batches_agree(monkeypatch, mode, window):
+    whole = as_list(shingle_fingerprints(TOKENS, 5, fingerprint=mode, window=window))
+    acc = ShingleAccumulator(5, fingerprint=mode, window=window)
+    for start in range(0, len(TOKENS), 37):
+        acc.update(TOKENS[start:start + 37])
+    assert as_list(acc.result()) == whole
+    monkeypatch.setitem(_optional._modules, "numpy", None)
+    assert as_list(shingle_fingerprints(TOKENS, 5, fingerprint=mode, window=window)) == whole
+
+
+@pytest.mark.parametrize("mode,window,density", [("winnow", 8, 2 / 9), ("mod", 4, 1 / 4)])
+def test_subset_and_density(mode, window, density):
+    full = set(as_list(shingle_fingerprints(TOKENS, 5)))
+    picked = set(as_list(shingle_fingerprints(TOKENS, 5, fingerprint=mode, window=window)))
+    assert picked <= full
+    assert abs(len(picked) / len(full) - density) < 0.06
+
+
+def test_winnowing_guarantee():
+    # A shared run of window + k - 1 tokens always yields a common fingerprint
+    shared = TOKENS[:12]  # w=8, k=5
+    a = [f"a{i}" for i in range(50)] + shared + [f"b{i}" for i in range(50)]
+    b = [f"c{i}" for i in range(30)] + shared + [f"d{i}" for i in range(30)]
+    fa = set(as_list(shingle_fingerprints(a, 5, fingerprint="winnow", window=8)))
+    fb = set(as_list(shingle_fingerprints(b, 5, fingerprint="winnow", window=8)))
+    assert fa & fb
+
+
+def test_short_file_keeps_minimum():
+    full = as_list(shingle_fingerprints(TOKENS[:7], 5))
+    assert as_list(shingle_fingerprints(TOKENS[:7], 5, fingerprint="winnow", window=8)) == [min(full)]
+
+
+def test_near_duplicates_stay_similar():
+    edited = TOKENS[:]
+    for i in range(0, len(edited), 200):
+        edited[i] = "edit"
+    full = compute_jaccard(set(as_list(shingle_fingerprints(TOKENS, 5))), set(as_list(shingle_fingerprints(edited, 5))))
+    win = compute_jaccard(*(set(as_list(shingle_fingerprints(t, 5, fingerprint="winnow", window=8))) for t in (TOKENS, edited)))
+    assert abs(full - win) < 0.08
+
+
+def test_settings_recorded_only_when_selecting():
+    assert "fingerprint" not in DuplicateFinder().signature_settings()
+    assert DuplicateFinder(fingerprint="winnow", fingerprint_window=6).signature_settings()["fingerprint_window"] == 6
+    with pytest.raises(ValueError):
+        DuplicateFinder(fingerprint="sometimes")
@@ -0,0 +1,72 @@
+import os
+from duplicate_finder import ignore as ignore_mod
+from duplicate_finder.ignore import IgnoreMatcher, walk_files
+import pytest
+
+
+def make_tree(root):
+    for rel, content in {
+        "a.py": "x" * 10,
+        "src/b.py": "x" * 200,
+        "src/gen/c_pb2.py": "x",
+        "node_modules/pkg/d.py": "x",
+        "docs/e.md": "x",
+        "build/f.py": "x",
+        "src/build/g.py": "x",
+    }.items():
+        path = root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+
+
+def rel(root, paths):
+    return sorted(os.path.relpath(p, root).replace(os.sep, "/") for p in paths)
+
+
+def test_matches_os_walk_without_filters(tmp_path):
+    make_tree(tmp_path)
+    expected = sorted(os.path.join(d, f) for d, _, fs in os.walk(tmp_path) for f in fs)
+    assert sorted(walk_files(str(tmp_path))) == expected
+
+
+@pytest.mark.parametrize("pattern,skipped", [
+    ("*_pb2.py", {"src/gen/c_pb2.py"}),
+    ("/build/", {"build/f.py"}),
+    ("build/", {"build/f.py", "src/build/g.py"}),
+    ("src/**/*.py", {"src/b.py", "src/gen/c_pb2.py", "src/build/g.py"}),
+    ("docs", {"docs/e.md"}),
+])
+def test_gitignore_globs(tmp_path, pattern, skipped):
+    make_tree(tmp_path)
+    everything = set(rel(tmp_path, walk_files(str(tmp_path))))
+    kept = set(rel(tmp_path, walk_files(str(tmp_path), ignore=IgnoreMatcher([pattern]))))
+    assert everything - kept == skipped
+
+
+def test_negation_and_regex(tmp_path):
+    make_tree(tmp_path)
+    matcher = IgnoreMatcher(["*.py", "!a.py"], regexes=[r"\.md$"])
+    assert rel(tmp_path, walk_files(str(tmp_path), ignore=matcher)) == ["a.py"]
+    with pytest.raises(ValueError):
+        IgnoreMatcher(regexes=["("])
+
+
+def test_ignored_directories_are_not_listed(tmp_path, monkeypatch):
+    make_tree(tmp_path)
+    listed = []
+    real_scandir = os.scandir
+
+    def spy(path):
+        listed.append(os.path.relpath(path, tmp_path))
+        return real_scandir(path)
+
+    monkeypatch.setattr(ignore_mod.os, "scandir", spy)
+    list(walk_files(str(tmp_path), ignore=IgnoreMatcher(["node_modules/", "gen/"])))
+    assert "node_modules" not in listed and not any(p.startswith("node_modules") for p in listed)
+    assert os.path.join("src", "gen") not in listed
+
+
+def test_size_filters(tmp_path):
+    make_tree(tmp_path)
+    assert rel(tmp_path, walk_files(str(tmp_path), [".py"], min_size=5)) == ["a.py", "src/b.py"]
+    assert rel(tmp_path, walk_files(str(tmp_path), [".py"], min_size=5, max_size=100)) == ["a.py"]
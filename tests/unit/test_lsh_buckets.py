@@ -0,0 +1,51 @@
+from duplicate_finder import _optional
+from duplicate_finder.minhash import lsh_candidate_pairs, lsh_candidates, minhash_matrix
+from duplicate_finder.verify import verify_candidates
+import pytest
+
+
+def boilerplate_signatures():
+    # 40 files share band 0 (same header), but only pairs 2k, 2k+1 agree on the rest
+    sigs = []
+    for i in range(40):
+        tail = [1000 + i // 2] * 6
+        sigs.append([7, 7] + tail)
+    return sigs
+
+
+@pytest.mark.parametrize("use_numpy", [True, False])
+def test_packed_pairs_match_tuple_set(monkeypatch, use_numpy):
+    sets = [set(range(i, i + 30)) for i in range(0, 200, 3)]
+    sig = minhash_matrix(sets, perms=32)
+    if not use_numpy:
+        monkeypatch.setitem(_optional._modules, "numpy", None)
+        sig = [list(map(int, row)) for row in sig]
+    stats = {}
+    packed = lsh_candidate_pairs(sig, 8, stats=stats)
+    n = len(sets)
+    assert list(packed) == sorted(packed)
+    assert {divmod(int(p), n) for p in packed} == lsh_candidates(sig, 8)
+    assert stats["candidates"] == len(packed) <= stats["raw_pairs"]
+
+
+@pytest.mark.parametrize("use_numpy", [True, False])
+def test_oversized_bucket_is_split(monkeypatch, use_numpy):
+    if not use_numpy:
+        monkeypatch.setitem(_optional._modules, "numpy", None)
+    sigs = boilerplate_signatures()
+    np = _optional.numpy_or_none()
+    if np is not None:
+        sigs = np.array(sigs, dtype=np.uint32)
+    stats = {}
+    unbounded = lsh_candidate_pairs(sigs, 4, stats=stats)
+    assert stats["largest_bucket"] == 40 and len(unbounded) == 40 * 39 // 2
+    stats = {}
+    bounded = lsh_candidate_pairs(sigs, 4, max_bucket=5, stats=stats)
+    assert stats["oversized_buckets"] >= 1
+    assert {divmod(int(p), 40) for p in bounded} == {(2 * k, 2 * k + 1) for k in range(20)}
+
+
+def test_verify_accepts_packed_pairs():
+    sets = [{1, 2, 3}, {1, 2, 3}, {4, 5, 6}, {1, 2, 3, 4}]
+    packed = lsh_candidate_pairs([[1, 1], [1, 1], [2, 2], [1, 1]], 2)
+    assert sorted(verify_candidates(sets, packed, 0.7)) == sorted(verify_candidates(sets, [(0, 1), (0, 3), (1, 3)], 0.7))
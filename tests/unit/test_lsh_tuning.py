@@ -0,0 +1,33 @@
+from duplicate_finder.minhash import band_ranges, candidate_probability, lsh_candidates, minhash_signature, tune_lsh
+import pytest
+
+
+def test_band_ranges_drop_remainder():
+    assert band_ranges(10, 3) == [(0, 3), (3, 6), (6, 9)]
+
+
+def test_remainder_not_folded_into_last_band():
+    # Signatures agree on the first 9 values only; old layout made band 3 span 6..10
+    a = list(range(10))
+    b = list(range(9)) + [99]
+    assert (0, 1) in lsh_candidates([a, b], bands=3)
+
+
+@pytest.mark.parametrize("threshold", [0.5, 0.7, 0.85, 0.95])
+def test_tuned_layout_meets_recall(threshold):
+    params = tune_lsh(threshold, target_recall=0.95)
+    assert params.perms == params.bands * params.rows
+    assert candidate_probability(threshold, params.bands, params.rows) >= 0.95
+    assert params.fnr == pytest.approx(1 - candidate_probability(threshold, params.bands, params.rows))
+    # unrelated pairs rarely collide
+    assert candidate_probability(threshold / 3, params.bands, params.rows) < 0.05
+
+
+def test_higher_threshold_uses_longer_bands():
+    assert tune_lsh(0.95).rows > tune_lsh(0.5).rows
+
+
+def test_compat_engine_beyond_128_perms():
+    sig = minhash_signature({1, 2, 3}, perms=200)
+    assert len(sig) == 200
+    assert sig[:32] == minhash_signature({1, 2, 3}, perms=32)
@@ -0,0 +1,36 @@
+from duplicate_finder import _optional
+from duplicate_finder.minhash import minhash_matrix, lsh_candidates
+import pytest
+
+
+def test_fast_engine_matches_pure_python(monkeypatch):
+    sets = [{1, 2, 3, 4}, set(), {10**30, 7}]
+    fast = minhash_matrix(sets, perms=16)
+    monkeypatch.setitem(_optional._modules, "numpy", None)
+    fallback = minhash_matrix(sets, perms=16)
+    assert [list(map(int, row)) for row in fast] == fallback
+
+
+def test_fast_engine_prefix_stable_and_uncapped():
+    shingles = set(range(0, 5000, 7))
+    short = minhash_matrix([shingles], perms=32)
+    long = minhash_matrix([shingles], perms=256)
+    assert list(long[0][:32]) == list(short[0])
+
+
+def test_fast_engine_estimates_jaccard():
+    a = set(range(0, 1000))
+    b = set(range(200, 1200))  # true Jaccard = 800 / 1200
+    sig = minhash_matrix([a, b], perms=256)
+    agree = sum(int(x) == int(y) for x, y in zip(sig[0], sig[1])) / 256
+    assert abs(agree - 800 / 1200) < 0.1
+
+
+def test_matrix_lsh_candidates():
+    sig = minhash_matrix([{1, 2, 3}, {1, 2, 3}, {9, 8, 7}], perms=16)
+    assert (0, 1) in lsh_candidates(sig, bands=4)
+
+
+def test_unknown_engine():
+    with pytest.raises(ValueError):
+        minhash_matrix([{1}], perms=8, engine="nope")
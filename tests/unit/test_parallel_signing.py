@@ -0,0 +1,132 @@
+import os
+import time
+from array import array
+from duplicate_finder import _optional, core
+from duplicate_finder.arena import discard_arena, read_arena, write_arena
+from duplicate_finder.core import DuplicateFinder
+import pytest
+
+
+def make_files(root, n=40):
+    for i in range(n):
+        (root / f"f{i}.txt").write_text(" ".join(f"tok{(i * 7 + j) % 90}" for j in range(30 + i)))
+    (root / "empty.txt").write_text("")
+
+
+def shm_segments():
+    return {n for n in os.listdir("/dev/shm") if n.startswith("psm_")} if os.path.isdir("/dev/shm") else set()
+
+
+@pytest.mark.parametrize("inline", [False, True])
+def test_arena_roundtrip(monkeypatch, inline):
+    if inline:
+        monkeypatch.setitem(_optional._modules, "multiprocessing.shared_memory", None)
+    arrays = [array("Q", [1, 2, 3]), None, array("Q"), array("Q", [2**64 - 1])]
+    batch = write_arena(arrays)
+    assert (batch.name is None) == inline
+    out = read_arena(batch)
+    assert out[1] is None
+    assert [list(map(int, a)) for a in (out[0], out[2], out[3])] == [[1, 2, 3], [], [2**64 - 1]]
+
+
+def test_arena_without_numpy(monkeypatch):
+    monkeypatch.setitem(_optional._modules, "numpy", None)
+    assert list(read_arena(write_arena([array("Q", [5, 6])]))[0]) == [5, 6]
+
+
+@pytest.mark.parametrize("compact", [False, True])
+def test_parallel_signing_matches_serial(tmp_path, monkeypatch, compact):
+    make_files(tmp_path)
+    monkeypatch.setattr(core, "SIGN_BATCH_FILES", 7)  # several batches
+    before = shm_segments()
+    finder = DuplicateFinder(k=3, compact=compact, exact_fastpath=False)
+    serial = finder.scan(str(tmp_path), [".txt"], workers=0)
+    parallel = finder.scan(str(tmp_path), [".txt"], workers=2)
+    key = lambda sigs: [(s.path, s.size, sorted(map(int, s.shingles))) for s in sigs]
+    assert key(parallel) == key(serial)
+    assert all(isinstance(s.shingles, set) != compact for s in parallel)
+    assert shm_segments() <= before  # every segment was unlinked
+
+
+def test_size_batches(tmp_path, monkeypatch):
+    make_files(tmp_path, 10)
+    monkeypatch.setattr(core, "SIGN_BATCH_BYTES", 400)
+    files = sorted(str(p) for p in tmp_path.iterdir())
+    batches = list(core._size_batches(files))
+    assert [f for b in batches for f in b] == files
+    assert len(batches) > 1
+    for b in batches[:-1]:
+        assert sum(os.path.getsize(f) for f in b) >= 400
+        assert sum(os.path.getsize(f) for f in b[:-1]) < 400
+
+
+def test_size_batches_use_walk_sizes(monkeypatch):
+    monkeypatch.setattr(core, "SIGN_BATCH_BYTES", 100)
+    sizes = {f"/nonexistent/{i}": 60 for i in range(5)}  # never stat'ed
+    batches = list(core._size_batches(list(sizes), sizes))
+    assert [len(b) for b in batches] == [2, 2, 1]
+    assert sizes == {}
+
+
+def test_batches_submitted_during_discovery(tmp_path, monkeypatch):
+    make_files(tmp_path, 20)
+    monkeypatch.setattr(core, "SIGN_BATCH_FILES", 2)
+    monkeypatch.setattr(core, "SIGN_INFLIGHT_PER_WORKER", 1)
+    paths = sorted(str(p) for p in tmp_path.iterdir())
+    produced = []
+    first_collect = []
+    unpack = core._unpack_batch
+
+    def spy(*args):
+        first_collect.append(len(produced))
+        return unpack(*args)
+
+    def lazy():
+        for p in paths:
+            produced.append(p)
+            yield p
+
+    monkeypatch.setattr(core, "_unpack_batch", spy)
+    opts = core._SignOptions(3, "blake2b", True, None)
+    sigs = core._compute_parallel(lazy(), opts, 2, core.RunStats())
+    assert [s.path for s in sigs] == paths
+    assert first_collect[0] < len(paths)  # results arrive before the walk is done
+
+
+def test_discard_arena_unlinks_segment():
+    before = shm_segments()
+    batch = write_arena([array("Q", [1, 2, 3])])
+    if batch.name is None:
+        pytest.skip("shared memory unavailable")
+    discard_arena(batch)
+    discard_arena(batch)  # already gone: no error
+    assert shm_segments() <= before
+
+
+_real_sign_batch = core._sign_batch
+
+
+def _dying_sign_batch(paths, opts):
+    if any(p.endswith("f3.txt") for p in paths):
+        os._exit(1)  # kill the worker: the pool breaks
+    return _real_sign_batch(paths, opts)
+
+
+def test_pool_failure_signs_every_file_serially(tmp_path, monkeypatch):
+    make_files(tmp_path, 20)
+    monkeypatch.setattr(core, "SIGN_BATCH_FILES", 2)
+    monkeypatch.setattr(core, "SIGN_INFLIGHT_PER_WORKER", 100)  # never collect early
+    monkeypatch.setattr(core, "_sign_batch", _dying_sign_batch)
+    paths = sorted(str(p) for p in tmp_path.iterdir())
+
+    def slow():
+        for p in paths:
+            time.sleep(0.02)  # the pool breaks while batches are still being submitted
+            yield p
+
+    before = shm_segments()
+    opts = core._SignOptions(3, "blake2b", True, None)
+    sigs = core._compute_parallel(slow(), opts, 2, core.RunStats())
+    serial = list(core._sign_prefetched(paths, opts))
+    assert [(s.path, s.size, list(map(int, s.shingles))) for s in sigs] == [(s.path, s.size, list(map(int, s.shingles))) for s in serial]
+    assert shm_segments() <= before
@@ -0,0 +1,35 @@
+import random
+import pytest
+from duplicate_finder import verify
+from duplicate_finder.verify import all_pair_tiles, verify_candidates
+
+
+def random_sets(n=40, seed=7):
+    rng = random.Random(seed)
+    base = list(range(60))
+    sets = []
+    for _ in range(n):
+        s = set(rng.sample(base, 30))
+        sets.append(s)
+    return sets
+
+
+def test_tiles_cover_upper_triangle_once():
+    n = 23
+    seen = []
+    for i0, i1, j0, j1 in all_pair_tiles(n, 5):
+        seen.extend((i, j) for i in range(i0, i1) for j in range(max(j0, i + 1), j1))
+    assert sorted(seen) == [(i, j) for i in range(n) for j in range(i + 1, n)]
+
+
+@pytest.mark.parametrize("pairs", [None, "candidates"])
+def test_parallel_matches_serial(monkeypatch, pairs):
+    sets = random_sets()
+    if pairs == "candidates":
+        pairs = {(i, j) for i in range(len(sets)) for j in range(i + 1, len(sets)) if (i + j) % 3}
+    serial = verify_candidates(sets, pairs, 0.3, workers=0)
+    monkeypatch.setattr(verify, "PARALLEL_MIN_PAIRS", 0)
+    monkeypatch.setattr(verify, "PAIR_BLOCK", 50)
+    parallel = verify_candidates(sets, pairs, 0.3, workers=2)
+    assert sorted(parallel) == sorted(serial)
+    assert serial
@@ -0,0 +1,70 @@
+from duplicate_finder import prefetch as prefetch_mod
+from duplicate_finder.core import DuplicateFinder, _compute_file_signature, _sign_prefetched, _SignOptions
+from duplicate_finder.prefetch import BufferPool, FileData, iter_text_chunks, prefetch, read_file_data
+import pytest
+
+TEXT = "héllo wörld naïve_token café " * 50 + "☃ snow man \U0001F600 tail"
+
+
+def make_files(root, n=12):
+    paths = []
+    for i in range(n):
+        p = root / f"f{i}.txt"
+        p.write_bytes((TEXT + f" file{i}").encode("utf-8") + b"\xff\xfe broken bytes")
+        paths.append(str(p))
+    return paths
+
+
+def test_order_and_backpressure(tmp_path):
+    paths = make_files(tmp_path)
+    pulled = []
+
+    def source():
+        for p in paths:
+            pulled.append(p)
+            yield p
+
+    seen = []
+    for path, data in prefetch(source(), threads=2, depth=3):
+        assert isinstance(data, FileData)
+        assert len(pulled) - len(seen) <= 4  # depth reads in flight + the one being consumed
+        seen.append(path)
+    assert seen == paths
+
+
+def test_missing_and_oversized(tmp_path):
+    paths = make_files(tmp_path, 2)
+    out = dict(prefetch([paths[0], str(tmp_path / "nope.txt")], threads=1, depth=2, max_size=10))
+    assert out[paths[0]] is None
+    assert isinstance(out[str(tmp_path / "nope.txt")], OSError)
+
+
+@pytest.mark.parametrize("mmap_all", [False, True])
+def test_decoded_signatures_match_text_reader(tmp_path, monkeypatch, mmap_all):
+    paths = make_files(tmp_path)
+    monkeypatch.setattr(prefetch_mod, "DECODE_CHUNK", 7)  # split multi-byte characters
+    if mmap_all:
+        monkeypatch.setattr(prefetch_mod, "PREFETCH_MAX_BYTES", 0)
+    opts = _SignOptions(3, "blake2b", True, None, io_threads=2, prefetch_depth=2)
+    fetched = list(_sign_prefetched(paths, opts))
+    direct = [_compute_file_signature((p, opts)) for p in paths]
+    assert [(s.size, list(map(int, s.shingles))) for s in fetched] == [(s.size, list(map(int, s.shingles))) for s in direct]
+
+
+def test_buffers_are_reused(tmp_path):
+    paths = make_files(tmp_path, 10)  # equal sizes
+    pool = BufferPool()
+    ids = set()
+    for p in paths:
+        data = read_file_data(p, pool)
+        ids.add(id(data._buf))
+        assert "".join(iter_text_chunks(data)).startswith("héllo")
+        data.release()
+    assert len(ids) == 1
+
+
+def test_scan_without_io_threads(tmp_path):
+    make_files(tmp_path, 4)
+    a = DuplicateFinder(k=3, io_threads=0).scan(str(tmp_path), [".txt"])
+    b = DuplicateFinder(k=3, io_threads=3, prefetch_depth=1).scan(str(tmp_path), [".txt"])
+    assert [(s.path, s.shingles) for s in a] == [(s.path, s.shingles) for s in b]
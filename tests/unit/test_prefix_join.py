@@ -0,0 +1,103 @@
+import random
+from array import array
+
+import pytest
+from hypothesis import given, settings, strategies as st
+
+from duplicate_finder import _optional
+from duplicate_finder.core import DuplicateFinder, FileSignature
+from duplicate_finder.join import index_prefix_length, prefix_filter_pairs, probe_prefix_length
+from duplicate_finder.similarity import compute_jaccard
+from duplicate_finder.verify import verify_candidates
+
+
+def brute_force(sets, threshold):
+    n = len(sets)
+    return {(i, j) for i in range(n) for j in range(i + 1, n) if compute_jaccard(sets[i], sets[j]) >= threshold}
+
+
+def joined(sets, threshold):
+    return {(i, j) for _, i, j in verify_candidates(sets, prefix_filter_pairs(sets, threshold), threshold)}
+
+
+def random_sets(seed, count=40, universe=60):
+    rng = random.Random(seed)
+    base = [set(rng.sample(range(universe), rng.randint(0, 25))) for _ in range(count // 2)]
+    # near-copies of the base sets so every threshold has positives
+    near = [(b - set(rng.sample(sorted(b), min(len(b), rng.randint(0, 3))))) | {rng.randrange(universe)} for b in base]
+    return base + near
+
+
+@pytest.mark.parametrize("threshold", [0.1, 0.3, 0.5, 0.7, 0.8, 0.9, 1.0])
+@pytest.mark.parametrize("seed", range(5))
+def test_matches_brute_force(seed, threshold):
+    sets = random_sets(seed)
+    assert joined(sets, threshold) == brute_force(sets, threshold)
+
+
+@settings(max_examples=50, deadline=None)
+@given(st.lists(st.sets(st.integers(min_value=0, max_value=30), max_size=12), max_size=12),
+       st.sampled_from([0.2, 0.25, 1 / 3, 0.5, 0.6, 2 / 3, 0.75, 0.8, 1.0]))
+def test_boundary_thresholds(sets, threshold):
+    # small universes and thresholds like 2/3 hit Jaccard values exactly on the threshold
+    assert joined(sets, threshold) == brute_force(sets, threshold)
+
+
+def test_exact_boundary_pair_kept():
+    a, b = set(range(3)), set(range(4))  # Jaccard 3/4
+    c, d = set(range(10)), set(range(1, 11))  # Jaccard 9/11
+    assert joined([a, b], 0.75) == {(0, 1)}
+    assert joined([c, d], 9 / 11) == {(0, 1)}
+    assert joined([c, d], 0.82) == set()
+
+
+def test_empty_sets_pair_with_each_other_only():
+    sets = [set(), {1, 2}, set(), {1, 2}, set()]
+    assert joined(sets, 0.9) == {(0, 2), (0, 4), (2, 4), (1, 3)}
+
+
+def test_sorted_arrays_match_sets():
+    sets = random_sets(7)
+    arrays = [array("Q", sorted(s)) for s in sets]
+    assert joined(arrays, 0.6) == joined(sets, 0.6) == brute_force(sets, 0.6)
+
+
+def test_pure_python_matches_numpy(monkeypatch):
+    sets = random_sets(3)
+    with_numpy = list(prefix_filter_pairs(sets, 0.5))
+    monkeypatch.setitem(_optional._modules, "numpy", None)
+    pairs = prefix_filter_pairs(sets, 0.5)
+    assert isinstance(pairs, array)
+    assert list(pairs) == with_numpy
+    assert joined(sets, 0.5) == brute_force(sets, 0.5)
+
+
+def test_prunes_dissimilar_sets():
+    sets = [set(range(i * 100, i * 100 + 50)) for i in range(30)]
+    stats = {}
+    assert len(prefix_filter_pairs(sets, 0.5, stats)) == 0
+    assert stats["candidates"] == 0
+
+
+def test_zero_threshold_means_all_pairs():
+    assert prefix_filter_pairs([{1}, {2}], 0.0) is None
+
+
+def test_prefix_lengths():
+    assert probe_prefix_length(10, 0.8) == 3
+    assert probe_prefix_length(10, 1.0) == 1
+    assert probe_prefix_length(0, 0.5) == 0
+    assert index_prefix_length(10, 0.8) <= probe_prefix_length(10, 0.8)
+
+
+@pytest.mark.parametrize("use_numpy", [True, False])
+def test_out_of_range_set_values(monkeypatch, use_numpy):
+    # negative and 128-bit (shingle_hash) values are valid set shingles
+    if not use_numpy:
+        monkeypatch.setitem(_optional._modules, "numpy", None)
+    big = 1 << 100
+    sets = [{-1, 2, 3}, {-1, 2, 3}, {big, big + 1, 5}, {big, big + 1, 6}, {7}]
+    assert joined(sets, 0.4) == brute_force(sets, 0.4) == {(0, 1), (2, 3)}
+    finder = DuplicateFinder(threshold=0.8)
+    pairs = finder.find_duplicates([FileSignature("a", {-1, 2, 3}, 3), FileSignature("b", {-1, 2, 3}, 3)])
+    assert [(s, a.path, b.path) for s, a, b in pairs] == [(1.0, "a", "b")]
@@ -0,0 +1,86 @@
+import pstats
+from duplicate_finder import core
+from duplicate_finder.core import DuplicateFinder
+from duplicate_finder.ignore import IgnoreMatcher
+from duplicate_finder.stats import STAGES, format_stats
+import pytest
+
+
+def make_tree(root):
+    for i in range(6):
+        (root / f"f{i}.txt").write_text(" ".join(f"tok{(i * 3 + j) % 40}" for j in range(25)))
+    (root / "copy.txt").write_text((root / "f0.txt").read_text())
+    (root / "big.txt").write_text("x " * 5000)
+    (root / "node_modules").mkdir()
+    (root / "node_modules" / "dep.txt").write_text("a b c d e f")
+
+
+@pytest.mark.parametrize("io_threads", [0, 2])
+def test_scan_counters(tmp_path, io_threads):
+    make_tree(tmp_path)
+    finder = DuplicateFinder(k=3, threshold=0.5, max_file_size=4096, io_threads=io_threads, ignore=IgnoreMatcher(["node_modules/"]))
+    sigs = finder.scan(str(tmp_path), [".txt"])
+    finder.find_clusters(sigs)
+    c = finder.stats.counters
+    assert c["files_discovered"] == 7
+    assert c["files_size_filtered"] == 1  # big.txt, from the directory listing
+    assert c["exact_copies"] == 1
+    assert c["files_signed"] == 6
+    assert c["dirs_pruned"] == 1
+    assert c["bytes_read"] == sum((tmp_path / f"f{i}.txt").stat().st_size for i in range(6))
+    assert c["tokens"] == 6 * 25
+    assert c["shingles"] == sum(len(s.shingles) for s in sigs if s.path != str(tmp_path / "copy.txt"))
+    assert c["all_pairs"] == 15 and c["candidate_pairs"] <= 15  # exact path prunes by size and prefix
+    report = finder.stats_report()
+    assert set(STAGES) <= set(report["timings_s"])
+    assert report["peak_rss_bytes"] is None or report["peak_rss_bytes"] > 0
+
+
+@pytest.mark.parametrize("io_threads", [0, 2])
+def test_failures_are_counted(tmp_path, io_threads):
+    (tmp_path / "ok.txt").write_text("a b c d e f g")
+    finder = DuplicateFinder(k=3, io_threads=io_threads)
+    sigs = finder.sign_files([str(tmp_path / "ok.txt"), str(tmp_path / "gone.txt")])
+    assert [s.path for s in sigs] == [str(tmp_path / "ok.txt")]
+    assert finder.stats.counters["files_failed"] == 1
+    assert "gone.txt" in finder.stats.errors[0] and "FileNotFoundError" in finder.stats.errors[0]
+    assert any(line.startswith("stats: failed:") for line in format_stats(finder.stats_report()))
+
+
+def test_parallel_counters_match_serial(tmp_path, monkeypatch):
+    make_tree(tmp_path)
+    monkeypatch.setattr(core, "SIGN_BATCH_FILES", 3)
+    files = sorted(str(p) for p in tmp_path.glob("*.txt"))
+    serial = DuplicateFinder(k=3, max_file_size=4096)
+    serial.sign_files(files)
+    parallel = DuplicateFinder(k=3, max_file_size=4096)
+    parallel.sign_files(files, workers=2)
+    keys = ("files_signed", "files_too_large", "bytes_read", "tokens", "shingles")
+    assert {k: parallel.stats.counters[k] for k in keys} == {k: serial.stats.counters[k] for k in keys}
+
+
+def test_lsh_bucket_histogram(tmp_path):
+    for i in range(60):
+        (tmp_path / f"f{i}.txt").write_text(" ".join(f"w{(i // 3) * 50 + j}" for j in range(40)) + f" u{i}")
+    finder = DuplicateFinder(k=3, threshold=0.8)
+    finder.find_duplicates(finder.scan(str(tmp_path), [".txt"]), prefilter=True)
+    lsh = finder.stats_report()["lsh"]
+    assert sum(lsh["bucket_sizes"].values()) == lsh["buckets"] > 0
+    assert finder.stats.counters["candidate_pairs"] == lsh["candidates"] < lsh["pairs"]
+
+
+def test_cli_stats_outputs(tmp_path):
+    import json
+    from click.testing import CliRunner
+    from duplicate_finder.cli import main
+    make_tree(tmp_path)
+    out = tmp_path / "out"
+    out.mkdir()
+    stats_json, prof = out / "stats.json", out / "run.prof"
+    result = CliRunner().invoke(main, ["scan", str(tmp_path), "--ext", ".txt", "--k", "3", "--stats", "--stats-json", str(stats_json), "--profile-out", str(prof)])
+    assert result.exit_code == 0
+    assert "stats: files: 8 discovered" in result.stderr  # default max size: big.txt is signed
+    assert "stats: time: discovery" in result.stderr
+    report = json.loads(stats_json.read_text())
+    assert report["schema_version"] == 1 and report["counters"]["exact_copies"] == 1
+    assert pstats.Stats(str(prof)).total_calls > 0
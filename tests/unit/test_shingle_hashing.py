@@ -0,0 +1,39 @@
+from duplicate_finder import _optional
+from duplicate_finder.hashing import rolling_shingle_hashes, shingle_fingerprints, token_hashes
+import pytest
+
+TOKENS = "the quick brown fox jumps over the quick brown fox again".split()
+
+
+@pytest.mark.parametrize("backend", ["blake2b", "crc"])
+def test_fingerprints_sorted_unique(backend):
+    fp = shingle_fingerprints(TOKENS, k=3, backend=backend).tolist()
+    assert fp == sorted(set(fp))
+    # "the quick brown" and "quick brown fox" repeat -> 9 windows, 7 distinct
+    assert len(fp) == 7
+    assert all(0 <= v < 1 << 64 for v in fp)
+
+
+def test_numpy_and_stdlib_paths_agree(monkeypatch):
+    with_np = shingle_fingerprints(TOKENS, k=4).tolist()
+    monkeypatch.setitem(_optional._modules, "numpy", None)
+    without_np = shingle_fingerprints(TOKENS, k=4)
+    assert without_np.typecode == "Q"
+    assert list(without_np) == with_np
+
+
+def test_rolling_matches_direct_window_hash():
+    hashes = token_hashes(TOKENS)
+    rolled = list(rolling_shingle_hashes(iter(hashes), k=3))
+    direct = []
+    for i in range(len(hashes) - 2):
+        h = 0
+        for t in hashes[i:i + 3]:
+            h = (h * 0x100000001B3 + t) % (1 << 64)
+        direct.append(h)
+    assert rolled == direct
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        shingle_fingerprints(TOKENS, k=2, backend="sha9")
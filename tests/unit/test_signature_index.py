@@ -0,0 +1,83 @@
+import pytest
+from duplicate_finder import _optional
+from duplicate_finder.core import FileSignature, hashed_shingles, shingle_fingerprints
+from duplicate_finder.index import SignatureIndex
+
+BASE = "alpha beta gamma delta epsilon zeta eta theta iota kappa lambda mu".split()
+
+
+def sig(path, tokens, compact=False):
+    sh = shingle_fingerprints(tokens, 3) if compact else hashed_shingles(tokens, 3)
+    return FileSignature(path=path, shingles=sh, size=len(tokens))
+
+
+def corpus():
+    sigs = [sig(f"noise{i}", [f"w{i}_{j}" for j in range(12)]) for i in range(20)]
+    sigs.append(sig("dup_a", BASE))
+    sigs.append(sig("dup_b", BASE + ["nu"], compact=True))
+    return sigs
+
+
+def test_query_finds_near_duplicate():
+    index = SignatureIndex(perms=64, bands=32)
+    index.add_many(corpus())
+    hits = index.query(sig("new", BASE), threshold=0.8)
+    assert [p for _, p in hits] == ["dup_a", "dup_b"]
+    assert hits[0][0] == 1.0
+    # a FileSignature query excludes itself
+    assert [p for _, p in index.query(sig("dup_a", BASE), threshold=0.8)] == ["dup_b"]
+
+
+def test_remove_and_update():
+    index = SignatureIndex(perms=64, bands=32)
+    index.add_many(corpus())
+    assert index.remove("dup_a")
+    assert not index.remove("dup_a")
+    index.update(sig("dup_b", ["totally", "different", "words", "here"]))
+    assert index.query(sig("new", BASE), threshold=0.5) == []
+    assert len(index) == 21
+
+
+@pytest.mark.parametrize("use_numpy", [True, False])
+def test_save_load_roundtrip(tmp_path, monkeypatch, use_numpy):
+    if not use_numpy:
+        monkeypatch.setitem(_optional._modules, "numpy", None)
+    index = SignatureIndex(perms=64, bands=32, config="k=3")
+    index.add_many(corpus())
+    path = str(tmp_path / "corpus.idx")
+    index.save(path)
+    loaded = SignatureIndex.load(path)
+    assert loaded.config == "k=3"
+    assert sorted(loaded.paths()) == sorted(index.paths())
+    assert loaded.query(sig("new", BASE), 0.8) == index.query(sig("new", BASE), 0.8)
+    # overlay edits on top of the mapped base, then re-save
+    loaded.remove("dup_a")
+    loaded.add(sig("dup_c", BASE + ["xi"]))
+    assert [p for _, p in loaded.query(sig("new", BASE), 0.8)] == ["dup_b", "dup_c"]
+    loaded.save(path)
+    loaded.close()
+    again = SignatureIndex.load(path)
+    assert [p for _, p in again.query(sig("new", BASE), 0.8)] == ["dup_b", "dup_c"]
+    assert len(again) == 22
+    again.close()
+
+
+def test_load_rejects_foreign_file(tmp_path):
+    bad = tmp_path / "x.idx"
+    bad.write_bytes(b"not an index at all")
+    with pytest.raises(ValueError):
+        SignatureIndex.load(str(bad))
+
+
+def test_out_of_range_set_values_persist(tmp_path):
+    big = 1 << 100
+    shingles = {-1, big} | set(range(40))
+    index = SignatureIndex(perms=16, bands=8)
+    index.add(FileSignature(path="a", shingles=shingles, size=42))
+    assert [p for _, p in index.query(shingles, threshold=0.9)] == ["a"]
+    index.save(str(tmp_path / "i.idx"))
+    loaded = SignatureIndex.load(str(tmp_path / "i.idx"))
+    assert [(s, p) for s, p in loaded.query(shingles, threshold=0.9)] == [(1.0, "a")]
+    loaded.add(FileSignature(path="b", shingles=shingles, size=42))
+    assert loaded.similarity("a", "b") == 1.0
+    loaded.close()
@@ -0,0 +1,37 @@
+from duplicate_finder import core
+from duplicate_finder.core import DuplicateFinder, tokenize, hashed_shingles
+from duplicate_finder.tokenizers import iter_token_batches
+from duplicate_finder.hashing import ShingleAccumulator, shingle_fingerprints
+
+TEXT = "alpha beta_gamma delta42 epsilon  zeta\neta theta iota kappa lambda mu nu xi " * 5
+
+
+def test_token_batches_across_chunk_boundaries():
+    for size in (1, 2, 3, 7, 64):
+        chunks = [TEXT[i:i + size] for i in range(0, len(TEXT), size)]
+        flat = [t for batch in iter_token_batches(chunks) for t in batch]
+        assert flat == tokenize(TEXT)
+
+
+def test_accumulator_matches_one_shot():
+    tokens = tokenize(TEXT)
+    acc = ShingleAccumulator(k=4)
+    for i in range(0, len(tokens), 3):
+        acc.update(tokens[i:i + 3])
+    assert acc.tokens == len(tokens)
+    assert acc.result().tolist() == shingle_fingerprints(tokens, k=4).tolist()
+
+
+def test_streamed_signature_matches_whole_file(tmp_path, monkeypatch):
+    (tmp_path / "a.txt").write_text(TEXT, encoding="utf-8")
+    monkeypatch.setattr(core, "READ_CHUNK", 5)
+    sig = DuplicateFinder(k=3).scan(str(tmp_path), [".txt"])[0]
+    assert sig.size == len(tokenize(TEXT))
+    assert sig.shingles == hashed_shingles(tokenize(TEXT), 3)
+
+
+def test_max_file_size_skips_large_files(tmp_path):
+    (tmp_path / "small.txt").write_text("alpha beta gamma", encoding="utf-8")
+    (tmp_path / "big.txt").write_text(TEXT, encoding="utf-8")
+    sigs = DuplicateFinder(k=2, max_file_size=100).scan(str(tmp_path), [".txt"])
+    assert [s.path for s in sigs] == [str(tmp_path / "small.txt")]
@@ -0,0 +1,90 @@
+import pytest
+from duplicate_finder.core import DuplicateFinder
+from duplicate_finder.similarity import compute_jaccard
+from duplicate_finder.tokenizers import (
+    REGEX, NUM, STR, Tokenizer, register_tokenizer, tokenize_text, tokenizer_for, _registry,
+)
+
+PY = '''"""Module docstring."""
+import os  # a comment
+
+
+def load(path, retries=3):
+    """Read the file."""
+    name = "config.ini"
+    return os.path.join(path, name) * 2.5
+'''
+
+
+def test_python_drops_comments_docstrings_and_normalizes_literals():
+    tokens = tokenize_text(PY, "m.py")
+    assert tokens == ["import", "os", "def", "load", "path", "retries", NUM, "name", STR,
+                      "return", "os", "path", "join", "path", "name", NUM]
+
+
+def test_python_identifiers_nfkc_and_expression_strings_kept():
+    assert tokenize_text("ﬁle = 1\n'a'.join(x)\n", "m.py") == ["file", NUM, STR, "join", "x"]
+
+
+def test_python_streaming_matches_whole_text():
+    chunks = [PY[i:i + 7] for i in range(0, len(PY), 7)]
+    tok = tokenizer_for("m.py")
+    assert [t for b in tok.batches(chunks) for t in b] == tokenize_text(PY, "m.py")
+
+
+def test_python_falls_back_to_regex_on_bad_source():
+    tokens = tokenize_text("def broken(:\n  x = 'open\nplain words here\n", "m.py")
+    assert tokens[:2] == ["def", "broken"] and tokens[-3:] == ["plain", "words", "here"]
+
+
+def test_python_fallback_keeps_the_failing_line():
+    # the dedent to column 2 matches no outer level: IndentationError on "  b = 2"
+    assert tokenize_text("if True:\n    a = 1\n  b = 2\nc = 3\n", "x.py") == ["if", "True", "a", NUM, "b", "2", "c", "3"]
+
+
+def test_python_fallback_keeps_lines_inside_an_unterminated_string():
+    # the tokenizer reads to the end of the file looking for the closing quotes
+    assert tokenize_text('a = 1\ns = """unterminated\nb = 2\n', "a.py") == ["a", NUM, "s", "unterminated", "b", "2"]
+    assert tokenize_text("f(x,\n  '''y\nz\n", "a.py") == ["f", "x", "y", "z"]
+
+
+def test_markdown_fences_links_and_references():
+    md = "# Title\nSee [docs](http://example.com/a/b) <br>\n```python\nx = 1\n```\n[id]: http://x.y/z\ntail\n"
+    assert tokenize_text(md, "README.md") == ["Title", "See", "docs", "x", "1", "tail"]
+
+
+def test_json_structural_tokens():
+    tokens = tokenize_text('{"name": "my pkg", "n": 1.5e3, "ok": [true, null]}', "p.json")
+    assert tokens == ["{", "key:name", "my", "pkg", "key:n", "1.5e3", "key:ok", "[", "true", "null", "]", "}"]
+
+
+def test_registry_and_regex_mode(monkeypatch):
+    class Upper(Tokenizer):
+        def batches(self, chunks):
+            yield "".join(chunks).upper().split()
+
+    monkeypatch.setitem(_registry, ".up", Upper())
+    assert tokenize_text("a b", "x.UP") == ["A", "B"]
+    assert tokenizer_for("x.up", "regex") is REGEX and tokenizer_for("x.unknown") is REGEX
+    register_tokenizer([".up2"], Upper())
+    assert isinstance(tokenizer_for("f.up2"), Upper)
+    del _registry[".up2"]
+
+
+@pytest.mark.parametrize("workers", [0, 2])
+def test_auto_tokenizer_ignores_comment_and_literal_edits(tmp_path, workers):
+    (tmp_path / "a.py").write_text(PY)
+    (tmp_path / "b.py").write_text(PY.replace("# a comment", "# changed").replace("3", "7").replace("config.ini", "other.cfg"))
+    regex = DuplicateFinder(k=3).scan(str(tmp_path), [".py"], workers=workers)
+    auto_finder = DuplicateFinder(k=3, tokenizer="auto")
+    auto = auto_finder.scan(str(tmp_path), [".py"], workers=workers)
+    assert compute_jaccard(regex[0].shingles, regex[1].shingles) < 1.0
+    assert compute_jaccard(auto[0].shingles, auto[1].shingles) == 1.0
+    assert len(auto[0].shingles) < len(regex[0].shingles)
+    assert auto_finder.signature_settings()["tokenizer"] == "auto"
+    assert "tokenizer" not in DuplicateFinder().signature_settings()
+
+
+def test_unknown_tokenizer_mode():
+    with pytest.raises(ValueError):
+        DuplicateFinder(tokenizer="bogus")